@@ -0,0 +1,65 @@
+import argparse
+
+from src.benchmark.tracker_benchmark import TrackerBenchmark, available_trackers, REPORT_FIELDS
+from src.videoloader import VideoLoaderOpenCV
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="A program to benchmark trackers on a video without GUI")
+
+    parser.add_argument("--input_file", type=str, required=True,
+                        help="Path to the input video file")
+    parser.add_argument("--bbox", type=int, nargs=4, metavar=("X", "Y", "W", "H"),
+                        help="Initial bounding box, by default a box in the center of the first frame")
+    parser.add_argument("--roi_percent", type=float, default=20,
+                        help="Size of the default bounding box in percent of the frame size")
+    parser.add_argument("--trackers", type=str, nargs="+", default=None,
+                        help=f"Trackers to benchmark, all available by default ({', '.join(available_trackers())})")
+    parser.add_argument("--max_frames", type=int, default=None,
+                        help="Number of tracked frames per tracker, the whole video by default")
+    parser.add_argument("--json_file", type=str, default="benchmark.json",
+                        help="Path to the JSON report")
+    parser.add_argument("--csv_file", type=str, default="benchmark.csv",
+                        help="Path to the CSV report")
+    parser.add_argument("--search_margin", type=float, default=None,
+                        help="Track only in a window around the target, margin relative to the bbox size")
+    parser.add_argument("--search_size", type=int, default=None,
+                        help="Downscale the search window to this size in pixels")
+    parser.add_argument("--no_isolate", action="store_true",
+                        help="Run all trackers in the current process")
+
+    return parser.parse_args()
+
+
+def center_bbox(video_path, roi_percent):
+    loader = VideoLoaderOpenCV(video_path)
+    loader.open()
+    frame = loader.get_frame()
+    loader.close()
+
+    height, width = frame.shape[:2]
+    w, h = int(width * roi_percent / 100), int(height * roi_percent / 100)
+    return (width - w) // 2, (height - h) // 2, w, h
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    bbox = args.bbox if args.bbox is not None else center_bbox(args.input_file, args.roi_percent)
+
+    benchmark = TrackerBenchmark(video_path=args.input_file,
+                                 bbox=bbox,
+                                 trackers=args.trackers,
+                                 max_frames=args.max_frames,
+                                 isolate=not args.no_isolate,
+                                 search_window=None if args.search_margin is None
+                                 else (args.search_margin, args.search_size))
+    results = benchmark.run()
+
+    benchmark.save_json(args.json_file)
+    benchmark.save_csv(args.csv_file)
+
+    print(" ".join(f"{field:>11}" for field in REPORT_FIELDS))
+    for row in results:
+        print(" ".join(f"{row[field]:>11.2f}" if isinstance(row[field], float) else f"{str(row[field]):>11}"
+                       for field in REPORT_FIELDS))
@@ -0,0 +1,40 @@
+import argparse
+
+from src.benchmark.tracker_benchmark import available_trackers
+from src.benchmark.tracker_comparison import TrackerComparison
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="A program to run several trackers on one decode of a video")
+
+    parser.add_argument("--input_file", type=str, required=True,
+                        help="Path to the input video file")
+    parser.add_argument("--bbox", type=int, nargs=4, required=True, metavar=("X", "Y", "W", "H"),
+                        help="Initial bounding box")
+    parser.add_argument("--trackers", type=str, nargs="+", default=None,
+                        help=f"Trackers to compare, all available by default ({', '.join(available_trackers())})")
+    parser.add_argument("--slots", type=int, default=16,
+                        help="Number of decoded frames kept in shared memory")
+    parser.add_argument("--max_frames", type=int, default=None,
+                        help="Number of frames to process, the whole video by default")
+    parser.add_argument("--output_file", type=str, default="comparison.csv",
+                        help="Path to the CSV file with bboxes of all trackers")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    comparison = TrackerComparison(video_path=args.input_file,
+                                   bbox=args.bbox,
+                                   trackers=args.trackers if args.trackers is not None else available_trackers(),
+                                   slots=args.slots,
+                                   max_frames=args.max_frames)
+    comparison.run()
+    comparison.save_csv(args.output_file)
+
+    print(f"Wall time: {comparison.wall_time:.2f} s")
+    for name, track_time in comparison.track_times.items():
+        status = comparison.errors.get(name, "ok")
+        print(f"{name:>11}: {track_time:.2f} s of tracking, {status}")
@@ -1,20 +1,16 @@
 import argparse
-import numpy as np
+import time
 
-from src.tracker.tracker_manager import TrackerManager
-from src.videoloader import VideoLoaderOpenCV
-from src.tracker.trackers import MILTracker, BoostingTracker, TLDTracker, KCFTracker,\
-    MOSSETracker, GOTURNTracker, MedianFlowTracker, CSRTTracker
-from src.visualizer.visualizer import Visualizer
+STARTUP = time.perf_counter()
+
+from src.pipeline import cli
+from src.tracker.tracker_registry import registry
 
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="A program to visualize tracking in a video")
 
-    parser.add_argument("--tracker", type=str, required=True,
-                        help="Type of tracker to be used")
-    parser.add_argument("--input_file", type=str, required=True,
-                        help="Path to the input video file")
+    cli.add_tracking_arguments(parser)
     parser.add_argument("--output_file", type=str, default="output.mp4",
                         help="Path to the output video file")
     parser.add_argument("--log_file", type=str, default="log.csv",
@@ -29,34 +25,30 @@ def parse_arguments():
 
 if __name__ == "__main__":
     args = parse_arguments()
+    cli.start_profiling(args)
+
+    # OpenCV and the GUI are imported after the arguments are parsed
+    from src.visualizer.visualizer import Visualizer
 
-    loader = VideoLoaderOpenCV(args.input_file)
-
-    tracker_manager = TrackerManager()
-
-    # can be done using factory, but it will be overkill
-    if args.tracker == "BOOSTING":
-        tracker_manager.set_tracker(BoostingTracker())
-    elif args.tracker == "MIL":
-        tracker_manager.set_tracker(MILTracker())
-    elif args.tracker == "TLD":
-        tracker_manager.set_tracker(TLDTracker())
-    elif args.tracker == "KCF":
-        tracker_manager.set_tracker(KCFTracker())
-    elif args.tracker == "GOTURN":
-        tracker_manager.set_tracker(GOTURNTracker())
-    elif args.tracker == "MOSSE":
-        tracker_manager.set_tracker(MOSSETracker())
-    elif args.tracker == "MEDIANFLOW":
-        tracker_manager.set_tracker(MedianFlowTracker())
-    elif args.tracker == "CSRT":
-        tracker_manager.set_tracker(CSRTTracker())
+    loader = cli.build_loader(args)
+    tracker_manager = cli.build_tracker_manager(args, loader)
+
+    if args.startup_report:
+        print(f"Startup: {(time.perf_counter() - STARTUP) * 1000:.1f} ms, trackers: {registry.startup_report()}")
 
     visualizer = Visualizer(tracker_manager=tracker_manager,
                             video_loader=loader,
                             roi_percent=args.roi_percent,
                             log_path=args.log_file,
                             output_path=args.output_file,
-                            custom_id=args.custom_roi)
+                            custom_id=args.custom_roi,
+                            writer_queue_size=args.writer_queue,
+                            writer_policy=cli.writer_policy(args),
+                            verbose=args.verbose,
+                            start_frame=args.start_frame,
+                            end_frame=args.end_frame,
+                            frame_stride=cli.build_frame_stride(args, loader))
 
     visualizer.visualize()
+
+    cli.finish_profiling(args)
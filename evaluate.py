@@ -0,0 +1,51 @@
+import argparse
+import json
+
+import pandas as pd
+
+from src.benchmark.dataset_evaluation import DatasetEvaluation
+from src.benchmark.tracker_benchmark import available_trackers
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="A program to evaluate trackers on a dataset of annotated sequences")
+
+    parser.add_argument("--dataset_dir", type=str, required=True,
+                        help="Directory with a subdirectory per sequence: a video or an img directory and groundtruth.txt")
+    parser.add_argument("--trackers", type=str, nargs="+", default=None,
+                        help=f"Trackers to evaluate, all available by default ({', '.join(available_trackers())})")
+    parser.add_argument("--tracker_params", type=json.loads, default=None,
+                        help='Parameters of the OpenCV trackers as JSON, e.g. \'{"KCF": {"detect_thresh": 0.3}}\'')
+    parser.add_argument("--sequences", type=str, nargs="+", default=None,
+                        help="Sequences to evaluate, all sequences of the dataset by default")
+    parser.add_argument("--max_frames", type=int, default=None,
+                        help="Number of frames per sequence, all frames by default")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Number of worker processes, number of CPUs by default")
+    parser.add_argument("--output_dir", type=str, default="evaluation",
+                        help="Directory of the results, an interrupted evaluation resumes from it")
+    parser.add_argument("--csv_file", type=str, default=None,
+                        help="Path to the table of all jobs, results.csv in the output directory by default")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    evaluation = DatasetEvaluation(dataset_dir=args.dataset_dir,
+                                   trackers=args.trackers if args.trackers is not None else available_trackers(),
+                                   output_dir=args.output_dir,
+                                   processes=args.processes,
+                                   tracker_params=args.tracker_params,
+                                   max_frames=args.max_frames,
+                                   sequences=args.sequences)
+    results = evaluation.run()
+    evaluation.save_csv(args.csv_file if args.csv_file is not None else f"{args.output_dir}/results.csv")
+
+    failed = results[results["error"].notna()]
+    for _, row in failed.iterrows():
+        print(f"{row['sequence']} {row['tracker']} failed: {row['error']}")
+
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.precision", 3):
+        print(evaluation.summary())
@@ -0,0 +1,63 @@
+import argparse
+import os
+
+from src.pipeline import ResultsStore
+from src.videoloader import VideoLoaderOpenCV, VideoLoaderImageSequence
+from src.visualizer.results_renderer import ResultsRenderer
+from src.visualizer.tracking_log import load_tracking_log
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="A program to render the annotated video from stored tracking "
+                                                 "results without tracking")
+
+    parser.add_argument("--input_file", type=str, required=True,
+                        help="Path to the tracked video file or a directory of images")
+    parser.add_argument("--results", type=str, required=True,
+                        help="Binary tracking log (.npy) or the key of a run in --results_dir")
+    parser.add_argument("--results_dir", type=str, default=None,
+                        help="Directory of stored tracking results, see track.py")
+    parser.add_argument("--output_file", type=str, default="output.mp4",
+                        help="Path to the output video file")
+    parser.add_argument("--start_frame", type=int, default=0,
+                        help="Index of the first rendered frame")
+    parser.add_argument("--end_frame", type=int, default=None,
+                        help="Index of the frame after the last rendered one, the end of the video by default")
+    parser.add_argument("--logged_only", action="store_true",
+                        help="Render only frames with a bounding box, e.g. the tracked frames of a run with --stride")
+    parser.add_argument("--stride", type=int, default=1,
+                        help="Stride of the rendered run, the output is written at 1 / stride of the frame rate")
+    parser.add_argument("--thickness", type=int, default=2,
+                        help="Line width of the bounding boxes")
+    parser.add_argument("--codec", type=str, default="mp4v",
+                        help="FourCC code of the output codec")
+    parser.add_argument("--fps", type=float, default=None,
+                        help="Frame rate of the output video, the frame rate of the input by default "
+                             "(30 for image sequences)")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    if args.results_dir is not None:
+        store = ResultsStore(args.results_dir)
+        entry = store.entry(args.results)
+        if entry is None:
+            raise SystemExit(f"No stored results {args.results} in {args.results_dir}")
+        if not entry["complete"] and (args.end_frame is None or args.end_frame > entry["end_frame"]):
+            print(f"Results end at frame {entry['end_frame']}, later frames are rendered without bounding boxes")
+        records = store.load(args.results)
+    else:
+        records = load_tracking_log(args.results)
+
+    if os.path.isdir(args.input_file):
+        loader = VideoLoaderImageSequence(args.input_file)
+    else:
+        loader = VideoLoaderOpenCV(args.input_file)
+
+    renderer = ResultsRenderer(loader, records, thickness=args.thickness)
+    frames = renderer.render(args.output_file, start_frame=args.start_frame, end_frame=args.end_frame,
+                             logged_only=args.logged_only, fourcc=args.codec, fps=args.fps, stride=args.stride)
+    print(f"Rendered {frames} frames to {args.output_file}")
@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+
+from src.service import TrackingService
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="A service tracking objects in streams of frames sent over TCP")
+
+    parser.add_argument("--host", type=str, default="0.0.0.0",
+                        help="Address to listen on")
+    parser.add_argument("--port", type=int, default=80,
+                        help="Port to listen on")
+    parser.add_argument("--max_workers", type=int, default=None,
+                        help="Number of threads decoding and tracking frames of all sessions")
+    parser.add_argument("--max_sessions", type=int, default=64,
+                        help="Maximum number of open sessions")
+    parser.add_argument("--queue_size", type=int, default=4,
+                        help="Number of frames a session can send ahead of its tracker")
+    parser.add_argument("--idle_timeout", type=float, default=60,
+                        help="Seconds without activity after which a session is closed")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    service = TrackingService(host=args.host,
+                              port=args.port,
+                              max_workers=args.max_workers,
+                              max_sessions=args.max_sessions,
+                              queue_size=args.queue_size,
+                              idle_timeout=args.idle_timeout)
+
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
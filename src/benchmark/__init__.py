@@ -0,0 +1 @@
+from src.benchmark.tracker_benchmark import TrackerBenchmark
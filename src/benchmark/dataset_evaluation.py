@@ -0,0 +1,331 @@
+"""
+Evaluation of trackers on a dataset of annotated sequences
+
+A dataset is a directory with one subdirectory per sequence. A sequence has a video file
+or an img directory of numbered images (OTB layout) and a ground truth file (groundtruth.txt
+or groundtruth_rect.txt) with one bbox x,y,w,h per frame, NaN for frames without annotation.
+
+Every (sequence, tracker) pair is a job. Jobs run on a process pool, one fresh process per job
+(Python 3.11 and later, older versions reuse the processes), so peak RSS belongs to a single job.
+A job whose process dies (killed, out of memory) is reported as failed, the other jobs go on. The result of every finished job is written to the output
+directory at once, an interrupted evaluation started again with the same output directory
+skips the jobs that are already done.
+"""
+
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from src.benchmark import metrics
+from src.benchmark.tracker_benchmark import peak_rss_mb
+from src.tracker.tracker_manager import TrackerManager
+from src.tracker.tracker_registry import registry
+from src.videoloader import VideoLoaderOpenCV, VideoLoaderImageSequence
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+GROUND_TRUTH_FILES = ("groundtruth.txt", "groundtruth_rect.txt")
+IMAGE_DIRECTORY = "img"
+# one task per child keeps peak RSS of a process to a single job, the option exists since Python 3.11
+POOL_OPTIONS = {"max_tasks_per_child": 1} if sys.version_info >= (3, 11) else {}
+
+RESULT_FIELDS = ["sequence", "tracker", "frames", "success_auc", "precision", "normalized_precision",
+                 "mean_iou", "mean_center_error", "failures", "init_ms", "mean_ms", "fps", "wall_s",
+                 "peak_rss_mb", "error"]
+
+
+def load_ground_truth(path: str) -> np.ndarray:
+    """
+    :return: Array (N, 4) of bboxes, rows of NaN for empty lines.
+    """
+    rows = []
+    with open(path) as file:
+        for line in file:
+            values = [value for value in re.split(r"[,\s]+", line.strip()) if value]
+            if not values:
+                rows.append((np.nan,) * 4)
+            elif len(values) == 4:
+                rows.append(tuple(float(value) for value in values))
+            else:
+                raise ValueError(f"Line {len(rows) + 1} of {path} is not a bbox x,y,w,h: {line.strip()!r}")
+
+    return np.asarray(rows, dtype=np.float64).reshape(-1, 4)
+
+
+def find_sequences(dataset_dir: str) -> dict:
+    """
+    :return: Dictionary sequence name -> (video path or image directory, ground truth path).
+    """
+    sequences = {}
+    for name in sorted(os.listdir(dataset_dir)):
+        directory = os.path.join(dataset_dir, name)
+        if not os.path.isdir(directory):
+            continue
+
+        files = sorted(os.listdir(directory))
+        videos = [file for file in files if os.path.splitext(file)[1].lower() in VIDEO_EXTENSIONS]
+        if os.path.isdir(os.path.join(directory, IMAGE_DIRECTORY)):
+            videos.insert(0, IMAGE_DIRECTORY)
+        ground_truth = [file for file in GROUND_TRUTH_FILES if file in files]
+        if videos and ground_truth:
+            sequences[name] = (os.path.join(directory, videos[0]), os.path.join(directory, ground_truth[0]))
+
+    return sequences
+
+
+def run_job(sequence: str, video_path: str, ground_truth_path: str, tracker: str,
+            params: dict = None, max_frames: int = None) -> tuple:
+    """
+    Track one sequence with one tracker, initialized with the ground truth of the first frame.
+    :return: (result row, see RESULT_FIELDS, array (N, 4) of predicted bboxes).
+    """
+    start = time.perf_counter()
+    ground_truth = load_ground_truth(ground_truth_path)
+    if max_frames is not None:
+        ground_truth = ground_truth[:max_frames]
+    if not len(ground_truth) or not metrics.valid_frames(ground_truth[0]):
+        raise ValueError(f"First frame of {sequence} has no annotation")
+
+    if os.path.isdir(video_path):
+        # jobs already run in parallel, two threads are enough to overlap decoding with tracking
+        loader = VideoLoaderImageSequence(video_path, workers=2)
+    else:
+        loader = VideoLoaderOpenCV(video_path)
+    loader.open()
+
+    predicted = np.full_like(ground_truth, np.nan)
+    latencies = []
+    tracker_manager = None
+    try:
+        tracker_manager = TrackerManager(registry.create(tracker, params=params))
+        tracker_manager.set_bbox(tuple(int(round(v)) for v in ground_truth[0]))
+
+        for index in range(len(ground_truth)):
+            frame = loader.get_frame()
+            if frame is None:
+                break
+
+            frame_start = time.perf_counter()
+            bbox = tracker_manager.track(frame)
+            latencies.append(time.perf_counter() - frame_start)
+
+            if bbox is not None:
+                predicted[index] = bbox
+    finally:
+        loader.close()
+        if tracker_manager is not None:
+            tracker_manager.close()
+
+    # the video can be shorter than its annotation
+    frames = len(latencies)
+    scores = metrics.evaluate(predicted[:frames], ground_truth[:frames])
+    latencies = np.asarray(latencies) * 1000
+    tracking_time = latencies[1:].sum()
+
+    row = {
+        "sequence": sequence,
+        "tracker": tracker,
+        **{name: float(value) for name, value in scores.items()},
+        "frames": frames,
+        "failures": int(scores["failures"]),
+        "init_ms": float(latencies[0]) if frames else float("nan"),
+        "mean_ms": float(latencies[1:].mean()) if frames > 1 else float("nan"),
+        "fps": float((frames - 1) / tracking_time * 1000) if tracking_time > 0 else float("nan"),
+        "wall_s": time.perf_counter() - start,
+        "peak_rss_mb": peak_rss_mb(),
+        "error": None,
+    }
+    return row, predicted[:frames]
+
+
+def _failed_row(job: dict, error: str, rss_mb: float = float("nan")) -> dict:
+    row = {field: float("nan") for field in RESULT_FIELDS}
+    row.update(sequence=job["sequence"], tracker=job["tracker"], error=error, peak_rss_mb=rss_mb)
+    return row
+
+
+def _run_job(job: dict):
+    try:
+        row, predicted = run_job(**job)
+    except Exception as e:
+        row = _failed_row(job, repr(e), peak_rss_mb())
+        predicted = None
+    return job, row, predicted
+
+
+class DatasetEvaluation:
+    def __init__(self,
+                 dataset_dir: str,
+                 trackers: list,
+                 output_dir: str,
+                 processes: int = None,
+                 tracker_params: dict = None,
+                 max_frames: int = None,
+                 sequences: list = None):
+        """
+        :param dataset_dir: Directory with a subdirectory per sequence, see find_sequences.
+        :param trackers: Names of the trackers in the tracker registry.
+        :param output_dir: Directory of the results of finished jobs, the evaluation resumes from it.
+        :param processes: Size of the process pool, number of CPUs if None.
+        :param tracker_params: Dictionary tracker name -> parameters of the OpenCV tracker.
+        :param max_frames: Number of frames per sequence, all frames if None.
+        :param sequences: Names of the sequences to evaluate, all sequences in the dataset if None.
+        """
+        unknown = [name for name in trackers if name not in registry]
+        if unknown:
+            raise ValueError(f"Unknown trackers: {', '.join(unknown)}")
+
+        self.dataset_dir = dataset_dir
+        self.trackers = list(trackers)
+        self.output_dir = output_dir
+        self.processes = processes
+        self.tracker_params = tracker_params or {}
+        self.max_frames = max_frames
+
+        self.sequences = find_sequences(dataset_dir)
+        if sequences is not None:
+            missing = [name for name in sequences if name not in self.sequences]
+            if missing:
+                raise ValueError(f"Sequences not found in {dataset_dir}: {', '.join(missing)}")
+            self.sequences = {name: self.sequences[name] for name in sequences}
+
+        self.results = None
+        self.finished_jobs = 0
+        self.resumed_jobs = 0
+
+    def jobs(self) -> list:
+        return [{"sequence": sequence, "video_path": video_path, "ground_truth_path": ground_truth_path,
+                 "tracker": tracker, "params": self.tracker_params.get(tracker), "max_frames": self.max_frames}
+                for sequence, (video_path, ground_truth_path) in self.sequences.items()
+                for tracker in self.trackers]
+
+    def job_path(self, job: dict) -> str:
+        return os.path.join(self.output_dir, "jobs", job["sequence"], f"{job['tracker']}.json")
+
+    def load_job(self, job: dict):
+        """
+        :return: Result row of a finished job or None if it has to run. Jobs finished with other settings run again.
+        """
+        path = self.job_path(job)
+        if not os.path.exists(path):
+            return None
+
+        with open(path) as file:
+            saved = json.load(file)
+        if saved["params"] != job["params"] or saved["max_frames"] != job["max_frames"]:
+            return None
+        return saved["result"]
+
+    def save_job(self, job: dict, row: dict, predicted: np.ndarray):
+        path = self.job_path(job)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # written to a temporary file first, an interrupted write never looks like a finished job
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump({"params": job["params"], "max_frames": job["max_frames"],
+                       "result": row, "bboxes": predicted.tolist()}, file)
+        os.replace(temporary_path, path)
+
+    def run_jobs(self, jobs: list):
+        """
+        Run the jobs on process pools and yield (job, row, predicted) as they finish.
+        A pool breaks when one of its processes dies and takes the running jobs with it. They run again,
+        one at a time, the job that breaks a pool on its own is failed.
+        """
+        queue = list(jobs)
+        while queue:
+            suspects = yield from self._run_pool(queue, self.processes or os.cpu_count())
+            for job in suspects:
+                for broken in (yield from self._run_pool([job], 1)):
+                    yield broken, _failed_row(broken, "The process of the job died"), None
+
+    @staticmethod
+    def _run_pool(queue: list, processes: int):
+        """
+        Run jobs of the queue until it is empty or the pool breaks, at most processes jobs are submitted at a time.
+        :return: Jobs that were running when the pool broke.
+        """
+        # spawn: every job starts from a fresh interpreter, so peak RSS is its own
+        context = multiprocessing.get_context("spawn")
+        running = {}
+        broken = []
+        with ProcessPoolExecutor(processes, mp_context=context, **POOL_OPTIONS) as executor:
+            while queue or running:
+                while queue and len(running) < processes:
+                    job = queue.pop(0)
+                    running[executor.submit(_run_job, job)] = job
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    try:
+                        yield future.result()
+                    except BrokenProcessPool:
+                        broken.append(job)
+
+                if broken:
+                    # the other running jobs are lost with the pool as well
+                    broken.extend(running.values())
+                    break
+        return broken
+
+    def run(self, verbose: bool = True) -> pd.DataFrame:
+        """
+        :return: Table with a row per job, see RESULT_FIELDS.
+        """
+        rows = []
+        pending = []
+        for job in self.jobs():
+            row = self.load_job(job)
+            if row is None:
+                pending.append(job)
+            else:
+                rows.append(row)
+
+        self.resumed_jobs = len(rows)
+        self.finished_jobs = 0
+        if verbose:
+            print(f"{len(pending)} jobs to run, {len(rows)} finished before")
+
+        for job, row, predicted in self.run_jobs(pending):
+            if predicted is not None:
+                self.save_job(job, row, predicted)
+            rows.append(row)
+            self.finished_jobs += 1
+
+            if verbose:
+                status = row["error"] or f"AUC {row['success_auc']:.3f}, {row['fps']:.1f} fps"
+                print(f"[{self.finished_jobs}/{len(pending)}] {job['sequence']} {job['tracker']}: {status}")
+
+        self.results = pd.DataFrame(rows, columns=RESULT_FIELDS).sort_values(["sequence", "tracker"],
+                                                                              ignore_index=True)
+        return self.results
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Scores of every tracker averaged over the sequences it finished.
+        """
+        finished = self.results[self.results["error"].isna()]
+        return finished.groupby("tracker").agg(
+            sequences=("sequence", "count"),
+            frames=("frames", "sum"),
+            success_auc=("success_auc", "mean"),
+            precision=("precision", "mean"),
+            normalized_precision=("normalized_precision", "mean"),
+            mean_iou=("mean_iou", "mean"),
+            failures=("failures", "sum"),
+            mean_ms=("mean_ms", "mean"),
+            fps=("fps", "mean"),
+            peak_rss_mb=("peak_rss_mb", "max"),
+        )
+
+    def save_csv(self, path: str):
+        self.results.to_csv(path, index=False)
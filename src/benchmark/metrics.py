@@ -0,0 +1,178 @@
+"""
+Accuracy of trackers against ground truth
+
+All functions work on bbox arrays (x, y, w, h) of shape (..., N, 4): a single sequence (N, 4)
+or many sequences at once (S, N, 4), without Python loops over frames or sequences.
+Sequences of different lengths are padded with stack_sequences.
+
+Conventions follow the OTB benchmark:
+- a predicted bbox of NaN is a tracking failure, its IoU is 0 and its center error infinite
+- frames whose ground truth is NaN or has no area are not annotated and are left out of every score,
+  per-frame metrics are NaN there
+- success curve: fraction of frames with IoU above each threshold in [0, 1], AUC is its mean
+- precision curve: fraction of frames with center error within each threshold in pixels,
+  precision is its value at 20 px
+"""
+
+import numpy as np
+
+SUCCESS_THRESHOLDS = np.linspace(0, 1, 21)
+PRECISION_THRESHOLDS = np.arange(0, 51, dtype=np.float64)
+PRECISION_THRESHOLD = 20
+
+
+def stack_sequences(sequences: list) -> np.ndarray:
+    """
+    Pad bbox arrays of different lengths with NaN into one array (S, max N, 4).
+    Padded frames count as not annotated when they are used as ground truth.
+    """
+    length = max((len(sequence) for sequence in sequences), default=0)
+    stacked = np.full((len(sequences), length, 4), np.nan)
+    for index, sequence in enumerate(sequences):
+        stacked[index, :len(sequence)] = sequence
+    return stacked
+
+
+def _check_shapes(predicted: np.ndarray, ground_truth: np.ndarray):
+    predicted = np.asarray(predicted, dtype=np.float64)
+    ground_truth = np.asarray(ground_truth, dtype=np.float64)
+
+    if predicted.shape != ground_truth.shape or predicted.shape[-1:] != (4,):
+        raise ValueError(f"Bboxes have to be arrays of the same shape (..., N, 4), "
+                         f"got {predicted.shape} and {ground_truth.shape}")
+    return predicted, ground_truth
+
+
+def valid_frames(ground_truth: np.ndarray) -> np.ndarray:
+    """
+    :return: Boolean mask (..., N) of the annotated frames.
+    """
+    ground_truth = np.asarray(ground_truth, dtype=np.float64)
+    return np.all(np.isfinite(ground_truth), axis=-1) & (ground_truth[..., 2] > 0) & (ground_truth[..., 3] > 0)
+
+
+def iou(predicted, ground_truth) -> np.ndarray:
+    """
+    :return: Intersection over union (..., N), 0 for failed predictions, NaN for frames without annotation.
+    """
+    predicted, ground_truth = _check_shapes(predicted, ground_truth)
+
+    with np.errstate(invalid="ignore"):
+        left = np.maximum(predicted[..., 0], ground_truth[..., 0])
+        top = np.maximum(predicted[..., 1], ground_truth[..., 1])
+        right = np.minimum(predicted[..., 0] + predicted[..., 2], ground_truth[..., 0] + ground_truth[..., 2])
+        bottom = np.minimum(predicted[..., 1] + predicted[..., 3], ground_truth[..., 1] + ground_truth[..., 3])
+
+        intersection = np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None)
+        union = predicted[..., 2] * predicted[..., 3] + ground_truth[..., 2] * ground_truth[..., 3] - intersection
+        overlap = np.where(union > 0, intersection / np.where(union > 0, union, 1), 0.0)
+
+    overlap = np.nan_to_num(overlap, nan=0.0)
+    return np.where(valid_frames(ground_truth), overlap, np.nan)
+
+
+def center_error(predicted, ground_truth, normalized: bool = False) -> np.ndarray:
+    """
+    :param normalized: Measure the distance in units of the ground truth size instead of pixels.
+    :return: Distance of the bbox centers (..., N), inf for failed predictions, NaN for frames without annotation.
+    """
+    predicted, ground_truth = _check_shapes(predicted, ground_truth)
+
+    offset = (predicted[..., :2] + predicted[..., 2:] / 2) - (ground_truth[..., :2] + ground_truth[..., 2:] / 2)
+    valid = valid_frames(ground_truth)
+    if normalized:
+        offset = offset / np.where(valid[..., None], ground_truth[..., 2:], 1)
+
+    error = np.sqrt(np.sum(offset ** 2, axis=-1))
+    error = np.where(np.isfinite(error), error, np.inf)
+    return np.where(valid, error, np.nan)
+
+
+def _fraction(hits: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    # hits (..., N, T) and valid (..., N) -> fraction of valid frames per threshold (..., T)
+    frames = valid.sum(axis=-1)[..., None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(frames > 0, (hits & valid[..., None]).sum(axis=-2) / np.maximum(frames, 1), np.nan)
+
+
+def success_curve(overlaps, thresholds=SUCCESS_THRESHOLDS) -> np.ndarray:
+    """
+    :param overlaps: IoU (..., N) from iou.
+    :return: Fraction of annotated frames with IoU above each threshold (..., T).
+    """
+    overlaps = np.asarray(overlaps, dtype=np.float64)
+    valid = ~np.isnan(overlaps)
+    with np.errstate(invalid="ignore"):
+        return _fraction(overlaps[..., None] > np.asarray(thresholds), valid)
+
+
+def precision_curve(errors, thresholds=PRECISION_THRESHOLDS) -> np.ndarray:
+    """
+    :param errors: Center errors (..., N) from center_error.
+    :return: Fraction of annotated frames with center error within each threshold (..., T).
+    """
+    errors = np.asarray(errors, dtype=np.float64)
+    valid = ~np.isnan(errors)
+    with np.errstate(invalid="ignore"):
+        return _fraction(errors[..., None] <= np.asarray(thresholds), valid)
+
+
+def success_auc(overlaps, thresholds=SUCCESS_THRESHOLDS) -> np.ndarray:
+    """
+    :return: Area under the success curve (...), the mean of the curve over evenly spaced thresholds as in OTB.
+    """
+    return success_curve(overlaps, thresholds).mean(axis=-1)
+
+
+def precision(errors, threshold: float = PRECISION_THRESHOLD) -> np.ndarray:
+    """
+    :return: Fraction of annotated frames with center error within the threshold (...).
+    """
+    return precision_curve(errors, (threshold,))[..., 0]
+
+
+def failures(overlaps, threshold: float = 0.0) -> np.ndarray:
+    """
+    Number of times the tracker lost the target: the IoU drops to the threshold or below after being above it.
+    Each failure is a reset in a supervised (VOT-style) run. Frames without annotation do not end a failure.
+    :return: Failure counts (...).
+    """
+    overlaps = np.asarray(overlaps, dtype=np.float64)
+    lost = np.where(np.isnan(overlaps), np.nan, overlaps <= threshold)
+
+    # carry the last annotated state over frames without annotation
+    index = np.where(np.isnan(lost), 0, np.arange(lost.shape[-1]))
+    np.maximum.accumulate(index, axis=-1, out=index)
+    lost = np.nan_to_num(np.take_along_axis(lost, index, axis=-1), nan=0.0).astype(bool)
+
+    onsets = lost[..., 1:] & ~lost[..., :-1]
+    return onsets.sum(axis=-1) + lost[..., 0]
+
+
+def evaluate(predicted, ground_truth, failure_threshold: float = 0.0) -> dict:
+    """
+    All scores of predictions against ground truth.
+    :return: Dictionary metric name -> array (...) with one value per sequence.
+    """
+    overlaps = iou(predicted, ground_truth)
+    errors = center_error(predicted, ground_truth)
+    normalized_errors = center_error(predicted, ground_truth, normalized=True)
+
+    return {
+        "frames": valid_frames(ground_truth).sum(axis=-1),
+        "success_auc": success_auc(overlaps),
+        "precision": precision(errors),
+        "normalized_precision": precision_curve(normalized_errors, np.linspace(0, 0.5, 51)).mean(axis=-1),
+        "mean_iou": _nanmean(overlaps),
+        # over the frames where the tracker reported a bbox
+        "mean_center_error": _nanmean(np.where(np.isinf(errors), np.nan, errors)),
+        "failures": failures(overlaps, failure_threshold),
+    }
+
+
+def _nanmean(values: np.ndarray) -> np.ndarray:
+    # np.nanmean without the warning for all-NaN sequences
+    count = (~np.isnan(values)).sum(axis=-1)
+    total = np.nansum(values, axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / np.maximum(count, 1), np.nan)
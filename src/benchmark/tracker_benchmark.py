@@ -0,0 +1,187 @@
+"""
+Headless benchmark for the trackers from src.tracker.trackers
+
+Every tracker is driven through TrackerManager.track on the same video and the same initial bbox.
+Only the track call is timed, decoding is done outside of the measured region, so the numbers
+describe the tracker and not the codec.
+
+By default each tracker runs in its own process, so peak RSS belongs to a single tracker
+and one tracker cannot warm up caches for the next one.
+"""
+
+import csv
+import json
+import multiprocessing
+import sys
+import time
+
+import numpy as np
+
+from src.tracker.tracker_manager import TrackerManager
+from src.tracker.tracker_registry import registry
+from src.videoloader import VideoLoaderOpenCV
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+REPORT_FIELDS = ["tracker", "frames", "init_ms", "mean_ms", "p50_ms", "p95_ms", "p99_ms",
+                 "fps", "failures", "peak_rss_mb"]
+
+
+def available_trackers():
+    """
+    Names of the trackers that can run in the current environment.
+    GOTURN is listed only when its weights are in the working directory, CASCADE and MOSSE_BATCHED only when named.
+    """
+    return registry.available()
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of the current process in MB or None if the platform does not report it.
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def summarize(name: str, init_time: float, latencies: list, failures: int) -> dict:
+    """
+    Turn raw measurements (in seconds) into a report row.
+    """
+    latencies = np.asarray(latencies, dtype=np.float64) * 1000
+    total = latencies.sum()
+
+    if latencies.size:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        mean = latencies.mean()
+    else:
+        p50 = p95 = p99 = mean = float("nan")
+
+    return {
+        "tracker": name,
+        "frames": int(latencies.size),
+        "init_ms": init_time * 1000,
+        "mean_ms": float(mean),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "fps": float(latencies.size / total * 1000) if total > 0 else float("nan"),
+        "failures": failures,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_tracker(name: str, video_path: str, bbox, max_frames: int = None, search_window: tuple = None) -> dict:
+    """
+    Benchmark a single tracker.
+
+    :param name: Name of the tracker in the tracker registry.
+    :param video_path: Path to the input video.
+    :param bbox: Initial bounding box (x, y, w, h) in the first frame.
+    :param max_frames: Stop after this number of tracked frames. None means the whole video.
+    :param search_window: Arguments of TrackerBase.set_search_window, full frame tracking if None.
+    :return: Report row, see REPORT_FIELDS.
+    """
+    loader = VideoLoaderOpenCV(video_path)
+    loader.open()
+
+    tracker_manager = None
+    try:
+        frame = loader.get_frame()
+        if frame is None:
+            raise ValueError(f"Video {video_path} has no frames")
+
+        tracker_manager = TrackerManager(registry.create(name))
+        if search_window is not None:
+            tracker_manager.tracker.set_search_window(*search_window)
+        tracker_manager.set_bbox(tuple(int(v) for v in bbox))
+
+        # the first call initializes the tracker
+        start = time.perf_counter()
+        tracker_manager.track(frame)
+        init_time = time.perf_counter() - start
+
+        latencies = []
+        failures = 0
+        while max_frames is None or len(latencies) < max_frames:
+            frame = loader.get_frame()
+            if frame is None:
+                break
+
+            start = time.perf_counter()
+            result = tracker_manager.track(frame)
+            latencies.append(time.perf_counter() - start)
+
+            if result is None:
+                failures += 1
+    finally:
+        loader.close()
+        if tracker_manager is not None:
+            tracker_manager.close()
+
+    return summarize(name, init_time, latencies, failures)
+
+
+class TrackerBenchmark:
+    def __init__(self,
+                 video_path: str,
+                 bbox,
+                 trackers: list = None,
+                 max_frames: int = None,
+                 isolate: bool = True,
+                 search_window: tuple = None):
+        """
+        :param video_path: Path to the input video.
+        :param bbox: Initial bounding box (x, y, w, h) in the first frame.
+        :param trackers: Names of the trackers to run, all available trackers by default.
+        :param max_frames: Limit of tracked frames per tracker.
+        :param isolate: Run every tracker in a separate process.
+        :param search_window: Arguments of TrackerBase.set_search_window, full frame tracking if None.
+        """
+        self.video_path = video_path
+        self.bbox = bbox
+        self.trackers = trackers if trackers is not None else available_trackers()
+        self.max_frames = max_frames
+        self.isolate = isolate
+        self.search_window = search_window
+        self.results = []
+
+        unknown = [name for name in self.trackers if name not in registry]
+        if unknown:
+            raise ValueError(f"Unknown trackers: {', '.join(unknown)}")
+
+    def run(self) -> list:
+        self.results = []
+        for name in self.trackers:
+            args = (name, self.video_path, self.bbox, self.max_frames, self.search_window)
+            if self.isolate:
+                # spawn gives every tracker a fresh interpreter, so peak RSS is not shared
+                context = multiprocessing.get_context("spawn")
+                with context.Pool(1) as pool:
+                    result = pool.apply(run_tracker, args)
+            else:
+                result = run_tracker(*args)
+            self.results.append(result)
+
+        return self.results
+
+    def save_json(self, path: str):
+        with open(path, "w") as file:
+            json.dump({"video": self.video_path,
+                       "bbox": [int(v) for v in self.bbox],
+                       "results": self.results}, file, indent=2)
+
+    def save_csv(self, path: str):
+        with open(path, "w", newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.results)
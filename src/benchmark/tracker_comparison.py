@@ -0,0 +1,248 @@
+"""
+Decode once, track in parallel
+
+The video is decoded a single time into a ring buffer in shared memory. Every tracker runs in its own
+worker process and reads frames from the ring without copying, only bboxes are sent back.
+
+Slot reuse is coordinated with sequence numbers: the producer writes frame N into slot N % slots only
+after every worker has reported that it is done with frame N - slots. A worker that is killed, e.g. by a crash
+inside an OpenCV tracker, cannot report anything: the producer checks the worker processes whenever it has waited
+for POLL_INTERVAL and records such a worker as failed.
+"""
+
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.tracker.tracker_manager import TrackerManager
+from src.tracker.tracker_registry import registry
+from src.videoloader import VideoLoaderOpenCV
+
+# "done" value of a worker that has stopped, so the producer never waits for it
+_WORKER_STOPPED = 2 ** 62
+# seconds the producer waits for the workers before it checks that they are still running
+POLL_INTERVAL = 0.5
+
+
+class SharedFrameRing:
+    def __init__(self, shape: tuple, slots: int, name: str = None, dtype=np.uint8):
+        """
+        :param shape: Shape of a single frame.
+        :param slots: Number of frames in the ring.
+        :param name: Name of an existing ring to attach to. A new ring is created if None.
+        """
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        frame_size = int(np.prod(self.shape)) * self.dtype.itemsize
+
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=frame_size * slots)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+
+        self.frames = np.ndarray((slots, *self.shape), dtype=self.dtype, buffer=self.memory.buf)
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def slot(self, sequence: int) -> np.ndarray:
+        return self.frames[sequence % self.slots]
+
+    def close(self):
+        # views on the buffer have to be dropped before the memory can be closed
+        self.frames = None
+        self.memory.close()
+
+    def unlink(self):
+        self.memory.unlink()
+
+
+def _worker(index, name, tracker_registry, bbox, ring_name, shape, slots, condition, written, total, done, results):
+    ring = None
+    bboxes = []
+    track_time = 0.0
+    tracker_manager = None
+
+    try:
+        ring = SharedFrameRing(shape, slots, name=ring_name)
+        tracker_manager = TrackerManager(tracker_registry.create(name))
+        tracker_manager.set_bbox(tuple(int(v) for v in bbox))
+
+        sequence = 0
+        while True:
+            with condition:
+                condition.wait_for(lambda: written.value > sequence or 0 <= total.value <= sequence)
+                if written.value <= sequence:
+                    break
+
+            start = time.perf_counter()
+            result = tracker_manager.track(ring.slot(sequence))
+            track_time += time.perf_counter() - start
+            bboxes.append(result if result is not None else (np.nan,) * 4)
+
+            sequence += 1
+            with condition:
+                done[index] = sequence
+                condition.notify_all()
+
+        results.put((index, np.asarray(bboxes, dtype=np.float64).reshape(-1, 4), track_time, None))
+    except Exception as e:
+        results.put((index, None, track_time, repr(e)))
+    finally:
+        with condition:
+            done[index] = _WORKER_STOPPED
+            condition.notify_all()
+        if tracker_manager is not None:
+            tracker_manager.close()
+        if ring is not None:
+            ring.close()
+
+
+class TrackerComparison:
+    def __init__(self,
+                 video_path: str,
+                 bbox,
+                 trackers: list,
+                 slots: int = 16,
+                 max_frames: int = None,
+                 tracker_registry=registry):
+        """
+        :param video_path: Path to the input video.
+        :param bbox: Initial bounding box (x, y, w, h) in the first frame.
+        :param trackers: Names of the trackers to compare, names in the tracker registry.
+        :param slots: Number of frames in the shared ring buffer.
+        :param max_frames: Number of frames to process including the first one. None means the whole video.
+        :param tracker_registry: Registry the trackers are created from, it is sent to the worker processes.
+        """
+        unknown = [name for name in trackers if name not in tracker_registry]
+        if unknown:
+            raise ValueError(f"Unknown trackers: {', '.join(unknown)}")
+        if slots < 1:
+            raise ValueError("Number of slots has to be positive")
+
+        self.video_path = video_path
+        self.bbox = bbox
+        self.trackers = list(trackers)
+        self.slots = slots
+        self.max_frames = max_frames
+        self.registry = tracker_registry
+
+        self.bboxes = {}
+        self.track_times = {}
+        self.errors = {}
+        self.wall_time = None
+
+    def run(self) -> dict:
+        """
+        :return: Dictionary tracker name -> array (N, 4) of bboxes, rows of NaN where the tracker failed.
+        """
+        context = multiprocessing.get_context("spawn")
+        loader = VideoLoaderOpenCV(self.video_path)
+        loader.open()
+
+        start = time.perf_counter()
+        frame = loader.get_frame()
+        if frame is None:
+            loader.close()
+            raise ValueError(f"Video {self.video_path} has no frames")
+
+        ring = SharedFrameRing(frame.shape, self.slots)
+        condition = context.Condition()
+        written = context.RawValue("q", 0)
+        total = context.RawValue("q", -1)
+        done = context.RawArray("q", len(self.trackers))
+        results = context.Queue()
+
+        workers = [context.Process(target=_worker,
+                                   args=(index, name, self.registry, self.bbox, ring.name, frame.shape, self.slots,
+                                         condition, written, total, done, results),
+                                   daemon=True)
+                   for index, name in enumerate(self.trackers)]
+        for worker in workers:
+            worker.start()
+
+        # index -> error of the workers that were killed
+        crashed = {}
+        try:
+            sequence = 0
+            while frame is not None and (self.max_frames is None or sequence < self.max_frames):
+                with condition:
+                    # slot is free when every worker has finished the frame written there before
+                    while not condition.wait_for(lambda: min(done) > sequence - self.slots, timeout=POLL_INTERVAL):
+                        self._check_workers(workers, done, crashed)
+
+                np.copyto(ring.slot(sequence), frame)
+
+                sequence += 1
+                with condition:
+                    written.value = sequence
+                    condition.notify_all()
+
+                frame = loader.get_frame()
+        finally:
+            with condition:
+                total.value = written.value
+                condition.notify_all()
+            loader.close()
+
+            collected = self._collect(workers, done, crashed, condition, results)
+            for worker in workers:
+                worker.join()
+            self.wall_time = time.perf_counter() - start
+
+            ring.close()
+            ring.unlink()
+
+        self.bboxes, self.track_times, self.errors = {}, {}, {}
+        for index, error in crashed.items():
+            self.errors[self.trackers[index]] = error
+        for index, (bboxes, track_time, error) in collected.items():
+            name = self.trackers[index]
+            self.track_times[name] = track_time
+            if error is not None:
+                self.errors[name] = error
+            else:
+                self.bboxes[name] = bboxes
+
+        return self.bboxes
+
+    @staticmethod
+    def _check_workers(workers: list, done, crashed: dict):
+        """
+        Record the workers that were killed and stop waiting for them. Called with the condition held.
+        """
+        for index, worker in enumerate(workers):
+            # a worker that returns normally exits with 0, its exceptions are sent as results
+            if index not in crashed and not worker.is_alive() and worker.exitcode != 0:
+                crashed[index] = f"Worker process exited with code {worker.exitcode}"
+                done[index] = _WORKER_STOPPED
+
+    def _collect(self, workers: list, done, crashed: dict, condition, results) -> dict:
+        """
+        :return: Dictionary worker index -> (bboxes, track time, error) of the workers that sent their results.
+        """
+        collected = {}
+        while len(collected.keys() | crashed.keys()) < len(workers):
+            try:
+                index, bboxes, track_time, error = results.get(timeout=POLL_INTERVAL)
+                collected[index] = (bboxes, track_time, error)
+            except queue.Empty:
+                with condition:
+                    self._check_workers(workers, done, crashed)
+
+        # a worker that sent its results before it was killed still has them
+        for index in collected:
+            crashed.pop(index, None)
+        return collected
+
+    def save_csv(self, path: str):
+        with open(path, "w", newline='') as file:
+            file.write("Frame,Tracker,X,Y,Width,Height\n")
+            for name, bboxes in self.bboxes.items():
+                for frame_index, (x, y, w, h) in enumerate(bboxes):
+                    file.write(f"{frame_index},{name},{x},{y},{w},{h}\n")
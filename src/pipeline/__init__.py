@@ -0,0 +1,20 @@
+"""
+Exports are imported on first use: front ends import cli and parse their arguments before OpenCV,
+the loaders and the trackers are imported.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "TrackingPipeline": "tracking_pipeline",
+    "parse_bbox": "bbox_source",
+    "load_bboxes": "bbox_source",
+    "FrameStride": "frame_stride",
+    "ResultsStore": "results_store",
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
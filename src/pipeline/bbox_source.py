@@ -0,0 +1,52 @@
+"""
+Initial bboxes for headless runs
+
+A bbox is given as "x,y,w,h" (or "x y w h") on the command line, or in a file:
+- JSON: a list of bboxes, a dictionary target id -> bbox or {"bboxes": <one of the two>}
+- text: one bbox per line, empty lines and lines starting with # are skipped
+Target ids are integers, bboxes from a list or a text file get ids 0, 1, 2, ...
+"""
+
+import json
+import os
+import re
+
+
+def parse_bbox(text: str) -> tuple:
+    values = [value for value in re.split(r"[,\s]+", text.strip()) if value]
+    if len(values) != 4:
+        raise ValueError(f"Bounding box has to be x,y,w,h: {text!r}")
+
+    bbox = tuple(int(round(float(value))) for value in values)
+    if bbox[2] <= 0 or bbox[3] <= 0:
+        raise ValueError(f"Bounding box has to have positive size: {text!r}")
+    return bbox
+
+
+def _to_bbox(value) -> tuple:
+    if isinstance(value, str):
+        return parse_bbox(value)
+    return parse_bbox(",".join(str(v) for v in value))
+
+
+def load_bboxes(path: str) -> dict:
+    """
+    :return: Dictionary target id -> bbox (x, y, w, h).
+    """
+    with open(path) as file:
+        content = file.read()
+
+    if os.path.splitext(path)[1].lower() == ".json":
+        data = json.loads(content)
+        if isinstance(data, dict) and "bboxes" in data:
+            data = data["bboxes"]
+
+        if isinstance(data, dict):
+            try:
+                return {int(target_id): _to_bbox(bbox) for target_id, bbox in data.items()}
+            except ValueError as e:
+                raise ValueError(f"Target ids in {path} have to be integers: {e}")
+        return {target_id: _to_bbox(bbox) for target_id, bbox in enumerate(data)}
+
+    lines = [line for line in content.splitlines() if line.strip() and not line.lstrip().startswith("#")]
+    return {target_id: parse_bbox(line) for target_id, line in enumerate(lines)}
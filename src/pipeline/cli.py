@@ -0,0 +1,227 @@
+"""
+Command line options shared by demo.py and track.py and the objects built from them
+
+Only the options and the tracker registry are imported with this module. Loaders, managers and OpenCV are
+imported by the build_* functions, after the arguments are parsed and the tracker name is validated.
+"""
+
+import json
+import os
+
+from src.pipeline.frame_stride import FrameStride
+from src.profiling import instrumentation
+from src.tracker.tracker_registry import registry
+
+# trackers that track any number of targets in one instance
+BATCHED_TRACKERS = {"MOSSE_BATCHED"}
+
+
+def add_tracking_arguments(parser):
+    parser.add_argument("--tracker", type=str, required=True, choices=registry.names(),
+                        help="Type of tracker to be used")
+    parser.add_argument("--tracker_params", type=json.loads, default=None,
+                        help='Parameters of the OpenCV tracker as JSON, e.g. \'{"detect_thresh": 0.3}\' for KCF')
+    parser.add_argument("--startup_report", action="store_true",
+                        help="Print how long it took to import and create the tracker")
+    parser.add_argument("--input_file", type=str, required=True,
+                        help="Path to the input video file or a directory of images, with --live also a camera index "
+                             "or a stream URL")
+    parser.add_argument("--fps", type=float, default=30,
+                        help="Frame rate of an image sequence")
+    parser.add_argument("--decode_threads", type=int, default=None,
+                        help="Number of threads decoding the images of an image sequence, number of CPUs by default")
+    parser.add_argument("--start_frame", type=int, default=0,
+                        help="Index of the first frame to process, the video is decoded from the keyframe before it")
+    parser.add_argument("--end_frame", type=int, default=None,
+                        help="Index of the frame after the last one to process, the end of the video by default")
+    parser.add_argument("--stride", type=int, default=1,
+                        help="Track every k-th frame, the frames in between are skipped without being fully decoded")
+    parser.add_argument("--adaptive_stride", action="store_true",
+                        help="Adapt the stride to the tracking latency to keep pace with the frame rate of the video")
+    parser.add_argument("--max_stride", type=int, default=8,
+                        help="Upper bound of the adaptive stride")
+    parser.add_argument("--prefetch", type=int, default=0,
+                        help="Number of frames to decode ahead on a background thread, 0 disables prefetching")
+    parser.add_argument("--frame_pool", type=int, default=4,
+                        help="Number of reusable buffers the video is decoded into (plus --prefetch), 0 allocates "
+                             "every frame")
+    parser.add_argument("--frame_cache", type=str, default=None,
+                        help="Directory of the decoded frame cache, the video is decoded only once for all runs")
+    parser.add_argument("--frame_cache_size", type=float, default=16,
+                        help="Maximum size of the decoded frame cache in GB")
+    parser.add_argument("--live", action="store_true",
+                        help="Live source: read it continuously on a background thread and track only the newest "
+                             "frame, frames that arrive while the tracker is busy are dropped")
+    parser.add_argument("--realtime", action="store_true",
+                        help="Skip tracking on frames that arrive while the tracker is busy and predict them instead")
+    parser.add_argument("--budget_ms", type=float, default=None,
+                        help="Time budget for one frame in real-time and adaptive stride mode, 1000 / fps of the video "
+                             "by default")
+    parser.add_argument("--motion_model", type=str, default="cv", choices=["cv", "kalman"],
+                        help="Motion model that predicts skipped frames in real-time mode")
+    parser.add_argument("--redetect", action="store_true",
+                        help="Search for the target with its appearance template when the tracker loses it")
+    parser.add_argument("--search_margin", type=float, default=None,
+                        help="Track only in a window around the target, margin relative to the bbox size")
+    parser.add_argument("--search_size", type=int, default=None,
+                        help="Downscale the search window to this size in pixels")
+    parser.add_argument("--writer_queue", type=int, default=32,
+                        help="Number of frames waiting for the background video encoder")
+    parser.add_argument("--drop_frames", action="store_true",
+                        help="Drop output frames instead of waiting when the encoder cannot keep up")
+    parser.add_argument("--profile", type=str, default=None,
+                        help="Measure every stage of the pipeline and write the summary to this JSON file")
+    parser.add_argument("--profile_interval", type=float, default=None,
+                        help="Seconds between profile lines printed during the run")
+    parser.add_argument("--verbose", action="count", default=0,
+                        help="Print the bounding box of every frame")
+
+
+def writer_policy(args) -> str:
+    from src.visualizer.async_video_writer import POLICY_BLOCK, POLICY_DROP
+
+    return POLICY_DROP if args.drop_frames else POLICY_BLOCK
+
+
+def start_profiling(args):
+    if args.profile is not None:
+        instrumentation.enable(report_interval=args.profile_interval)
+
+
+def finish_profiling(args):
+    if args.profile is not None:
+        instrumentation.save_json(args.profile)
+
+
+def build_live_loader(args):
+    """
+    Camera index, stream URL or a file played at its frame rate, drained by VideoLoaderLive.
+    Frames are not pooled, the drain thread keeps decoding while the tracker holds a frame.
+    """
+    from src.videoloader import VideoLoaderOpenCV, VideoLoaderImageSequence, VideoLoaderLive
+
+    if os.path.isdir(args.input_file):
+        return VideoLoaderLive(VideoLoaderImageSequence(args.input_file, fps=args.fps, workers=args.decode_threads),
+                               pace=True)
+    if args.input_file.isdigit():
+        return VideoLoaderLive(VideoLoaderOpenCV(int(args.input_file)))
+    # a video file stands in for a live stream
+    return VideoLoaderLive(VideoLoaderOpenCV(args.input_file), pace=os.path.isfile(args.input_file))
+
+
+def build_loader(args):
+    from src.videoloader import VideoLoaderOpenCV, VideoLoaderPrefetch, VideoLoaderCached, FrameCache, \
+        VideoLoaderImageSequence, FramePool
+
+    if args.live:
+        return build_live_loader(args)
+
+    if os.path.isdir(args.input_file):
+        # images are decoded ahead on a thread pool, --prefetch sets how many
+        return VideoLoaderImageSequence(args.input_file, fps=args.fps, workers=args.decode_threads,
+                                        prefetch=args.prefetch or None)
+
+    if args.frame_cache is not None:
+        loader = VideoLoaderCached(args.input_file,
+                                   FrameCache(args.frame_cache, max_bytes=int(args.frame_cache_size * 1024 ** 3)))
+    elif args.frame_pool > 0:
+        # the prefetch queue and the frame the producer waits to put hold buffers as well
+        pool = FramePool(args.frame_pool + args.prefetch + (1 if args.prefetch > 0 else 0))
+        loader = VideoLoaderOpenCV(args.input_file, pool=pool)
+    else:
+        loader = VideoLoaderOpenCV(args.input_file)
+
+    if args.prefetch > 0:
+        loader = VideoLoaderPrefetch(loader, queue_size=args.prefetch)
+
+    return loader
+
+
+def tracking_config(args) -> dict:
+    """
+    Everything that changes the results of the tracker, the key of the results in ResultsStore.
+    :return: Dictionary or None when the results depend on timing and cannot be reused.
+    """
+    if args.realtime or args.adaptive_stride or args.live:
+        return None
+
+    return {
+        "tracker": args.tracker,
+        "params": args.tracker_params,
+        "search_margin": args.search_margin,
+        "search_size": args.search_size,
+        "redetect": args.redetect,
+        "stride": args.stride,
+    }
+
+
+def build_tracker(args):
+    from src.tracker.redetector import RedetectingTracker
+
+    tracker = registry.create(args.tracker, params=args.tracker_params)
+
+    if args.search_margin is not None:
+        tracker.set_search_window(args.search_margin, args.search_size)
+
+    if args.redetect:
+        tracker = RedetectingTracker(tracker)
+
+    return tracker
+
+
+def frame_budget(args, loader) -> float:
+    """
+    Time for one frame in seconds, --budget_ms or 1 / fps of the video.
+    """
+    if args.budget_ms is not None:
+        return args.budget_ms / 1000
+
+    loader.open()
+    budget = 1 / loader.get_fps()
+    loader.close()
+    return budget
+
+
+def build_frame_stride(args, loader) -> FrameStride:
+    """
+    :return: FrameStride or None when every frame is tracked.
+    """
+    if args.stride == 1 and not args.adaptive_stride:
+        return None
+
+    budget = frame_budget(args, loader) if args.adaptive_stride else None
+    return FrameStride(args.stride, adaptive=args.adaptive_stride, max_stride=max(args.max_stride, args.stride),
+                       budget=budget)
+
+
+def build_tracker_manager(args, loader, tracker=None):
+    """
+    :param tracker: Tracker of the manager, build_tracker(args) if None.
+    :return: TrackerManager, RealtimeTrackerManager with --realtime.
+    """
+    from src.tracker.motion_model import ConstantVelocityModel, KalmanMotionModel
+    from src.tracker.realtime_tracker_manager import RealtimeTrackerManager
+    from src.tracker.tracker_manager import TrackerManager
+
+    tracker = tracker if tracker is not None else build_tracker(args)
+
+    if not args.realtime:
+        return TrackerManager(tracker)
+
+    budget = frame_budget(args, loader)
+    motion_model = KalmanMotionModel() if args.motion_model == "kalman" else ConstantVelocityModel()
+    return RealtimeTrackerManager(tracker, budget=budget, motion_model=motion_model)
+
+
+def build_multi_tracker_manager(args, max_workers: int = None):
+    """
+    Manager of several targets. A batched tracker is shared by all targets, any other tracker (or a batched one
+    with --redetect) is created for every target with build_tracker(args).
+    :param max_workers: Size of the thread pool of MultiTrackerManager.
+    :return: MultiTrackerManager or BatchedTrackerManager.
+    """
+    from src.tracker.multi_tracker_manager import MultiTrackerManager, BatchedTrackerManager
+
+    if args.tracker in BATCHED_TRACKERS and not args.redetect:
+        return BatchedTrackerManager(build_tracker(args))
+    return MultiTrackerManager(max_workers=max_workers)
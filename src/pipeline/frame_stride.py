@@ -0,0 +1,60 @@
+"""
+Tracking only every k-th frame
+
+The frames in between are skipped by the loader (VideoLoaderBase.skip), an OpenCV loader grabs them
+without retrieving and converting them. In adaptive mode the stride follows the measured time of processing
+a frame: the frames that arrive while one frame is processed are skipped, so a slow tracker keeps pace
+with the source instead of falling behind it.
+"""
+
+import math
+
+# the stride is lowered only when the latency fits the lower stride with this much headroom, so it does not flap
+HEADROOM = 0.8
+
+
+class FrameStride:
+    def __init__(self,
+                 stride: int = 1,
+                 adaptive: bool = False,
+                 max_stride: int = 8,
+                 budget: float = None,
+                 smoothing: float = 0.2):
+        """
+        :param stride: Track every stride-th frame, the initial stride in adaptive mode.
+        :param adaptive: Adapt the stride to the measured latency of processing a frame.
+        :param max_stride: Upper bound of the adaptive stride.
+        :param budget: Time of one source frame in seconds, usually 1 / fps. Required in adaptive mode.
+        :param smoothing: Weight of the last latency in the moving average of latencies.
+        """
+        if stride < 1 or max_stride < stride:
+            raise ValueError("Stride has to be 1 <= stride <= max_stride")
+        if adaptive and (budget is None or budget <= 0):
+            raise ValueError("Adaptive stride needs a positive budget")
+        if not 0 < smoothing <= 1:
+            raise ValueError("Smoothing has to be in (0, 1]")
+
+        self.stride = stride
+        self.adaptive = adaptive
+        self.max_stride = max_stride
+        self.budget = budget
+        self.smoothing = smoothing
+        self.latency = None
+
+    def update(self, latency: float) -> int:
+        """
+        :param latency: Time it took to process the last frame in seconds.
+        :return: Stride to the next processed frame.
+        """
+        if not self.adaptive:
+            return self.stride
+
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = self.smoothing * latency + (1 - self.smoothing) * self.latency
+
+        needed = min(max(math.ceil(self.latency / self.budget), 1), self.max_stride)
+        if needed > self.stride or self.latency < HEADROOM * needed * self.budget:
+            self.stride = needed
+        return self.stride
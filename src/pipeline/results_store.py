@@ -0,0 +1,142 @@
+"""
+Store of tracking results
+
+Results of a run are its tracking log (see TrackingLog), stored under a key made of the content hash of the video,
+the tracker with everything that configures it, the initial bboxes and the start frame. A run that is repeated
+reads the log instead of tracking, and the annotated video is rendered from the log (see ResultsRenderer),
+so changing the output does not need the trackers at all.
+
+Tracking is causal: results of a run up to frame n are results of every shorter run from the same start frame.
+A stored run therefore serves every end frame up to the one it reached.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from src.videoloader.frame_cache import cached_file_hash
+from src.videoloader.videoloader_image_sequence import list_images
+from src.visualizer.tracking_log import load_tracking_log, export_csv
+
+INDEX_FILE = "index.json"
+
+
+class ResultsStore:
+    def __init__(self, directory: str = ".results"):
+        """
+        :param directory: Directory with the logs and the index of the stored runs.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        self.index = self._load_index()
+
+    def _load_index(self) -> dict:
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE)) as file:
+                index = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = {}
+
+        index.setdefault("runs", {})
+        # content hashes of known videos, so a video is not hashed again while it is unchanged
+        index.setdefault("hashes", {})
+        return index
+
+    def _save_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(path + ".tmp", "w") as file:
+            json.dump(self.index, file, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def video_hash(self, video_path: str) -> str:
+        """
+        Content hash of a video file or of the images of an image sequence.
+        """
+        if not os.path.isdir(video_path):
+            return cached_file_hash(video_path, self.index["hashes"])
+
+        digest = hashlib.sha1()
+        for path in list_images(video_path):
+            digest.update(os.path.basename(path).encode())
+            digest.update(cached_file_hash(path, self.index["hashes"]).encode())
+        return digest.hexdigest()
+
+    def key(self, video_path: str, tracker: dict, bboxes: dict, start_frame: int = 0) -> str:
+        """
+        :param tracker: Name of the tracker and everything that changes its results, e.g. parameters and stride.
+        :param bboxes: Initial bboxes by target id.
+        """
+        description = {
+            "video": self.video_hash(video_path),
+            "tracker": tracker,
+            "bboxes": {str(target_id): [float(v) for v in bbox] for target_id, bbox in sorted(bboxes.items())},
+            "start_frame": start_frame,
+        }
+        return hashlib.sha1(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def log_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".npy")
+
+    def entry(self, key: str) -> dict:
+        """
+        :return: Description of the stored run with "end_frame" and "complete" or None.
+        """
+        entry = self.index["runs"].get(key)
+        if entry is None or not os.path.exists(self.log_path(key)):
+            return None
+        return entry
+
+    def lookup(self, key: str, end_frame: int = None) -> dict:
+        """
+        :param end_frame: Frame after the last one needed, the end of the video if None.
+        :return: Entry of the stored run that covers the range or None.
+        """
+        entry = self.entry(key)
+        if entry is None:
+            return None
+
+        if entry["complete"] or (end_frame is not None and entry["end_frame"] >= end_frame):
+            return entry
+        return None
+
+    def begin(self, key: str) -> str:
+        """
+        Forget the stored run before it is tracked again, so an interrupted run is never served.
+        :return: Path of the log the run has to write.
+        """
+        if self.index["runs"].pop(key, None) is not None:
+            self._save_index()
+        return self.log_path(key)
+
+    def save(self, key: str, end_frame: int, complete: bool, **info):
+        """
+        Register a finished run whose log was written to log_path(key).
+        :param end_frame: Frame after the last tracked one.
+        :param complete: True if the run reached the end of the video.
+        :param info: Description of the run kept in the index, e.g. video path and tracker.
+        """
+        self.index["runs"][key] = dict(info, end_frame=end_frame, complete=complete)
+        self._save_index()
+
+    def load(self, key: str, end_frame: int = None) -> np.ndarray:
+        """
+        :return: Records of the stored run before end_frame, see load_tracking_log.
+        """
+        records = load_tracking_log(self.log_path(key))
+        if end_frame is not None:
+            records = records[records["frame"] < end_frame]
+        return records
+
+    def export(self, key: str, path: str, end_frame: int = None, with_target: bool = False):
+        """
+        Write the log of a stored run to path, as CSV if it ends with .csv.
+        """
+        records = self.load(key, end_frame)
+        if os.path.splitext(path)[1].lower() == ".csv":
+            export_csv(records, path, with_target)
+        else:
+            with open(path, "wb") as file:
+                np.save(file, records)
@@ -0,0 +1,329 @@
+"""
+Core tracking loop without any GUI
+
+load -> track -> log -> draw -> write
+
+The pipeline works with a TrackerManager (one target with id 0) or a MultiTrackerManager (targets with their ids).
+Frames are annotated only when somebody looks at them: the output video or the on_frame callback,
+so a headless run without output video costs decoding and tracking only.
+Annotations are drawn on a copy of the frame in a reusable overlay buffer, the decoded frame stays clean
+and is returned to the loader (release_frame) as soon as the frame is processed, see FramePool.
+Every logged event carries the time of its frame, the capture time for live sources (see VideoLoaderLive),
+whose dropped frames advance the frame counter, so frame numbers in the log are capture indices.
+"""
+
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from src.pipeline.frame_stride import FrameStride
+from src.preprocessing import FramePreprocessor
+from src.profiling import instrumentation
+from src.tracker.multi_tracker_manager import MultiTrackerManager
+from src.videoloader.base import VideoLoaderBase
+from src.videoloader.frame_pool import FramePool
+from src.visualizer.annotation import TRACK_COLOR, PREDICT_COLOR, to_relative, copy_to_overlay, draw_bbox
+from src.visualizer.async_video_writer import AsyncVideoWriter, POLICY_BLOCK
+from src.visualizer.tracking_log import TrackingLog
+
+
+class TrackingPipeline:
+    def __init__(self,
+                 tracker_manager,
+                 video_loader: VideoLoaderBase,
+                 log_path: str = None,
+                 output_path: str = None,
+                 writer_queue_size: int = 32,
+                 writer_policy: str = POLICY_BLOCK,
+                 verbose: int = 0,
+                 start_frame: int = 0,
+                 end_frame: int = None,
+                 frame_stride: FrameStride = None):
+        """
+        :param tracker_manager: TrackerManager or MultiTrackerManager.
+        :param video_loader: Source of the frames.
+        :param log_path: Path to the log, see TrackingLog. CSV is exported at the end if it ends with .csv.
+        :param output_path: Path to the annotated output video, no video is written if None.
+        :param writer_queue_size: Number of frames waiting for the background video encoder.
+        :param writer_policy: POLICY_BLOCK or POLICY_DROP, see AsyncVideoWriter.
+        :param verbose: Print every bbox if positive.
+        :param start_frame: Index of the first processed frame, initial bboxes refer to it.
+        :param end_frame: Index of the frame after the last processed one, the end of the video if None.
+        :param frame_stride: Process only every k-th frame of the range, all frames if None.
+        """
+        if start_frame < 0 or (end_frame is not None and end_frame <= start_frame):
+            raise ValueError("Frame range has to be 0 <= start_frame < end_frame")
+
+        self.tracker_manager = tracker_manager
+        self.video_loader = video_loader
+        self.log_path = log_path
+        self.output_path = output_path
+        self.writer_queue_size = writer_queue_size
+        self.writer_policy = writer_policy
+        self.verbose = verbose
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.frame_stride = frame_stride
+
+        self.tracking_log = None
+        if log_path is not None:
+            # events are logged in binary form, CSV is exported once at the end from a temporary binary log
+            if os.path.splitext(log_path)[1].lower() == ".csv":
+                file, path = tempfile.mkstemp(suffix=".npy")
+                os.close(file)
+                self.tracking_log = TrackingLog(path)
+            else:
+                self.tracking_log = TrackingLog(log_path)
+
+        # representations of the frame shared by all trackers, e.g. grayscale
+        self.preprocessor = FramePreprocessor()
+        # overlays queued for the encoder, the one being encoded and the one being drawn
+        self.overlays = FramePool(writer_queue_size + 2)
+        self.annotated_frame = None
+        self.video_writer = None
+        self.initial_frame = None
+        self.frame_shape = None
+        self.frame_counter = 0
+        self.frame_time = None
+        # True if the loader reports capture times, e.g. a live source
+        self.timestamped = False
+        self.fps = None
+        self.bboxes = {}
+
+    @property
+    def multi_target(self) -> bool:
+        return isinstance(self.tracker_manager, MultiTrackerManager)
+
+    def open(self) -> np.ndarray:
+        """
+        Open the video and read the start frame, initial bboxes refer to it.
+        """
+        self.video_loader.open()
+        if self.start_frame > 0:
+            self.seek(self.start_frame)
+
+        frame = self.video_loader.get_frame()
+        if frame is None:
+            raise Exception(f"Video has no frame {self.start_frame}")
+
+        # the start frame is kept by front ends to select the bbox on, so it is not left in a reusable buffer
+        self.initial_frame = frame.copy()
+        self.video_loader.release_frame(frame)
+
+        self.frame_shape = self.initial_frame.shape
+        self.frame_counter = self.start_frame
+        self.fps = self.video_loader.get_fps()
+        self.timestamped = self.video_loader.get_frame_time() is not None
+        self.frame_time = self.capture_time()
+
+        if self.frame_stride is not None and not self.frame_stride.adaptive:
+            # a loader that reads ahead can skip the frames in between before they are asked for
+            self.video_loader.set_stride(self.frame_stride.stride)
+        return self.initial_frame
+
+    def capture_time(self) -> float:
+        """
+        Time of the current frame, the capture time reported by the loader or the position in the video.
+        """
+        if self.timestamped:
+            return self.video_loader.get_frame_time()
+        return self.frame_counter / self.fps if self.fps else np.nan
+
+    def seek(self, index: int):
+        if hasattr(self.video_loader, "seek"):
+            self.video_loader.seek(index)
+            return
+
+        # loaders without seeking decode and drop the frames before the start
+        for _ in range(index):
+            if self.video_loader.get_frame() is None:
+                break
+
+    def set_bbox(self, bbox, event: str = 'Click'):
+        """
+        Set the bbox of the single target of a TrackerManager in the first frame.
+        """
+        if self.multi_target:
+            raise ValueError("Targets of MultiTrackerManager are added to the manager directly")
+
+        self.tracker_manager.set_bbox(bbox)
+        self.bboxes = {0: bbox}
+        self.log_event(event, bbox)
+
+    def add_target(self, target_id: int, tracker, bbox, event: str = 'Init'):
+        """
+        Add a target of a MultiTrackerManager in the first frame.
+        """
+        if not self.multi_target:
+            raise ValueError("TrackerManager has a single target, use set_bbox")
+
+        self.tracker_manager.add_target(target_id, tracker, bbox)
+        self.bboxes[target_id] = bbox
+        self.log_event(event, bbox, target_id)
+
+    def log_event(self, event: str, bbox, target: int = 0):
+        if self.tracking_log is None:
+            return
+
+        self.tracking_log.log(self.frame_counter, event, to_relative(bbox, self.frame_shape), target, self.frame_time)
+
+    def draw_bbox(self, frame: np.ndarray, bbox, color=TRACK_COLOR):
+        """
+        Draw the bbox as it is logged, ResultsRenderer draws the same pixels from the log.
+        """
+        with instrumentation.timer("pipeline.draw"):
+            draw_bbox(frame, to_relative(bbox, frame.shape), color)
+
+    def start_video_writer(self):
+        if self.video_writer is None and self.output_path is not None:
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            fps = self.video_loader.get_fps()
+            if self.frame_stride is not None and not self.frame_stride.adaptive:
+                # only every stride-th frame is written, the output plays at the speed of the source
+                fps /= self.frame_stride.stride
+            frame_size = (self.frame_shape[1], self.frame_shape[0])
+            self.video_writer = AsyncVideoWriter(self.output_path, fourcc, fps, frame_size,
+                                                 queue_size=self.writer_queue_size,
+                                                 policy=self.writer_policy,
+                                                 pool=self.overlays)
+
+    def track(self, frame) -> dict:
+        """
+        :param frame: Frame or PreparedFrame.
+        :return: Dictionary target id -> (bbox or None, predicted).
+        """
+        if self.multi_target:
+            return {target_id: (result.bbox, False) for target_id, result in self.tracker_manager.track(frame).items()}
+
+        if not self.bboxes:
+            return {}
+        bbox = self.tracker_manager.track(frame)
+        return {0: (bbox, self.tracker_manager.is_predicted())}
+
+    def process_frame(self, frame: np.ndarray, annotate: bool = False) -> dict:
+        """
+        Track, log and optionally draw the targets on an overlay of the frame and write it to the output video.
+        The overlay is kept in annotated_frame until the next frame.
+        """
+        results = self.track(self.preprocessor.prepare(frame, self.frame_counter))
+
+        overlay = None
+        if annotate or self.video_writer is not None:
+            # a frame-sized copy, timed apart from the small drawing calls
+            with instrumentation.timer("pipeline.overlay"):
+                overlay = copy_to_overlay(frame, self.overlays)
+
+        for target_id, (bbox, predicted) in results.items():
+            if bbox is None:
+                instrumentation.count("frames_lost")
+                continue
+
+            self.bboxes[target_id] = bbox
+            event = 'Predict' if predicted else 'Track'
+            self.log_event(event, bbox, target_id)
+
+            if self.verbose > 0:
+                x, y, w, h = map(int, bbox)
+                height, width = self.frame_shape[:2]
+                print(f"{self.frame_counter}. bounding box: {x / width}, {y / height}, {w / width}, {h / height}")
+
+            if overlay is not None:
+                self.draw_bbox(overlay, bbox, PREDICT_COLOR if predicted else TRACK_COLOR)
+
+        self.annotated_frame = overlay
+        if self.video_writer is not None:
+            with instrumentation.timer("pipeline.write"):
+                # only the hand-over is timed here, encoding is writer.encode on the writer thread
+                # the writer returns the overlay to the pool once it is encoded
+                self.video_writer.write(overlay)
+
+        if self.timestamped and instrumentation.enabled:
+            instrumentation.record("pipeline.latency", time.time() - self.frame_time)
+        return results
+
+    def release_frame(self, frame: np.ndarray):
+        """
+        Return the frame and its overlay when the consumer is done with them.
+        """
+        if self.annotated_frame is not None and self.video_writer is None:
+            self.overlays.release(self.annotated_frame)
+        self.annotated_frame = None
+        # the buffer of the frame will hold a later frame, so the prepared frame must not outlive it
+        self.preprocessor.forget(self.frame_counter)
+        self.video_loader.release_frame(frame)
+
+    def frames(self):
+        """
+        The start frame followed by the rest of the frame range, every k-th frame with frame_stride.
+        A frame is released as soon as the consumer asks for the next one.
+        """
+        frame = self.initial_frame
+        while frame is not None:
+            start = time.perf_counter()
+            yield frame
+            self.release_frame(frame)
+            self.frame_counter += 1
+
+            if self.frame_stride is not None:
+                # the stride adapts to the time the consumer spent on the frame
+                skip = self.frame_stride.update(time.perf_counter() - start) - 1
+                if self.end_frame is not None:
+                    skip = min(skip, self.end_frame - self.frame_counter)
+                if skip > 0:
+                    skipped = self.video_loader.skip(skip)
+                    self.frame_counter += skipped
+                    instrumentation.count("frames_skipped", skipped)
+
+            if self.end_frame is not None and self.frame_counter >= self.end_frame:
+                break
+            frame = self.video_loader.get_frame()
+            if frame is None:
+                break
+
+            # a live source drops the frames that arrived while the previous one was processed
+            self.frame_counter += self.video_loader.get_dropped()
+            if self.end_frame is not None and self.frame_counter >= self.end_frame:
+                self.video_loader.release_frame(frame)
+                break
+            self.frame_time = self.capture_time()
+
+    def run(self, on_frame=None):
+        """
+        Process the frame range of the video.
+        :param on_frame: Callback with the annotated frame, returning False stops the run.
+        """
+        if self.initial_frame is None:
+            self.open()
+        self.start_video_writer()
+
+        try:
+            for frame in self.frames():
+                instrumentation.count("frames")
+                self.process_frame(frame, annotate=on_frame is not None)
+
+                instrumentation.maybe_report()
+                if on_frame is not None and on_frame(self.annotated_frame) is False:
+                    break
+        finally:
+            self.close()
+
+    def close(self):
+        self.video_loader.close()
+
+        if self.tracking_log is not None:
+            self.tracking_log.close()
+            if self.tracking_log.path != self.log_path:
+                try:
+                    self.tracking_log.to_csv(self.log_path, with_target=self.multi_target, with_time=self.timestamped)
+                finally:
+                    os.remove(self.tracking_log.path)
+            self.tracking_log = None
+
+        if self.video_writer is not None:
+            self.video_writer.release()
+            self.video_writer = None
+
+        self.tracker_manager.close()
@@ -0,0 +1 @@
+from src.preprocessing.frame_preprocessor import FramePreprocessor, PreparedFrame, frame_for
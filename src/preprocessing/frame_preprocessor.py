@@ -0,0 +1,140 @@
+"""
+Shared per-frame preprocessing
+
+A frame read by the loader is wrapped into a PreparedFrame. Representations of the frame, e.g. grayscale,
+other color spaces and pyramid levels, are computed on first request and kept with the frame, so when several
+trackers or targets consume the same frame, each representation is computed once.
+
+Representation names are a color space, optionally followed by @ and a pyramid level:
+"bgr" is the frame itself, "gray", "hsv", "lab", "rgb", "ycrcb" are conversions from BGR,
+"gray@2" is the grayscale frame downscaled twice by cv2.pyrDown (a quarter of the size).
+
+Trackers declare the representation they consume in TrackerBase.representation, TrackerManager hands it to them.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+
+import cv2
+import numpy as np
+
+from src.profiling import instrumentation
+
+BASE_REPRESENTATION = "bgr"
+
+COLOR_CONVERSIONS = {
+    "gray": cv2.COLOR_BGR2GRAY,
+    "hsv": cv2.COLOR_BGR2HSV,
+    "lab": cv2.COLOR_BGR2LAB,
+    "rgb": cv2.COLOR_BGR2RGB,
+    "ycrcb": cv2.COLOR_BGR2YCrCb,
+}
+
+
+def parse_representation(name: str) -> tuple:
+    """
+    :return: (color space, pyramid level).
+    """
+    color, separator, level = name.partition("@")
+    if color != BASE_REPRESENTATION and color not in COLOR_CONVERSIONS:
+        raise ValueError(f"Unknown representation: {name}. Color spaces: "
+                         f"{', '.join([BASE_REPRESENTATION, *COLOR_CONVERSIONS])}")
+    if not separator:
+        return color, 0
+    if not level.isdigit():
+        raise ValueError(f"Pyramid level of {name} has to be a non-negative integer")
+    return color, int(level)
+
+
+class PreparedFrame:
+    def __init__(self, frame: np.ndarray, index: int = None):
+        """
+        :param frame: BGR frame from the loader.
+        :param index: Index of the frame in the video.
+        """
+        self.frame = frame
+        self.index = index
+        self.representations = {BASE_REPRESENTATION: frame}
+        # number of times each representation was computed, 1 at most unless the frame is changed
+        self.computed = Counter()
+        # reentrant: a pyramid level requests the level above it while computing
+        self.lock = threading.RLock()
+
+    @property
+    def shape(self) -> tuple:
+        return self.frame.shape
+
+    def get(self, name: str = BASE_REPRESENTATION) -> np.ndarray:
+        representation = self.representations.get(name)
+        if representation is not None:
+            instrumentation.count("preprocess.reused")
+            return representation
+
+        color, level = parse_representation(name)
+        if level == 0 and color != name:
+            # "gray@0" is "gray"
+            return self.get(color)
+
+        with self.lock:
+            # another thread may have computed it meanwhile
+            if name not in self.representations:
+                self.representations[name] = self._compute(color, level)
+                self.computed[name] += 1
+            return self.representations[name]
+
+    def _compute(self, color: str, level: int) -> np.ndarray:
+        if level > 0:
+            above = self.get(color if level == 1 else f"{color}@{level - 1}")
+            with instrumentation.timer("preprocess.pyramid"):
+                return cv2.pyrDown(above)
+
+        with instrumentation.timer(f"preprocess.{color}"):
+            return cv2.cvtColor(self.frame, COLOR_CONVERSIONS[color])
+
+    def pyramid(self, levels: int, color: str = BASE_REPRESENTATION) -> list:
+        """
+        :return: List of the representation at pyramid levels 0 .. levels - 1.
+        """
+        return [self.get(color if level == 0 else f"{color}@{level}") for level in range(levels)]
+
+
+def frame_for(frame, tracker) -> np.ndarray:
+    """
+    The representation of a frame the tracker consumes, plain arrays are passed through.
+    """
+    if isinstance(frame, PreparedFrame):
+        return frame.get(getattr(tracker, "representation", BASE_REPRESENTATION))
+    return frame
+
+
+class FramePreprocessor:
+    def __init__(self, history: int = 2):
+        """
+        :param history: Number of recent frames whose representations are kept.
+        """
+        if history < 1:
+            raise ValueError("History has to be positive")
+
+        self.history = history
+        self.frames = OrderedDict()
+
+    def prepare(self, frame: np.ndarray, index: int) -> PreparedFrame:
+        """
+        :return: PreparedFrame of the frame, the same one for repeated calls with the same index.
+        """
+        prepared = self.frames.get(index)
+        if prepared is not None and prepared.frame is frame:
+            self.frames.move_to_end(index)
+            return prepared
+
+        prepared = PreparedFrame(frame, index)
+        self.frames[index] = prepared
+        while len(self.frames) > self.history:
+            self.frames.popitem(last=False)
+        return prepared
+
+    def forget(self, index: int):
+        """
+        Drop the frame, e.g. when its buffer goes back to a FramePool and will hold another frame.
+        """
+        self.frames.pop(index, None)
@@ -0,0 +1 @@
+from src.profiling.instrumentation import Instrumentation, Histogram, instrumentation
@@ -0,0 +1,170 @@
+"""
+Lightweight run-time instrumentation
+
+Stages of the pipeline report their duration with
+
+    with instrumentation.timer("loader.get_frame"):
+        ...
+
+Durations go to fixed-bucket histograms, events to counters. While instrumentation is disabled,
+timer returns a shared no-op context manager, so the cost is one attribute check per stage.
+"""
+
+import bisect
+import json
+import sys
+import time
+
+# upper bounds of the histogram buckets in milliseconds, the last bucket is unbounded
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    def __init__(self, bounds: tuple = BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """
+        Approximate percentile, the upper bound of the bucket that contains it.
+        """
+        if not self.count:
+            return float("nan")
+
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": self.total,
+            "mean_ms": self.total / self.count if self.count else float("nan"),
+            "min_ms": self.min if self.count else float("nan"),
+            "max_ms": self.max,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets_ms": list(self.bounds) + ["inf"],
+            "bucket_counts": list(self.counts),
+        }
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("instrumentation", "stage", "start")
+
+    def __init__(self, instrumentation, stage: str):
+        self.instrumentation = instrumentation
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.instrumentation.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class Instrumentation:
+    def __init__(self, enabled: bool = False, report_interval: float = None, stream=None):
+        """
+        :param enabled: Collect measurements. Disabled instrumentation costs almost nothing.
+        :param report_interval: Seconds between text lines of maybe_report. None disables them.
+        :param stream: Where report lines are written, sys.stderr by default.
+        """
+        self.enabled = enabled
+        self.report_interval = report_interval
+        self.stream = stream
+        self.histograms = {}
+        self.counters = {}
+        self.started = time.monotonic()
+        self.last_report = self.started
+
+    def enable(self, report_interval: float = None):
+        self.enabled = True
+        self.report_interval = report_interval
+        self.reset()
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.histograms = {}
+        self.counters = {}
+        self.started = time.monotonic()
+        self.last_report = self.started
+
+    def timer(self, stage: str):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage)
+
+    def record(self, stage: str, seconds: float):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = Histogram()
+        histogram.add(seconds * 1000)
+
+    def count(self, name: str, value: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self) -> dict:
+        return {
+            "elapsed_s": time.monotonic() - self.started,
+            "stages": {stage: histogram.to_dict() for stage, histogram in self.histograms.items()},
+            "counters": dict(self.counters),
+        }
+
+    def save_json(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=2)
+
+    def report_line(self) -> str:
+        stages = " ".join(f"{stage}={histogram.total / max(histogram.count, 1):.2f}ms"
+                          for stage, histogram in self.histograms.items())
+        counters = " ".join(f"{name}={value}" for name, value in self.counters.items())
+        return f"[{time.monotonic() - self.started:.1f}s] {stages} {counters}".rstrip()
+
+    def maybe_report(self):
+        """
+        Write a report line if report_interval has passed since the last one.
+        """
+        if not self.enabled or self.report_interval is None:
+            return
+
+        now = time.monotonic()
+        if now - self.last_report >= self.report_interval:
+            self.last_report = now
+            print(self.report_line(), file=self.stream or sys.stderr)
+
+
+# instrumentation shared by all stages of the pipeline
+instrumentation = Instrumentation()
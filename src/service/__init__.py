@@ -0,0 +1,2 @@
+from .tracking_service import TrackingService
+from .client import TrackingClient, ServiceError
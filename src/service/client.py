@@ -0,0 +1,113 @@
+"""
+Client of the tracking service
+
+    async with TrackingClient("127.0.0.1", 80) as client:
+        await client.open_session("KCF", (x, y, w, h))
+        for frame in frames:
+            await client.send_frame(frame)
+        ...
+        bbox = await client.receive_bbox()
+
+Frames can be sent ahead of the results, bboxes come back in the same order.
+"""
+
+import asyncio
+
+import numpy as np
+
+from src.service.protocol import read_message, write_message, encode_frame
+
+
+class ServiceError(Exception):
+    pass
+
+
+class TrackingClient:
+    def __init__(self, host: str, port: int, encoding: str = "jpeg"):
+        """
+        :param encoding: Encoding of the frames: jpeg, png or raw.
+        """
+        self.host = host
+        self.port = port
+        self.encoding = encoding
+        self.session = None
+        self.frames_sent = 0
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.disconnect()
+
+    async def receive(self) -> dict:
+        """
+        Next message from the service, error messages are raised as ServiceError.
+        """
+        message = await read_message(self.reader)
+        if message is None:
+            raise ServiceError("Connection closed by the service")
+
+        header, _ = message
+        if header["type"] == "error":
+            raise ServiceError(header["message"])
+        if header["type"] == "evicted":
+            raise ServiceError(f"Session was evicted: {header['reason']}")
+        return header
+
+    async def open_session(self, tracker: str, bbox, params: dict = None) -> int:
+        await write_message(self.writer, {"type": "open", "tracker": tracker,
+                                          "bbox": [int(v) for v in bbox], "params": params})
+        self.session = (await self.receive())["session"]
+        return self.session
+
+    async def send_frame(self, frame: np.ndarray):
+        fields, payload = encode_frame(frame, self.encoding)
+        await write_message(self.writer, {"type": "frame", "frame": self.frames_sent, **fields}, payload)
+        self.frames_sent += 1
+
+    async def receive_bbox(self):
+        """
+        :return: (frame number, bbox or None).
+        """
+        header = await self.receive()
+        if header["type"] != "bbox":
+            raise ServiceError(f"Expected a bbox, got {header['type']}")
+        return header["frame"], header["bbox"]
+
+    async def track(self, frame: np.ndarray):
+        """
+        Send a frame and wait for its bbox.
+        """
+        await self.send_frame(frame)
+        return (await self.receive_bbox())[1]
+
+    async def close_session(self) -> list:
+        """
+        Close the session after all sent frames are tracked.
+        :return: List of (frame number, bbox) that were not received yet.
+        """
+        await write_message(self.writer, {"type": "close"})
+
+        pending = []
+        header = await self.receive()
+        while header["type"] == "bbox":
+            pending.append((header["frame"], header["bbox"]))
+            header = await self.receive()
+
+        self.session = None
+        return pending
+
+    async def disconnect(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.writer = None
@@ -0,0 +1,121 @@
+"""
+Wire format of the tracking service
+
+Every message is a JSON header optionally followed by a binary payload:
+
+    [header length: uint32][payload length: uint32][header: UTF-8 JSON][payload]
+
+Client -> server:
+    {"type": "open", "tracker": "KCF", "bbox": [x, y, w, h], "params": {...}}
+    {"type": "frame", "frame": n, "encoding": "jpeg" | "png" | "raw", "shape": [h, w, 3]} + encoded frame
+    {"type": "close"}
+
+Server -> client:
+    {"type": "opened", "session": id}
+    {"type": "bbox", "frame": n, "bbox": [x, y, w, h] or null}
+    {"type": "closed", "frames": n}
+    {"type": "evicted", "reason": ...}
+    {"type": "error", "message": ...}
+
+Bboxes are sent back in the order of the frames, "shape" is needed for raw frames only.
+"""
+
+import asyncio
+import json
+import struct
+
+import cv2
+import numpy as np
+
+HEADER = struct.Struct("!II")
+
+MAX_HEADER_SIZE = 64 * 1024
+MAX_PAYLOAD_SIZE = 64 * 1024 * 1024
+
+ENCODINGS = {"jpeg": ".jpg", "png": ".png"}
+
+
+class ProtocolError(Exception):
+    pass
+
+
+async def read_message(reader: asyncio.StreamReader):
+    """
+    :return: (header, payload), payload is b"" if the message has none. None if the connection was closed.
+    """
+    try:
+        header_size, payload_size = HEADER.unpack(await reader.readexactly(HEADER.size))
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise ProtocolError("Connection closed in the middle of a message")
+        return None
+
+    if header_size > MAX_HEADER_SIZE or payload_size > MAX_PAYLOAD_SIZE:
+        raise ProtocolError(f"Message is too large: header {header_size} B, payload {payload_size} B")
+
+    try:
+        header = json.loads(await reader.readexactly(header_size))
+        payload = await reader.readexactly(payload_size) if payload_size else b""
+    except asyncio.IncompleteReadError:
+        raise ProtocolError("Connection closed in the middle of a message")
+    except ValueError as e:
+        raise ProtocolError(f"Header is not valid JSON: {e}")
+
+    if not isinstance(header, dict) or "type" not in header:
+        raise ProtocolError("Header has to be a JSON object with a type")
+
+    return header, payload
+
+
+def pack_message(header: dict, payload: bytes = b"") -> bytes:
+    data = json.dumps(header).encode()
+    return HEADER.pack(len(data), len(payload)) + data + payload
+
+
+async def write_message(writer: asyncio.StreamWriter, header: dict, payload: bytes = b""):
+    writer.write(pack_message(header, payload))
+    await writer.drain()
+
+
+def encode_frame(frame: np.ndarray, encoding: str = "jpeg") -> tuple:
+    """
+    :return: (header fields, payload) of a frame message without its type and number.
+    """
+    if encoding == "raw":
+        return {"encoding": "raw", "shape": list(frame.shape)}, np.ascontiguousarray(frame, dtype=np.uint8).tobytes()
+
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding: {encoding}. Supported encodings: raw, {', '.join(ENCODINGS)}")
+
+    success, data = cv2.imencode(ENCODINGS[encoding], frame)
+    if not success:
+        raise ValueError(f"Frame cannot be encoded as {encoding}")
+    return {"encoding": encoding}, data.tobytes()
+
+
+def _parse_shape(shape) -> tuple:
+    """
+    Shape of a raw frame, [h, w] or [h, w, 3] of positive integers.
+    """
+    if not isinstance(shape, list) or len(shape) not in (2, 3) or not all(
+            isinstance(v, int) and not isinstance(v, bool) and v > 0 for v in shape) or shape[2:] not in ([], [3]):
+        raise ProtocolError(f"Raw frame needs a shape [h, w] or [h, w, 3] of positive integers, got {shape}")
+    return tuple(shape)
+
+
+def decode_frame(header: dict, payload: bytes) -> np.ndarray:
+    encoding = header.get("encoding", "jpeg")
+
+    if encoding == "raw":
+        shape = _parse_shape(header.get("shape"))
+        if int(np.prod(shape)) != len(payload):
+            raise ProtocolError(f"Raw frame of {len(payload)} B does not match shape {shape}")
+        return np.frombuffer(payload, dtype=np.uint8).reshape(shape)
+
+    if encoding not in ENCODINGS:
+        raise ProtocolError(f"Unknown encoding: {encoding}")
+
+    frame = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ProtocolError(f"Frame cannot be decoded as {encoding}")
+    return frame
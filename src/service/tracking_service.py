@@ -0,0 +1,301 @@
+"""
+Streaming tracking service
+
+One TCP connection is one session: the client opens it with a tracker name and an initial bbox,
+pushes encoded frames and gets a bbox back for every frame, see protocol.py.
+
+Every session owns its TrackerManager. Decoding and tracking are CPU bound, they run on a thread pool
+shared by all sessions (OpenCV releases the GIL), the event loop only moves bytes. Frames of a session
+are processed one at a time in order. A session accepts at most queue_size frames ahead of the tracker,
+when the queue is full the service stops reading from the connection and TCP pushes back on the client.
+
+Sessions that neither send frames nor wait for results for idle_timeout seconds are evicted.
+"""
+
+import asyncio
+import itertools
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.profiling import instrumentation
+from src.service.protocol import ProtocolError, read_message, write_message, decode_frame
+from src.tracker.tracker_manager import TrackerManager
+from src.tracker.tracker_registry import registry
+
+# marks the end of the frames of a session in its queue
+_CLOSE = None
+
+
+def _parse_bbox(bbox) -> tuple:
+    """
+    Initial bbox of an open message, four finite numbers.
+    """
+    if not isinstance(bbox, list) or len(bbox) != 4 or not all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v) for v in bbox):
+        raise ProtocolError("Session needs an initial bbox [x, y, w, h] of four finite numbers")
+    return tuple(int(v) for v in bbox)
+
+
+def _parse_params(params) -> dict:
+    """
+    Tracker parameters of an open message, a JSON object or none.
+    """
+    if params is not None and not isinstance(params, dict):
+        raise ProtocolError("Tracker params have to be a JSON object")
+    return params
+
+
+class Session:
+    def __init__(self, session_id: int, tracker_manager: TrackerManager, writer: asyncio.StreamWriter,
+                 queue_size: int):
+        self.id = session_id
+        self.tracker_manager = tracker_manager
+        self.writer = writer
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.last_active = time.monotonic()
+        self.busy = False
+        self.frames = 0
+        self.handler = None
+        self.eviction_reason = None
+        # the tracker is released when the session ends, unless a frame is being tracked on the executor,
+        # then the executor releases it after that frame
+        self.lock = threading.Lock()
+        self.tracking = False
+        self.closed = False
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    def idle_time(self) -> float:
+        if self.busy or not self.queue.empty():
+            return 0.0
+        return time.monotonic() - self.last_active
+
+    def track(self, header: dict, payload: bytes):
+        """
+        Decode and track one frame, runs on the executor.
+        """
+        frame = decode_frame(header, payload)
+        with self.lock:
+            if self.closed:
+                raise ProtocolError("Session is closed")
+            self.tracking = True
+        try:
+            with instrumentation.timer("service.track"):
+                bbox = self.tracker_manager.track(frame)
+        finally:
+            with self.lock:
+                self.tracking = False
+                if self.closed:
+                    self.tracker_manager.close()
+        return None if bbox is None else [float(v) for v in bbox]
+
+    def release(self):
+        """
+        Release the tracker, e.g. GOTURN hands its loaded network to the next session.
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            if not self.tracking:
+                self.tracker_manager.close()
+
+
+class TrackingService:
+    def __init__(self,
+                 host: str = "0.0.0.0",
+                 port: int = 80,
+                 max_workers: int = None,
+                 max_sessions: int = 64,
+                 queue_size: int = 4,
+                 idle_timeout: float = 60.0,
+                 tracker_registry=registry):
+        """
+        :param host: Address to listen on.
+        :param port: Port to listen on, 0 picks a free port, see self.port after start.
+        :param max_workers: Number of threads decoding and tracking frames, default of ThreadPoolExecutor if None.
+        :param max_sessions: Maximum number of open sessions, new sessions are refused above it.
+        :param queue_size: Number of frames a session can send ahead of the tracker.
+        :param idle_timeout: Seconds without activity after which a session is evicted.
+        :param tracker_registry: Registry the trackers are created from.
+        """
+        if queue_size < 1:
+            raise ValueError("Queue size has to be positive")
+        if idle_timeout <= 0:
+            raise ValueError("Idle timeout has to be positive")
+
+        self.host = host
+        self.port = port
+        self.max_workers = max_workers
+        self.max_sessions = max_sessions
+        self.queue_size = queue_size
+        self.idle_timeout = idle_timeout
+        self.registry = tracker_registry
+
+        self.sessions = {}
+        # sessions being opened, they count against max_sessions while their tracker is created
+        self.opening = 0
+        self.executor = None
+        self.server = None
+        self.janitor = None
+        self._ids = itertools.count(1)
+
+    async def start(self):
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="TrackingService")
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.janitor = asyncio.create_task(self._evict_idle_sessions())
+        print(f"Tracking service is listening on {self.host}:{self.port}")
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        if self.server is None:
+            return
+
+        self.server.close()
+        self.janitor.cancel()
+        for session in list(self.sessions.values()):
+            self.evict(session, "Service is shutting down")
+
+        handlers = [session.handler for session in self.sessions.values() if session.handler is not None]
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+        self.executor.shutdown(wait=True)
+        self.server = None
+        print("Tracking service is stopped")
+
+    def evict(self, session: Session, reason: str):
+        if session.eviction_reason is None:
+            session.eviction_reason = reason
+            session.handler.cancel()
+
+    async def _evict_idle_sessions(self):
+        while True:
+            await asyncio.sleep(min(self.idle_timeout / 2, 1.0))
+            for session in list(self.sessions.values()):
+                if session.idle_time() > self.idle_timeout:
+                    instrumentation.count("sessions_evicted")
+                    self.evict(session, f"Session was idle for more than {self.idle_timeout} s")
+
+    async def _open_session(self, reader, writer):
+        message = await read_message(reader)
+        if message is None:
+            return None
+
+        header, _ = message
+        if header["type"] != "open":
+            raise ProtocolError(f"First message has to open a session, got {header['type']}")
+        if len(self.sessions) + self.opening >= self.max_sessions:
+            raise ProtocolError(f"Too many sessions, the limit is {self.max_sessions}")
+        bbox = _parse_bbox(header.get("bbox"))
+        params = _parse_params(header.get("params"))
+
+        # the slot is reserved before the first await, so concurrent opens cannot exceed the limit
+        self.opening += 1
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                # importing and creating a tracker can take a while, keep it off the event loop
+                tracker = await loop.run_in_executor(self.executor, lambda: self.registry.create(
+                    str(header.get("tracker")), params=params))
+            except ValueError as e:
+                raise ProtocolError(str(e))
+
+            tracker_manager = TrackerManager(tracker)
+            tracker_manager.set_bbox(bbox)
+
+            session = Session(next(self._ids), tracker_manager, writer, self.queue_size)
+            session.handler = asyncio.current_task()
+            self.sessions[session.id] = session
+        finally:
+            self.opening -= 1
+
+        await write_message(writer, {"type": "opened", "session": session.id})
+        return session
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session = None
+        worker = None
+        try:
+            session = await self._open_session(reader, writer)
+            if session is None:
+                return
+
+            worker = asyncio.create_task(self._process_frames(session))
+            while True:
+                message = await read_message(reader)
+                session.touch()
+
+                if message is None or message[0]["type"] == "close":
+                    await session.queue.put(_CLOSE)
+                    break
+
+                header, payload = message
+                if header["type"] != "frame":
+                    raise ProtocolError(f"Unknown message type: {header['type']}")
+
+                # blocks when the session is too far ahead of its tracker, the connection is not read meanwhile
+                await session.queue.put((header, payload))
+
+            await worker
+            if message is not None:
+                await write_message(writer, {"type": "closed", "frames": session.frames})
+        except asyncio.CancelledError:
+            if session is None or session.eviction_reason is None:
+                raise
+            await self._send_quietly(writer, {"type": "evicted", "reason": session.eviction_reason})
+        except ProtocolError as e:
+            await self._send_quietly(writer, {"type": "error", "message": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if worker is not None and not worker.done():
+                worker.cancel()
+            if session is not None:
+                self.sessions.pop(session.id, None)
+                session.release()
+            writer.close()
+
+    async def _process_frames(self, session: Session):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await session.queue.get()
+            if item is _CLOSE:
+                return
+
+            header, payload = item
+            session.busy = True
+            try:
+                bbox = await loop.run_in_executor(self.executor, session.track, header, payload)
+                response = {"type": "bbox", "frame": header.get("frame", session.frames), "bbox": bbox}
+            except ProtocolError as e:
+                response = {"type": "error", "frame": header.get("frame", session.frames), "message": str(e)}
+            except Exception as e:
+                # the tracker is in an unknown state, the session cannot continue
+                self.evict(session, f"Tracking failed: {e!r}")
+                return
+            finally:
+                session.busy = False
+
+            session.frames += 1
+            session.touch()
+            instrumentation.count("service.frames")
+            await write_message(session.writer, response)
+
+    @staticmethod
+    async def _send_quietly(writer: asyncio.StreamWriter, header: dict):
+        try:
+            await write_message(writer, header)
+        except (ConnectionError, RuntimeError):
+            pass
@@ -1,14 +1,143 @@
 from abc import ABC, abstractmethod
+import cv2
 import numpy as np
 
 
 class TrackerBase(ABC):
+    # True if the OpenCV tracker can be initialized again instead of being created anew
+    reuse_tracker = False
+    # frame representation the tracker consumes when it is given a PreparedFrame, see src.preprocessing
+    representation = "bgr"
+
     def __init__(self, bbox: np.ndarray):
         self.bbox = bbox
+        # OpenCV tracker, created by create_tracker on the first initialization
+        self.tracker = None
+
+        # search window mode, see set_search_window
+        self.search_margin = None
+        self.search_size = None
+        self.anchor_border = 0.1
+        self.window = None
+        self.window_scale = 1.0
+        self.tracker_used = False
 
     def set_bbox(self, bbox: np.ndarray):
         self.bbox = bbox
 
+    def set_search_window(self, margin: float = None, target_size: int = None, anchor_border: float = 0.1):
+        """
+        Track only in a window around the target instead of the full frame.
+        The window is anchored around the bbox when the tracker is initialized and stays in place while the target
+        is inside it. When the target comes closer than anchor_border to the window edge, the window is moved to the
+        target and the tracker is initialized again there, so tracking cost depends on target size, not frame size.
+
+        :param margin: Margin added to each side of the bbox, relative to the bbox size. None disables the mode.
+        :param target_size: Longer side of the window after downscaling in pixels. None keeps the original resolution.
+        :param anchor_border: Distance to the window edge, relative to the window size, that triggers re-anchoring.
+        """
+        if margin is not None and margin < 0:
+            raise ValueError("Search window margin has to be non-negative")
+        if target_size is not None and target_size <= 0:
+            raise ValueError("Search window size has to be positive")
+
+        self.search_margin = margin
+        self.search_size = target_size
+        self.anchor_border = anchor_border
+        self.window = None
+
+    def create_tracker(self):
+        """
+        Create the underlying OpenCV tracker. It is called lazily on the first initialization and again every time
+        the tracker has to be initialized once more, because legacy OpenCV trackers cannot be initialized twice
+        and others keep state from the previous target (see reuse_tracker).
+        """
+        return None
+
+    def release(self):
+        """
+        Drop the underlying OpenCV tracker, it is created again on the next initialization.
+        """
+        self.tracker = None
+        self.tracker_used = False
+        # set_bbox of the trackers forces initialization on the next frame
+        self.set_bbox(self.bbox)
+
+    def _init_tracker(self, frame: np.ndarray, bbox=None):
+        bbox = self.bbox if bbox is None else bbox
+
+        if self.search_margin is not None:
+            self._anchor_window(frame.shape, bbox)
+            frame, bbox = self._crop(frame), self._to_window(bbox)
+
+        if self.tracker is None or (self.tracker_used and not self.reuse_tracker):
+            self.tracker = self.create_tracker()
+
+        self.tracker.init(frame, bbox)
+        self.tracker_used = True
+
+    def _update_tracker(self, frame: np.ndarray):
+        if self.search_margin is None:
+            return self.tracker.update(frame)
+
+        success, bbox = self.tracker.update(self._crop(frame))
+        if not success:
+            return False, None
+
+        bbox = self._to_frame(bbox)
+        if self._near_window_border(bbox, frame.shape):
+            self._init_tracker(frame, tuple(int(round(v)) for v in bbox))
+
+        return True, bbox
+
+    def _anchor_window(self, frame_shape: tuple, bbox):
+        x, y, w, h = bbox
+        frame_h, frame_w = frame_shape[:2]
+
+        window_w = min(frame_w, int(round(w * (1 + 2 * self.search_margin))))
+        window_h = min(frame_h, int(round(h * (1 + 2 * self.search_margin))))
+        # shift the window inside the frame instead of shrinking it, trackers expect the same window size
+        window_x = int(min(max(x + w / 2 - window_w / 2, 0), frame_w - window_w))
+        window_y = int(min(max(y + h / 2 - window_h / 2, 0), frame_h - window_h))
+
+        self.window = (window_x, window_y, window_w, window_h)
+        self.window_scale = 1.0
+        if self.search_size is not None:
+            self.window_scale = min(1.0, self.search_size / max(window_w, window_h))
+
+    def _crop(self, frame: np.ndarray) -> np.ndarray:
+        x, y, w, h = self.window
+        patch = frame[y:y + h, x:x + w]
+
+        if self.window_scale < 1.0:
+            size = (max(1, int(round(w * self.window_scale))), max(1, int(round(h * self.window_scale))))
+            patch = cv2.resize(patch, size, interpolation=cv2.INTER_AREA)
+
+        return np.ascontiguousarray(patch)
+
+    def _to_window(self, bbox) -> tuple:
+        x, y, w, h = bbox
+        scale = self.window_scale
+        return (int(round((x - self.window[0]) * scale)), int(round((y - self.window[1]) * scale)),
+                max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+
+    def _to_frame(self, bbox) -> tuple:
+        x, y, w, h = bbox
+        scale = self.window_scale
+        return x / scale + self.window[0], y / scale + self.window[1], w / scale, h / scale
+
+    def _near_window_border(self, bbox, frame_shape: tuple) -> bool:
+        x, y, w, h = bbox
+        window_x, window_y, window_w, window_h = self.window
+        frame_h, frame_w = frame_shape[:2]
+        border_x, border_y = window_w * self.anchor_border, window_h * self.anchor_border
+
+        # window edges that lie on the frame edge cannot be moved any further
+        return (x - window_x < border_x and window_x > 0) \
+            or (y - window_y < border_y and window_y > 0) \
+            or (window_x + window_w - (x + w) < border_x and window_x + window_w < frame_w) \
+            or (window_y + window_h - (y + h) < border_y and window_y + window_h < frame_h)
+
     @abstractmethod
     def track(self, frame: np.ndarray) -> np.ndarray:
         """
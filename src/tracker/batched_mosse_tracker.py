@@ -0,0 +1,298 @@
+"""
+MOSSE correlation filter for many targets at once, in NumPy
+
+The filters of all targets are kept in stacked arrays, one slot per target. Every frame is processed with a fixed
+number of NumPy calls whatever the number of targets: cv2.remap samples the search windows of all targets into
+patches of the same size, one batched FFT transforms them, the response peaks and PSR are found with array
+operations and the filters of all targets are updated together.
+
+Removed targets free their slot for the next added target, the arrays grow by doubling only when all slots are used.
+
+See: D. S. Bolme et al., Visual Object Tracking using Adaptive Correlation Filters, CVPR 2010
+"""
+
+import cv2
+import numpy as np
+
+from src.preprocessing import frame_for
+from src.tracker.base import TrackerBase
+
+REMAP_MAX_ROWS = 32767
+
+
+class BatchedMOSSETracker(TrackerBase):
+    representation = "gray"
+
+    def __init__(self,
+                 bbox: np.ndarray = np.array([0, 0, 0, 0]),
+                 patch_size: int = 32,
+                 padding: float = 2.0,
+                 learning_rate: float = 0.125,
+                 sigma: float = 2.0,
+                 psr_threshold: float = 8.0,
+                 capacity: int = 8,
+                 augmentations: int = 8):
+        """
+        :param bbox: Bounding box of target 0, the single target when the tracker is used through TrackerManager.
+        :param patch_size: Size of the square patch every search window is sampled into, smaller patches are faster
+            but follow the target less precisely.
+        :param padding: Size of the search window relative to the bbox.
+        :param learning_rate: Weight of the current frame in the running filter average.
+        :param sigma: Width of the desired Gaussian response in patch pixels.
+        :param psr_threshold: Peak to sidelobe ratio below which the target counts as lost.
+        :param capacity: Initial number of target slots.
+        :param augmentations: Number of randomly rotated and scaled samples the filter is initialized with.
+        """
+        super().__init__(bbox)
+        if patch_size < 8 or capacity < 1 or augmentations < 1:
+            raise ValueError("Patch size has to be at least 8, capacity and augmentations have to be positive")
+
+        self.patch_size = patch_size
+        self.padding = padding
+        self.learning_rate = learning_rate
+        self.sigma = sigma
+        self.psr_threshold = psr_threshold
+        self.augmentations = augmentations
+        self.random = np.random.default_rng(0)
+
+        self.slots = {}
+        self.free_slots = []
+        self._allocate(capacity)
+        self._build_constants()
+
+        if np.any(np.asarray(bbox)[2:] > 0):
+            self.add_target(0, bbox)
+
+    def _build_constants(self):
+        size = self.patch_size
+        coordinates = np.arange(size) - size // 2
+        gaussian = np.exp(-(coordinates[None, :] ** 2 + coordinates[:, None] ** 2) / (2 * self.sigma ** 2))
+        # the desired response peaks at the patch center
+        self.target_spectrum = np.fft.rfft2(gaussian)
+        self.cosine_window = np.outer(np.hanning(size), np.hanning(size))
+        # pixel size // 2 of a patch samples the center of the search window, where the desired response peaks
+        self.grid = np.arange(size, dtype=np.float64) - size // 2
+
+    def _allocate(self, capacity: int):
+        size = self.patch_size
+        self.capacity = capacity
+        self.centers = np.zeros((capacity, 2))
+        self.sizes = np.ones((capacity, 2))
+        self.numerators = np.zeros((capacity, size, size // 2 + 1), dtype=np.complex128)
+        self.denominators = np.ones((capacity, size, size // 2 + 1), dtype=np.complex128)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.initialized = np.zeros(capacity, dtype=bool)
+        self.free_slots = list(range(capacity - 1, -1, -1))
+
+    def _grow(self):
+        old_capacity = self.capacity
+        arrays = (self.centers, self.sizes, self.numerators, self.denominators, self.active, self.initialized)
+        self._allocate(2 * old_capacity)
+        for new, old in zip((self.centers, self.sizes, self.numerators, self.denominators, self.active,
+                             self.initialized), arrays):
+            new[:old_capacity] = old
+        self.free_slots = list(range(self.capacity - 1, old_capacity - 1, -1))
+
+    def add_target(self, target_id, bbox):
+        """
+        Add a target, it is initialized on the next frame.
+        """
+        if target_id in self.slots:
+            raise ValueError(f"Target {target_id} is already tracked")
+        if not self.free_slots:
+            self._grow()
+
+        slot = self.free_slots.pop()
+        self.slots[target_id] = slot
+        self._set_slot(slot, bbox)
+
+    def remove_target(self, target_id):
+        if target_id not in self.slots:
+            raise ValueError(f"Target {target_id} is not tracked")
+
+        slot = self.slots.pop(target_id)
+        self.active[slot] = False
+        self.free_slots.append(slot)
+
+    def update_target(self, target_id, bbox):
+        """
+        Move a target to a new bbox, its filter is initialized again on the next frame.
+        """
+        if target_id not in self.slots:
+            raise ValueError(f"Target {target_id} is not tracked")
+
+        self._set_slot(self.slots[target_id], bbox)
+
+    def _set_slot(self, slot: int, bbox):
+        x, y, w, h = (float(v) for v in bbox)
+        if w <= 0 or h <= 0:
+            raise ValueError("Bounding box has to have positive size")
+
+        self.centers[slot] = (x + w / 2, y + h / 2)
+        self.sizes[slot] = (w, h)
+        self.active[slot] = True
+        self.initialized[slot] = False
+
+    def set_bbox(self, bbox):
+        self.bbox = bbox
+        if 0 in self.slots:
+            self.update_target(0, bbox)
+        else:
+            self.add_target(0, bbox)
+
+    def release(self):
+        """
+        The filters of all targets are dropped and initialized again on the next frame.
+        """
+        self.initialized[:] = False
+
+    def set_search_window(self, margin: float = None, target_size: int = None, anchor_border: float = 0.1):
+        """
+        The tracker always searches in a window around every target, its size is set with padding and patch_size.
+        """
+        raise ValueError("BatchedMOSSETracker has no search window mode, set padding and patch_size instead")
+
+    def _sample(self, frame: np.ndarray, slots: np.ndarray, angles=None, scales=None) -> np.ndarray:
+        """
+        Sample the search windows of the slots into patches (len(slots), patch_size, patch_size).
+        """
+        step = self.sizes[slots] * self.padding / self.patch_size
+        if scales is not None:
+            step = step * scales[:, None]
+
+        # sampling grid of every patch relative to its center, optionally rotated
+        grid_x = self.grid[None, None, :] * step[:, 0, None, None]
+        grid_y = self.grid[None, :, None] * step[:, 1, None, None]
+        if angles is not None:
+            cos, sin = np.cos(angles)[:, None, None], np.sin(angles)[:, None, None]
+            grid_x, grid_y = cos * grid_x - sin * grid_y, sin * grid_x + cos * grid_y
+
+        map_x = (grid_x + self.centers[slots, 0, None, None]).astype(np.float32)
+        map_y = (grid_y + self.centers[slots, 1, None, None]).astype(np.float32)
+        map_x, map_y = np.broadcast_arrays(map_x, map_y)
+
+        size = self.patch_size
+        map_x, map_y = map_x.reshape(-1, size), map_y.reshape(-1, size)
+        # remap supports maps of less than SHRT_MAX rows
+        rows = (REMAP_MAX_ROWS // size) * size
+        patches = [cv2.remap(frame, map_x[start:start + rows], map_y[start:start + rows], cv2.INTER_LINEAR,
+                             borderMode=cv2.BORDER_REPLICATE) for start in range(0, len(map_x), rows)]
+        return np.concatenate(patches).reshape(-1, size, size)
+
+    def _spectrum(self, patches: np.ndarray) -> np.ndarray:
+        patches = np.log1p(patches.astype(np.float64))
+        mean = patches.mean(axis=(1, 2), keepdims=True)
+        std = patches.std(axis=(1, 2), keepdims=True)
+        # the patches are real, half of the spectrum is enough
+        return np.fft.rfft2((patches - mean) / (std + 1e-5) * self.cosine_window)
+
+    def _initialize(self, frame: np.ndarray, slots: np.ndarray):
+        count = self.augmentations
+        repeated = np.repeat(slots, count)
+        angles = self.random.uniform(-0.1, 0.1, repeated.size)
+        scales = self.random.uniform(0.95, 1.05, repeated.size)
+        # the first sample of every target is the window itself
+        angles[::count], scales[::count] = 0, 1
+
+        spectra = self._spectrum(self._sample(frame, repeated, angles, scales))
+        spectra = spectra.reshape(len(slots), count, *spectra.shape[1:])
+        self.numerators[slots] = (self.target_spectrum * np.conj(spectra)).sum(axis=1)
+        self.denominators[slots] = (spectra * np.conj(spectra)).sum(axis=1) + 1e-3 * count
+        self.initialized[slots] = True
+
+    def _subpixel_offset(self, responses: np.ndarray, peaks: np.ndarray) -> np.ndarray:
+        """
+        Offset (dx, dy) of the response maximum from the peak pixel, by a parabola through the peak and its neighbours.
+        """
+        count, size = responses.shape[0], self.patch_size
+        targets = np.arange(count)
+        rows, columns = peaks // size, peaks % size
+        center = responses[targets, rows, columns]
+
+        offsets = []
+        for before, after in ((responses[targets, rows, (columns - 1) % size],
+                               responses[targets, rows, (columns + 1) % size]),
+                              (responses[targets, (rows - 1) % size, columns],
+                               responses[targets, (rows + 1) % size, columns])):
+            curvature = before - 2 * center + after
+            # without a maximum between the neighbours the offset is 0
+            curvature = np.where(curvature < 0, curvature, -np.inf)
+            offsets.append(np.clip((before - after) / (2 * curvature), -0.5, 0.5))
+        return np.stack(offsets, axis=1)
+
+    def _psr(self, responses: np.ndarray, peaks: np.ndarray) -> np.ndarray:
+        """
+        Peak to sidelobe ratio, the sidelobe is the response without an 11 x 11 window around the peak.
+        """
+        count, size = responses.shape[0], self.patch_size
+        flat = responses.reshape(count, -1)
+        peak_values = flat[np.arange(count), peaks]
+
+        offsets = np.arange(-5, 6)
+        rows = (peaks // size)[:, None, None] + offsets[None, :, None]
+        columns = (peaks % size)[:, None, None] + offsets[None, None, :]
+        window = responses[np.arange(count)[:, None, None], rows % size, columns % size].reshape(count, -1)
+
+        sidelobe = flat.shape[1] - window.shape[1]
+        mean = (flat.sum(axis=1) - window.sum(axis=1)) / sidelobe
+        square_mean = ((flat ** 2).sum(axis=1) - (window ** 2).sum(axis=1)) / sidelobe
+        std = np.sqrt(np.maximum(square_mean - mean ** 2, 0))
+        return (peak_values - mean) / (std + 1e-5)
+
+    def track_targets(self, frame: np.ndarray) -> dict:
+        """
+        Track all targets in the frame, new targets are initialized on it.
+        :param frame: BGR or grayscale frame, or PreparedFrame.
+        :return: Dictionary target id -> bbox (x, y, w, h), None for targets that were lost in the frame.
+        """
+        frame = frame_for(frame, self)
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        tracked = np.flatnonzero(self.active & self.initialized)
+        found = np.ones(self.capacity, dtype=bool)
+
+        if tracked.size:
+            spectra = self._spectrum(self._sample(frame, tracked))
+            size = self.patch_size
+            responses = np.fft.irfft2(spectra * self.numerators[tracked] / self.denominators[tracked], s=(size, size))
+
+            peaks = responses.reshape(tracked.size, -1).argmax(axis=1)
+            # the desired response peaks in the middle of the patch
+            shift = np.stack((peaks % size, peaks // size), axis=1) - size // 2 + self._subpixel_offset(responses, peaks)
+
+            success = self._psr(responses, peaks) >= self.psr_threshold
+            found[tracked] = success
+            moved = tracked[success]
+
+            step = self.sizes[moved] * self.padding / self.patch_size
+            height, width = frame.shape[:2]
+            self.centers[moved] = np.clip(self.centers[moved] + shift[success] * step, 0, (width - 1, height - 1))
+
+            if moved.size:
+                spectra = self._spectrum(self._sample(frame, moved))
+                rate = self.learning_rate
+                self.numerators[moved] = (1 - rate) * self.numerators[moved] \
+                    + rate * self.target_spectrum * np.conj(spectra)
+                self.denominators[moved] = (1 - rate) * self.denominators[moved] + rate * spectra * np.conj(spectra)
+
+        new = np.flatnonzero(self.active & ~self.initialized)
+        if new.size:
+            self._initialize(frame, new)
+
+        results = {}
+        for target_id, slot in self.slots.items():
+            if not found[slot]:
+                results[target_id] = None
+                continue
+            (cx, cy), (w, h) = self.centers[slot], self.sizes[slot]
+            results[target_id] = (cx - w / 2, cy - h / 2, w, h)
+        return results
+
+    def track(self, frame: np.ndarray):
+        """
+        Track target 0, the target set with set_bbox.
+        :param frame: The frame in which to track the object.
+        :return: New bounding box (x, y, w, h) where the object is found in the frame. Return None if object is not found.
+        """
+        return self.track_targets(frame).get(0)
@@ -0,0 +1,126 @@
+"""
+Cascade of a fast and a robust tracker
+
+The fast tracker (MOSSE by default) handles the video while it is confident. When it fails or its bbox
+jumps or changes size suspiciously, the robust tracker (CSRT by default) is initialized at the last good bbox
+and takes over. After it has tracked stable for a while, the fast tracker is initialized at its bbox again.
+Average cost stays close to the fast tracker, failures stay close to the robust one.
+"""
+
+import numpy as np
+
+from src.tracker.base import TrackerBase
+from src.tracker.trackers import MOSSETracker, CSRTTracker
+
+FAST = "fast"
+ROBUST = "robust"
+
+
+class CascadeTracker(TrackerBase):
+    def __init__(self,
+                 bbox: np.ndarray = np.array([0, 0, 0, 0]),
+                 fast: TrackerBase = None,
+                 robust: TrackerBase = None,
+                 max_jump: float = 0.5,
+                 max_scale_change: float = 0.3,
+                 stable_frames: int = 15):
+        """
+        :param bbox: Initial bounding box (x, y, w, h).
+        :param fast: Tracker used while tracking is stable, MOSSETracker by default.
+        :param robust: Tracker used after a failure of the fast one, CSRTTracker by default.
+        :param max_jump: Largest move of the bbox center between frames, relative to the bbox size.
+        :param max_scale_change: Largest relative change of the bbox width or height between frames.
+        :param stable_frames: Number of confident frames of the robust tracker before the fast one takes over again.
+        """
+        super().__init__(bbox)
+        self.fast = fast if fast is not None else MOSSETracker()
+        self.robust = robust if robust is not None else CSRTTracker()
+        self.max_jump = max_jump
+        self.max_scale_change = max_scale_change
+        self.stable_frames = stable_frames
+
+        self.is_initialized = False
+        self.active = FAST
+        self.last_good = None
+        self.stable_count = 0
+        self.stats = {FAST: 0, ROBUST: 0, "escalations": 0}
+
+    def is_confident(self, bbox) -> bool:
+        """
+        Heuristic check of a bbox against the last good one.
+        """
+        x, y, w, h = bbox
+        last_x, last_y, last_w, last_h = self.last_good
+        if w <= 0 or h <= 0:
+            return False
+
+        jump = np.hypot(x + w / 2 - last_x - last_w / 2, y + h / 2 - last_y - last_h / 2)
+        if jump > self.max_jump * max(last_w, last_h):
+            return False
+
+        return abs(w / last_w - 1) <= self.max_scale_change and abs(h / last_h - 1) <= self.max_scale_change
+
+    def _start(self, tracker: TrackerBase, frame: np.ndarray, bbox):
+        tracker.set_bbox(tuple(int(round(v)) for v in bbox))
+        tracker.track(frame)
+
+    def track(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Track with the fast tracker and escalate to the robust one when the fast tracker is not confident.
+
+        :param frame: The frame in which to track the object.
+        :return: New bounding box (x, y, w, h) where the object is found in the frame. Return None if object is not found.
+        """
+        if not self.is_initialized:
+            self._start(self.fast, frame, self.bbox)
+            self.is_initialized = True
+            self.active = FAST
+            self.last_good = self.bbox
+            self.stats[FAST] += 1
+            return self.bbox
+
+        if self.active == FAST:
+            bbox = self.fast.track(frame)
+            self.stats[FAST] += 1
+            if bbox is not None and self.is_confident(bbox):
+                self.last_good = bbox
+                return bbox
+
+            # the object cannot be far from the last good bbox, the robust tracker starts there
+            self._start(self.robust, frame, self.last_good)
+            self.active = ROBUST
+            self.stable_count = 0
+            self.stats["escalations"] += 1
+            return self.last_good
+
+        bbox = self.robust.track(frame)
+        self.stats[ROBUST] += 1
+        if bbox is None:
+            self.stable_count = 0
+            return None
+
+        self.stable_count = self.stable_count + 1 if self.is_confident(bbox) else 0
+        self.last_good = bbox
+
+        if self.stable_count >= self.stable_frames:
+            self._start(self.fast, frame, bbox)
+            self.active = FAST
+
+        return bbox
+
+    def set_search_window(self, margin: float = None, target_size: int = None, anchor_border: float = 0.1):
+        """
+        The cascade does not track itself, the search window is set on both stages.
+        """
+        super().set_search_window(margin, target_size, anchor_border)
+        self.fast.set_search_window(margin, target_size, anchor_border)
+        self.robust.set_search_window(margin, target_size, anchor_border)
+
+    def release(self):
+        self.fast.release()
+        self.robust.release()
+        super().release()
+
+    def set_bbox(self, bbox):
+        self.bbox = bbox
+        self.is_initialized = False
@@ -0,0 +1,85 @@
+"""
+Motion models that predict the bbox on frames where the tracker is not run
+"""
+
+import cv2
+import numpy as np
+
+
+class ConstantVelocityModel:
+    def __init__(self):
+        self.last_index = None
+        self.last_bbox = None
+        self.velocity = np.zeros(4)
+
+    def reset(self):
+        self.__init__()
+
+    def update(self, frame_index: int, bbox):
+        bbox = np.asarray(bbox, dtype=np.float64)
+
+        if self.last_bbox is not None and frame_index > self.last_index:
+            self.velocity = (bbox - self.last_bbox) / (frame_index - self.last_index)
+
+        self.last_index = frame_index
+        self.last_bbox = bbox
+
+    def predict(self, frame_index: int):
+        if self.last_bbox is None:
+            return None
+
+        bbox = self.last_bbox + self.velocity * (frame_index - self.last_index)
+        # keep the size positive when the target shrinks fast
+        bbox[2:] = np.maximum(bbox[2:], 1)
+        return tuple(bbox)
+
+
+class KalmanMotionModel:
+    def __init__(self, process_noise: float = 1e-2, measurement_noise: float = 1e-1):
+        """
+        Kalman filter over (x, y, w, h) and their velocities, one step is one frame.
+        """
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.filter = None
+        self.last_index = None
+
+    def reset(self):
+        self.filter = None
+        self.last_index = None
+
+    def _create_filter(self, bbox):
+        kalman = cv2.KalmanFilter(8, 4)
+        kalman.transitionMatrix = np.eye(8, dtype=np.float32)
+        kalman.transitionMatrix[:4, 4:] = np.eye(4, dtype=np.float32)
+        kalman.measurementMatrix = np.eye(4, 8, dtype=np.float32)
+        kalman.processNoiseCov = np.eye(8, dtype=np.float32) * self.process_noise
+        kalman.measurementNoiseCov = np.eye(4, dtype=np.float32) * self.measurement_noise
+        kalman.errorCovPost = np.eye(8, dtype=np.float32)
+        kalman.statePost = np.zeros((8, 1), dtype=np.float32)
+        kalman.statePost[:4, 0] = bbox
+        return kalman
+
+    def update(self, frame_index: int, bbox):
+        bbox = np.asarray(bbox, dtype=np.float32)
+
+        if self.filter is None:
+            self.filter = self._create_filter(bbox)
+            self.last_index = frame_index
+            return
+
+        # correct() needs a prediction for the same step first
+        for _ in range(max(1, frame_index - self.last_index)):
+            self.filter.predict()
+        self.filter.correct(bbox.reshape(4, 1))
+        self.last_index = frame_index
+
+    def predict(self, frame_index: int):
+        if self.filter is None:
+            return None
+
+        steps = max(0, frame_index - self.last_index)
+        state = np.linalg.matrix_power(self.filter.transitionMatrix, steps) @ self.filter.statePost
+        bbox = state[:4, 0].astype(np.float64)
+        bbox[2:] = np.maximum(bbox[2:], 1)
+        return tuple(bbox)
@@ -0,0 +1,146 @@
+"""
+Manager for many targets on the same frame
+
+Every target has its own TrackerBase. On each frame the trackers are updated on a thread pool:
+OpenCV releases the GIL inside tracker update, so targets are tracked in parallel
+while the frame is decoded and kept in memory only once.
+
+BatchedTrackerManager tracks all targets with one tracker that handles many targets itself (track_targets),
+e.g. BatchedMOSSETracker, so a frame costs one batched call instead of one call per target.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Hashable, NamedTuple, Optional
+
+import numpy as np
+
+from src.preprocessing import frame_for
+from src.profiling import instrumentation
+from src.tracker.base import TrackerBase
+from src.tracker.tracker_manager import check_frame
+
+
+class TrackResult(NamedTuple):
+    success: bool
+    bbox: Optional[np.ndarray]
+
+
+def _track_target(tracker: TrackerBase, frame):
+    # representations of a PreparedFrame are computed by the first tracker that needs them and shared
+    return tracker.track(frame_for(frame, tracker))
+
+
+class MultiTrackerManager:
+    def __init__(self, max_workers: int = None):
+        """
+        :param max_workers: Size of the thread pool, default of ThreadPoolExecutor if None.
+        """
+        self.trackers = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="MultiTrackerManager")
+
+    def __len__(self):
+        return len(self.trackers)
+
+    def __contains__(self, target_id):
+        return target_id in self.trackers
+
+    def add_target(self, target_id: Hashable, tracker: TrackerBase, bbox=None):
+        if target_id in self.trackers:
+            raise ValueError(f"Target {target_id} is already tracked")
+
+        if bbox is not None:
+            tracker.set_bbox(bbox)
+        self.trackers[target_id] = tracker
+
+    def remove_target(self, target_id: Hashable):
+        if target_id not in self.trackers:
+            raise ValueError(f"Target {target_id} is not tracked")
+
+        self.trackers[target_id].release()
+        del self.trackers[target_id]
+
+    def update_target(self, target_id: Hashable, bbox):
+        if target_id not in self.trackers:
+            raise ValueError(f"Target {target_id} is not tracked")
+
+        self.trackers[target_id].set_bbox(bbox)
+
+    def track(self, frame) -> dict:
+        """
+        Track all targets in the frame.
+        :param frame: The frame in which to track the objects.
+        :return: Dictionary target id -> TrackResult. Bbox is None for targets that were not found.
+        """
+        with instrumentation.timer("multi_tracker.track"):
+            return self._track(frame)
+
+    def _track(self, frame) -> dict:
+        check_frame(frame)
+
+        if not self.trackers:
+            return {}
+
+        # one target does not need the pool
+        if len(self.trackers) == 1:
+            (target_id, tracker), = self.trackers.items()
+            bbox = _track_target(tracker, frame)
+            return {target_id: TrackResult(bbox is not None, bbox)}
+
+        futures = {target_id: self.executor.submit(_track_target, tracker, frame)
+                   for target_id, tracker in self.trackers.items()}
+
+        results = {}
+        for target_id, future in futures.items():
+            bbox = future.result()
+            results[target_id] = TrackResult(bbox is not None, bbox)
+
+        return results
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for tracker in self.trackers.values():
+            tracker.release()
+
+
+class BatchedTrackerManager(MultiTrackerManager):
+    def __init__(self, tracker: TrackerBase):
+        """
+        :param tracker: Tracker of all targets, with add_target, remove_target, update_target and track_targets.
+        """
+        # the targets are tracked in one call, the thread pool is never used
+        super().__init__(max_workers=1)
+        self.tracker = tracker
+        # every target maps to the shared tracker, so len and in work as in MultiTrackerManager
+        self.trackers = {}
+
+    def add_target(self, target_id: Hashable, tracker: TrackerBase = None, bbox=None):
+        """
+        :param tracker: None or the tracker of the manager, targets cannot have their own tracker.
+        """
+        if tracker is not None and tracker is not self.tracker:
+            raise ValueError("Targets of BatchedTrackerManager are tracked by its tracker")
+        if bbox is None:
+            raise ValueError("Target needs an initial bbox")
+
+        self.tracker.add_target(target_id, bbox)
+        self.trackers[target_id] = self.tracker
+
+    def remove_target(self, target_id: Hashable):
+        self.tracker.remove_target(target_id)
+        del self.trackers[target_id]
+
+    def update_target(self, target_id: Hashable, bbox):
+        self.tracker.update_target(target_id, bbox)
+
+    def _track(self, frame) -> dict:
+        check_frame(frame)
+
+        if not self.trackers:
+            return {}
+
+        return {target_id: TrackResult(bbox is not None, bbox)
+                for target_id, bbox in self.tracker.track_targets(frame).items()}
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.tracker.release()
@@ -0,0 +1,82 @@
+"""
+Tracker manager with a per-frame latency budget
+
+When a tracker call takes longer than the budget, the frames that arrived in the meantime are not tracked.
+Their bboxes are predicted by a motion model instead, and the tracker resumes on the next frame after the gap.
+This keeps slow but accurate trackers in sync with a live source instead of lagging further behind.
+Frames are counted by their index in the source (PreparedFrame.index), so frames a stride skipped
+or a live source dropped are part of the gap and the motion model steps over them.
+"""
+
+import math
+import time
+
+from src.preprocessing import PreparedFrame
+from src.profiling import instrumentation
+from src.tracker.base import TrackerBase
+from src.tracker.motion_model import ConstantVelocityModel
+from src.tracker.tracker_manager import TrackerManager
+
+
+class RealtimeTrackerManager(TrackerManager):
+    def __init__(self,
+                 tracker: TrackerBase = None,
+                 budget: float = 1 / 30,
+                 motion_model=None):
+        """
+        :param tracker: Tracker to run.
+        :param budget: Time for one frame in seconds, usually 1 / fps of the source.
+        :param motion_model: Model that predicts skipped frames, ConstantVelocityModel by default.
+        """
+        super().__init__(tracker)
+        if budget <= 0:
+            raise ValueError("Budget has to be positive")
+
+        self.budget = budget
+        self.motion_model = motion_model if motion_model is not None else ConstantVelocityModel()
+        self.frame_index = -1
+        # frames before this index arrived while the tracker was busy
+        self.resume_index = 0
+        self.predicted = False
+        self.tracked_frames = 0
+        self.predicted_frames = 0
+
+    def set_bbox(self, bbox):
+        result = super().set_bbox(bbox)
+        self.motion_model.reset()
+        self.resume_index = 0
+        return result
+
+    def is_predicted(self):
+        return self.predicted
+
+    def track(self, frame):
+        """
+        :param frame: Frame or PreparedFrame, the index of a PreparedFrame is the index of the frame in the source.
+            Plain frames are counted as consecutive.
+        """
+        if isinstance(frame, PreparedFrame) and frame.index is not None:
+            self.frame_index = frame.index
+        else:
+            self.frame_index += 1
+
+        if self.frame_index < self.resume_index:
+            bbox = self.motion_model.predict(self.frame_index)
+            if bbox is not None:
+                self.predicted = True
+                self.predicted_frames += 1
+                instrumentation.count("frames_predicted")
+                return bbox
+
+        start = time.perf_counter()
+        bbox = super().track(frame)
+        elapsed = time.perf_counter() - start
+
+        self.predicted = False
+        self.tracked_frames += 1
+        if bbox is not None:
+            self.motion_model.update(self.frame_index, bbox)
+
+        # every budget exceeded is a frame that arrived while the tracker was busy
+        self.resume_index = self.frame_index + max(1, math.ceil(elapsed / self.budget))
+        return bbox
@@ -0,0 +1,202 @@
+"""
+Re-detection of a lost target
+
+Redetector keeps an appearance template of the target taken from the last confident bbox.
+When the tracker loses the object, the template is matched at several scales in windows of growing size
+around the last known position and finally in the whole frame at reduced resolution.
+Matching is done by cv2.matchTemplate, which scores all positions of a window in one call,
+so the whole search fits into the budget of a frame.
+
+RedetectingTracker wraps any TrackerBase and initializes it again at the re-detected bbox.
+"""
+
+import cv2
+import numpy as np
+
+from src.tracker.base import TrackerBase
+
+
+def _gray(frame: np.ndarray) -> np.ndarray:
+    if frame.ndim == 3:
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return frame
+
+
+class Redetector:
+    def __init__(self,
+                 threshold: float = 0.6,
+                 scales: tuple = (0.8, 0.9, 1.0, 1.1, 1.25),
+                 search_factors: tuple = (3, 6),
+                 full_frame_size: int = 480):
+        """
+        :param threshold: Minimum normalized correlation of a match.
+        :param scales: Scales of the template that are tried.
+        :param search_factors: Sizes of the search windows around the last bbox, relative to the bbox size.
+        :param full_frame_size: Longer side of the frame for the last, full frame search. None skips it.
+        """
+        self.threshold = threshold
+        self.scales = scales
+        self.search_factors = search_factors
+        self.full_frame_size = full_frame_size
+        self.template = None
+
+    def update_template(self, frame: np.ndarray, bbox):
+        x, y, w, h = (int(round(v)) for v in bbox)
+        x, y = max(x, 0), max(y, 0)
+        template = _gray(frame)[y:y + h, x:x + w]
+        if template.size > 0:
+            self.template = template.copy()
+
+    def similarity(self, frame: np.ndarray, bbox) -> float:
+        """
+        Normalized correlation between the template and the content of the bbox.
+        """
+        x, y, w, h = (int(round(v)) for v in bbox)
+        patch = _gray(frame)[max(y, 0):y + h, max(x, 0):x + w]
+        if self.template is None or patch.size == 0:
+            return 0.0
+
+        patch = cv2.resize(patch, (self.template.shape[1], self.template.shape[0]))
+        return float(cv2.matchTemplate(patch, self.template, cv2.TM_CCOEFF_NORMED)[0, 0])
+
+    def _match(self, region: np.ndarray, scale: float):
+        """
+        Best match of the template resized by scale in the region.
+        :return: (score, x, y, w, h) in region coordinates or None if the template does not fit.
+        """
+        h, w = self.template.shape
+        size = (max(4, int(round(w * scale))), max(4, int(round(h * scale))))
+        if size[0] > region.shape[1] or size[1] > region.shape[0]:
+            return None
+
+        template = cv2.resize(self.template, size, interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+        response = cv2.matchTemplate(region, template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (x, y) = cv2.minMaxLoc(response)
+        return score, x, y, size[0], size[1]
+
+    def _search_region(self, region: np.ndarray, scale: float, offset: tuple):
+        best = None
+        for template_scale in self.scales:
+            match = self._match(region, template_scale * scale)
+            if match is not None and (best is None or match[0] > best[0]):
+                best = match
+
+        if best is None or best[0] < self.threshold:
+            return None
+
+        score, x, y, w, h = best
+        return (x / scale + offset[0], y / scale + offset[1], w / scale, h / scale), score
+
+    def search(self, frame: np.ndarray, last_bbox):
+        """
+        :return: (bbox, score) of the best match above the threshold or None if the target is not found.
+        """
+        if self.template is None:
+            return None
+
+        gray = _gray(frame)
+        frame_h, frame_w = gray.shape
+        x, y, w, h = last_bbox
+        center_x, center_y = x + w / 2, y + h / 2
+
+        for factor in self.search_factors:
+            left = int(max(center_x - w * factor / 2, 0))
+            top = int(max(center_y - h * factor / 2, 0))
+            right = int(min(center_x + w * factor / 2, frame_w))
+            bottom = int(min(center_y + h * factor / 2, frame_h))
+
+            found = self._search_region(gray[top:bottom, left:right], 1.0, (left, top))
+            if found is not None:
+                return found
+
+        if self.full_frame_size is None:
+            return None
+
+        scale = min(1.0, self.full_frame_size / max(frame_w, frame_h))
+        small = gray if scale == 1.0 else cv2.resize(gray, (int(frame_w * scale), int(frame_h * scale)),
+                                                     interpolation=cv2.INTER_AREA)
+        return self._search_region(small, scale, (0, 0))
+
+
+class RedetectingTracker(TrackerBase):
+    def __init__(self,
+                 tracker: TrackerBase,
+                 redetector: Redetector = None,
+                 bbox: np.ndarray = None,
+                 template_interval: int = 10,
+                 template_threshold: float = 0.8):
+        """
+        :param tracker: Tracker to recover after failures.
+        :param redetector: Redetector with search settings, default one if None.
+        :param bbox: Initial bounding box, the bbox of the tracker if None.
+        :param template_interval: Number of frames between template updates.
+        :param template_threshold: Minimum similarity to the old template for a bbox to become the new template.
+        """
+        super().__init__(tracker.bbox if bbox is None else bbox)
+        self.inner = tracker
+        self.redetector = redetector if redetector is not None else Redetector()
+        self.template_interval = template_interval
+        self.template_threshold = template_threshold
+
+        self.is_initialized = False
+        self.lost = False
+        self.last_bbox = None
+        self.frames_since_template = 0
+        self.redetections = 0
+
+    def _start(self, frame: np.ndarray, bbox):
+        self.inner.set_bbox(tuple(int(round(v)) for v in bbox))
+        self.inner.track(frame)
+        self.last_bbox = bbox
+        self.lost = False
+
+    def track(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Track with the wrapped tracker and search for the target with the appearance template when it is lost.
+
+        :param frame: The frame in which to track the object.
+        :return: New bounding box (x, y, w, h) where the object is found in the frame. Return None if object is not found.
+        """
+        if not self.is_initialized:
+            self._start(frame, self.bbox)
+            self.redetector.update_template(frame, self.bbox)
+            self.frames_since_template = 0
+            self.is_initialized = True
+            return self.bbox
+
+        if not self.lost:
+            bbox = self.inner.track(frame)
+            if bbox is not None:
+                self.last_bbox = bbox
+                self.frames_since_template += 1
+                if self.frames_since_template >= self.template_interval:
+                    self.frames_since_template = 0
+                    # only confident bboxes become templates, otherwise the template drifts with the tracker
+                    if self.redetector.similarity(frame, bbox) >= self.template_threshold:
+                        self.redetector.update_template(frame, bbox)
+                return bbox
+            self.lost = True
+
+        found = self.redetector.search(frame, self.last_bbox)
+        if found is None:
+            return None
+
+        bbox, _ = found
+        self._start(frame, bbox)
+        self.redetections += 1
+        return bbox
+
+    def set_search_window(self, margin: float = None, target_size: int = None, anchor_border: float = 0.1):
+        """
+        The wrapped tracker does the tracking, the search window is set on it.
+        """
+        super().set_search_window(margin, target_size, anchor_border)
+        self.inner.set_search_window(margin, target_size, anchor_border)
+
+    def release(self):
+        self.inner.release()
+        super().release()
+
+    def set_bbox(self, bbox):
+        self.bbox = bbox
+        self.is_initialized = False
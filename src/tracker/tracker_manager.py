@@ -3,10 +3,23 @@ Manager class for postprocess and error handling
 For simple case, can be deleted
 """
 
+from src.preprocessing import PreparedFrame, frame_for
+from src.profiling import instrumentation
 from src.tracker.base import TrackerBase
 import numpy as np
 
 
+def check_frame(frame):
+    if isinstance(frame, PreparedFrame):
+        frame = frame.frame
+
+    if not isinstance(frame, np.ndarray):
+        raise ValueError("Frame has to have numpy.ndarray type")
+
+    if frame.size == 0:
+        raise ValueError("Frame is empty")
+
+
 class TrackerManager:
     def __init__(self,
                  tracker: TrackerBase = None):
@@ -22,18 +35,28 @@ class TrackerManager:
 
         raise ValueError("Tracker is not selected in TrackerManager")
 
+    def is_predicted(self):
+        """
+        True if the last bbox returned by track was predicted instead of tracked.
+        """
+        return False
+
     def track(self, frame):
         if not self.tracker:
             raise ValueError("Tracker is not selected in TrackerManager")
 
-        if not isinstance(frame, np.ndarray):
-            raise ValueError("Frame has to have numpy.ndarray type")
-
-        if frame.size == 0:
-            raise ValueError("Frame is empty")
+        check_frame(frame)
 
         try:
-            return self.tracker.track(frame)
+            with instrumentation.timer("tracker.track"):
+                return self.tracker.track(frame_for(frame, self.tracker))
         # dummy error handling
         except Exception as e:
             raise e
+
+    def close(self):
+        """
+        Release the tracker at the end of a run, e.g. GOTURN hands its loaded network to the next tracker.
+        """
+        if self.tracker is not None:
+            self.tracker.release()
@@ -0,0 +1,115 @@
+"""
+Registry of trackers by name
+
+Tracker classes are referenced by import path and imported only when a tracker of that name is created,
+so choosing a tracker does not import every tracker module. This module itself does not import OpenCV,
+command line tools can validate the tracker name before paying for any heavy import.
+
+Import and construction times are recorded for every tracker, see startup_report.
+"""
+
+import importlib
+import os
+import time
+
+TRACKER_PATHS = {
+    "BOOSTING": "src.tracker.trackers:BoostingTracker",
+    "MIL": "src.tracker.trackers:MILTracker",
+    "TLD": "src.tracker.trackers:TLDTracker",
+    "KCF": "src.tracker.trackers:KCFTracker",
+    "MOSSE": "src.tracker.trackers:MOSSETracker",
+    "MEDIANFLOW": "src.tracker.trackers:MedianFlowTracker",
+    "CSRT": "src.tracker.trackers:CSRTTracker",
+    "GOTURN": "src.tracker.trackers:GOTURNTracker",
+    "CASCADE": "src.tracker.cascade_tracker:CascadeTracker",
+    "MOSSE_BATCHED": "src.tracker.batched_mosse_tracker:BatchedMOSSETracker",
+}
+
+# files a tracker needs in the working directory
+TRACKER_FILES = {
+    "GOTURN": ("goturn.prototxt", "goturn.caffemodel"),
+}
+
+# composite and experimental trackers, run by the benchmarks only when they are named
+OPT_IN_TRACKERS = ("CASCADE", "MOSSE_BATCHED")
+
+
+class TrackerRegistry:
+    def __init__(self, paths: dict = None, files: dict = None, opt_in: tuple = None):
+        self.paths = dict(TRACKER_PATHS if paths is None else paths)
+        self.files = dict(TRACKER_FILES if files is None else files)
+        self.opt_in = set(OPT_IN_TRACKERS if opt_in is None else opt_in)
+        self.classes = {}
+        self.startup_times = {}
+
+    def register(self, name: str, tracker):
+        """
+        :param tracker: TrackerBase subclass or its import path "module:ClassName".
+        """
+        if isinstance(tracker, str):
+            self.paths[name] = tracker
+            self.classes.pop(name, None)
+        else:
+            self.paths[name] = f"{tracker.__module__}:{tracker.__qualname__}"
+            self.classes[name] = tracker
+
+    def names(self) -> list:
+        return list(self.paths)
+
+    def available(self, include_opt_in: bool = False) -> list:
+        """
+        Names of the trackers that can run in the current environment.
+        :param include_opt_in: Include the composite and experimental trackers of OPT_IN_TRACKERS.
+        """
+        return [name for name in self.paths
+                if (include_opt_in or name not in self.opt_in)
+                and all(os.path.exists(path) for path in self.files.get(name, ()))]
+
+    def __contains__(self, name):
+        return name in self.paths
+
+    def get_class(self, name: str):
+        if name not in self.paths:
+            raise ValueError(f"Unknown tracker: {name}. Supported trackers: {', '.join(self.paths)}")
+
+        if name not in self.classes:
+            start = time.perf_counter()
+            module_name, class_name = self.paths[name].split(":")
+            self.classes[name] = getattr(importlib.import_module(module_name), class_name)
+            self._record(name, "import_ms", start)
+
+        return self.classes[name]
+
+    def create(self, name: str, bbox=None, params: dict = None, **kwargs):
+        """
+        Create a tracker by name.
+        :param bbox: Initial bounding box, the default of the tracker if None.
+        :param params: Parameters of the OpenCV tracker, e.g. fields of cv2.TrackerKCF_Params.
+        :param kwargs: Other arguments of the tracker constructor.
+        """
+        tracker_class = self.get_class(name)
+        if params:
+            kwargs["params"] = params
+        if bbox is not None:
+            kwargs["bbox"] = bbox
+
+        start = time.perf_counter()
+        try:
+            tracker = tracker_class(**kwargs)
+        except TypeError as e:
+            raise ValueError(f"Wrong arguments of tracker {name}: {e}")
+        self._record(name, "create_ms", start)
+
+        return tracker
+
+    def _record(self, name: str, stage: str, start: float):
+        self.startup_times.setdefault(name, {})[stage] = (time.perf_counter() - start) * 1000
+
+    def startup_report(self) -> dict:
+        """
+        :return: Dictionary tracker name -> {"import_ms": ..., "create_ms": ...} of the trackers used so far.
+        """
+        return {name: dict(times) for name, times in self.startup_times.items()}
+
+
+registry = TrackerRegistry()
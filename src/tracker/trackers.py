@@ -16,16 +16,38 @@ import cv2
 import numpy as np
 
 
+def opencv_params(params_class, params: dict):
+    """
+    Build OpenCV tracker parameters, e.g. cv2.TrackerKCF_Params, from a dictionary of their fields.
+    """
+    result = params_class()
+    for name, value in params.items():
+        if not hasattr(result, name):
+            raise ValueError(f"Unknown parameter of {params_class.__name__}: {name}")
+        try:
+            setattr(result, name, value)
+        except TypeError as e:
+            raise ValueError(f"Wrong value of {params_class.__name__}.{name}: {e}")
+    return result
+
+
 ###################
 # MIL
 ###################
 
 class MILTracker(TrackerBase):
-    def __init__(self, bbox: np.ndarray = np.array([0, 0, 0, 0])):
+    def __init__(self, bbox: np.ndarray = np.array([0, 0, 0, 0]), params: dict = None):
         super().__init__(bbox)
-        self.tracker = cv2.TrackerMIL_create()
+        self.params = params
+        # wrong parameters are rejected when the tracker is created, not on its first frame
+        self.opencv_params = opencv_params(cv2.TrackerMIL_Params, params) if params else None
         self.is_initialized = False
 
+    def create_tracker(self):
+        if self.params:
+            return cv2.TrackerMIL_create(self.opencv_params)
+        return cv2.TrackerMIL_create()
+
     def track(self, frame: np.ndarray) -> np.ndarray:
         """
         Multiple Instance Learning (MIL) algorithm for tracking objects in video frames.
@@ -38,11 +60,11 @@ class MILTracker(TrackerBase):
         :return: New bounding box (x, y, w, h) where the object is found in the frame. Return None if object is not found.
         """
         if not self.is_initialized:
-            self.tracker.init(frame, self.bbox)
+            self._init_tracker(frame)
             self.is_initialized = True
             return self.bbox
 
-        success, bbox = self.tracker.update(frame)
+        success, bbox = self._update_tracker(frame)
         if success:
             return bbox
         else:
@@ -61,9 +83,11 @@ class MILTracker(TrackerBase):
 class BoostingTracker(TrackerBase):
     def __init__(self, bbox: np.ndarray = np.array([0, 0, 0, 0])):
         super().__init__(bbox)
-        self.tracker = cv2.legacy.TrackerBoosting_create()
         self.is_initialized = False
 
+    def create_tracker(self):
+        return cv2.legacy.TrackerBoosting_create()
+
     def track(self, frame):
         """
         The Boosting Tracker is a tracking method based on machine learning techniques. It works by training a classifier
@@ -77,11 +101,11 @@ class BoostingTracker(TrackerBase):
         :return: New bounding box (x, y, w, h) where the object is found in the frame. Return None if object is not found.
         """
         if not self.is_initialized:
-            self.tracker.init(frame, self.bbox)
+            self._init_tracker(frame)
             self.is_initialized = True
             return self.bbox
 
-        success, bbox = self.tracker.update(frame)
+        success, bbox = self._update_tracker(frame)
         return bbox if success else None
 
     def set_bbox(self, bbox):
@@ -94,11 +118,16 @@ class BoostingTracker(TrackerBase):
 ###################
 
 class MedianFlowTracker(TrackerBase):
+    # converts frames to grayscale internally, so it can share the grayscale frame with other trackers
+    representation = "gray"
+
     def __init__(self, bbox: np.ndarray = np.array([0, 0, 0, 0])):
         super().__init__(bbox)
-        self.tracker = cv2.legacy.TrackerMedianFlow_create()
         self.is_initialized = False
 
+    def create_tracker(self):
+        return cv2.legacy.TrackerMedianFlow_create()
+
     def track(self, frame):
         """
         The MedianFlow Tracker works by tracking the object in both forward and backward directions in time and
@@ -112,11 +141,11 @@ class MedianFlowTracker(TrackerBase):
         :return: New bounding box (x, y, w, h) where the object is found in the frame. Return None if object is not found.
         """
         if not self.is_initialized:
-            self.tracker.init(frame, self.bbox)
+            self._init_tracker(frame)
             self.is_initialized = True
             return self.bbox
 
-        success, bbox = self.tracker.update(frame)
+        success, bbox = self._update_tracker(frame)
 
         return bbox if success else None
 
@@ -132,9 +161,11 @@ class MedianFlowTracker(TrackerBase):
 class TLDTracker(TrackerBase):
     def __init__(self, bbox: np.ndarray = np.array([0, 0, 0, 0])):
         super().__init__(bbox)
-        self.tracker = cv2.legacy.TrackerTLD_create()
         self.is_initialized = False
 
+    def create_tracker(self):
+        return cv2.legacy.TrackerTLD_create()
+
     def track(self, frame):
         """
         The TLD (Tracking, Learning and Detection) Tracker, also known as the Predator Tracker, is designed to be robust
@@ -149,11 +180,11 @@ class TLDTracker(TrackerBase):
         :return: New bounding box (x, y, w, h) where the object is found in the frame. Return None if object is not found.
         """
         if not self.is_initialized:
-            self.tracker.init(frame, self.bbox)
+            self._init_tracker(frame)
             self.is_initialized = True
             return self.bbox
 
-        success, bbox = self.tracker.update(frame)
+        success, bbox = self._update_tracker(frame)
         return bbox if success else None
 
     def set_bbox(self, bbox):
@@ -166,11 +197,17 @@ class TLDTracker(TrackerBase):
 ###################
 
 class KCFTracker(TrackerBase):
-    def __init__(self, bbox: np.ndarray = np.array([0, 0, 0, 0])):
+    def __init__(self, bbox: np.ndarray = np.array([0, 0, 0, 0]), params: dict = None):
         super().__init__(bbox)
-        self.tracker = cv2.TrackerKCF_create()
+        self.params = params
+        self.opencv_params = opencv_params(cv2.TrackerKCF_Params, params) if params else None
         self.is_initialized = False
 
+    def create_tracker(self):
+        if self.params:
+            return cv2.TrackerKCF_create(self.opencv_params)
+        return cv2.TrackerKCF_create()
+
     def track(self, frame):
         """
         The KCF (Kernelized Correlation Filter) Tracker uses a method based on correlation filters and kernel methods.
@@ -184,11 +221,11 @@ class KCFTracker(TrackerBase):
         :return: New bounding box (x, y, w, h) where the object is found in the frame. Return None if object is not found.
         """
         if not self.is_initialized:
-            self.tracker.init(frame, self.bbox)
+            self._init_tracker(frame)
             self.is_initialized = True
             return self.bbox
 
-        success, bbox = self.tracker.update(frame)
+        success, bbox = self._update_tracker(frame)
         return bbox if success else None
 
     def set_bbox(self, bbox):
@@ -200,12 +237,39 @@ class KCFTracker(TrackerBase):
 # GOTURN
 ###################
 
+# released GOTURN trackers by (modelTxt, modelBin), they keep the loaded network
+_goturn_pool = {}
+
+
 class GOTURNTracker(TrackerBase):
-    def __init__(self, bbox: np.ndarray = np.array([0, 0, 0, 0])):
+    # GOTURN can be initialized again, so the network is loaded only once per instance
+    reuse_tracker = True
+
+    def __init__(self, bbox: np.ndarray = np.array([0, 0, 0, 0]), params: dict = None):
         super().__init__(bbox)
-        self.tracker = cv2.TrackerGOTURN_create()
+        self.params = params
+        self.opencv_params = opencv_params(cv2.TrackerGOTURN_Params, params) if params else None
         self.is_initialized = False
 
+    def create_tracker(self):
+        # loading of the network is expensive, reuse a released tracker with the same weights if there is one
+        pool = _goturn_pool.get(self._weights())
+        if pool:
+            return pool.pop()
+
+        if self.params:
+            return cv2.TrackerGOTURN_create(self.opencv_params)
+        return cv2.TrackerGOTURN_create()
+
+    def _weights(self):
+        params = self.params or {}
+        return params.get("modelTxt", "goturn.prototxt"), params.get("modelBin", "goturn.caffemodel")
+
+    def release(self):
+        if self.tracker is not None:
+            _goturn_pool.setdefault(self._weights(), []).append(self.tracker)
+        super().release()
+
     def track(self, frame):
         """
         The GOTURN (Generic Object Tracking Using Regression Networks) Tracker is a deep learning-based method.
@@ -220,11 +284,11 @@ class GOTURNTracker(TrackerBase):
         :return: New bounding box (x, y, w, h) where the object is found in the frame. Return None if object is not found.
         """
         if not self.is_initialized:
-            self.tracker.init(frame, self.bbox)
+            self._init_tracker(frame)
             self.is_initialized = True
             return self.bbox
 
-        success, bbox = self.tracker.update(frame)
+        success, bbox = self._update_tracker(frame)
         return bbox if success else None
 
     def set_bbox(self, bbox):
@@ -237,11 +301,16 @@ class GOTURNTracker(TrackerBase):
 ###################
 
 class MOSSETracker(TrackerBase):
+    # converts frames to grayscale internally, so it can share the grayscale frame with other trackers
+    representation = "gray"
+
     def __init__(self, bbox: np.ndarray = np.array([0, 0, 0, 0])):
         super().__init__(bbox)
-        self.tracker = cv2.legacy.TrackerMOSSE_create()
         self.is_initialized = False
 
+    def create_tracker(self):
+        return cv2.legacy.TrackerMOSSE_create()
+
     def track(self, frame):
         """
         The MOSSE (Minimum Output Sum of Squared Error) Tracker is a correlation filter-based method that is
@@ -256,11 +325,11 @@ class MOSSETracker(TrackerBase):
         :return: New bounding box (x, y, w, h) where the object is found in the frame. Return None if object is not found.
         """
         if not self.is_initialized:
-            self.tracker.init(frame, self.bbox)
+            self._init_tracker(frame)
             self.is_initialized = True
             return self.bbox
 
-        success, bbox = self.tracker.update(frame)
+        success, bbox = self._update_tracker(frame)
         return bbox if success else None
 
     def set_bbox(self, bbox):
@@ -273,11 +342,18 @@ class MOSSETracker(TrackerBase):
 ###################
 
 class CSRTTracker(TrackerBase):
-    def __init__(self, bbox: np.ndarray = np.array([0, 0, 0, 0])):
+    def __init__(self, bbox: np.ndarray = np.array([0, 0, 0, 0]), params: dict = None):
         super().__init__(bbox)
-        self.tracker = cv2.legacy.TrackerCSRT_create()
+        self.params = params
+        self.opencv_params = opencv_params(cv2.TrackerCSRT_Params, params) if params else None
         self.is_initialized = False
 
+    def create_tracker(self):
+        # only the new API of CSRT accepts parameters
+        if self.params:
+            return cv2.TrackerCSRT_create(self.opencv_params)
+        return cv2.legacy.TrackerCSRT_create()
+
     def track(self, frame):
         """
         The CSRT Tracker is based on the Discriminative Correlation Filter method. It combines the reliability maps
@@ -291,11 +367,11 @@ class CSRTTracker(TrackerBase):
         :return: New bounding box (x, y, w, h) where the object is found in the frame. Return None if object is not found.
         """
         if not self.is_initialized:
-            self.tracker.init(frame, self.bbox)
+            self._init_tracker(frame)
             self.is_initialized = True
             return self.bbox
 
-        success, bbox = self.tracker.update(frame)
+        success, bbox = self._update_tracker(frame)
         return bbox if success else None
 
     def set_bbox(self, bbox):
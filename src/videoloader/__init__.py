@@ -1 +1,8 @@
 from src.videoloader.videoloader_opencv import VideoLoaderOpenCV
+from src.videoloader.videoloader_prefetch import VideoLoaderPrefetch
+from src.videoloader.videoloader_cached import VideoLoaderCached
+from src.videoloader.frame_cache import FrameCache
+from src.videoloader.videoloader_image_sequence import VideoLoaderImageSequence
+from src.videoloader.frame_pool import FramePool, FramePoolError, FramePoolWarning
+from src.videoloader.videoloader_live import VideoLoaderLive
+from src.videoloader.videoloader_synthetic import VideoLoaderSynthetic
@@ -6,6 +6,46 @@ class VideoLoaderBase(ABC):
     def get_frame(self) -> np.ndarray:
         pass
 
+    def skip(self, count: int) -> int:
+        """
+        Advance past the next count frames without returning them.
+        Loaders override it when they can skip a frame cheaper than reading it.
+        :return: Number of frames skipped, less than count at the end of the video.
+        """
+        for skipped in range(count):
+            frame = self.get_frame()
+            if frame is None:
+                return skipped
+            self.release_frame(frame)
+        return count
+
+    def set_stride(self, stride: int):
+        """
+        Promise that the consumer skips stride - 1 frames after every frame it gets from now on.
+        Loaders that read ahead use it to skip those frames cheaply before the consumer asks, others ignore it.
+        """
+        pass
+
+    def release_frame(self, frame: np.ndarray):
+        """
+        Return a frame from get_frame to the loader when the consumer is done with it.
+        Loaders that decode into a FramePool reuse its buffer for a later frame, others ignore it.
+        """
+        pass
+
+    def get_frame_time(self) -> float:
+        """
+        Capture time (time.time()) of the last frame from get_frame, None for sources without capture time.
+        """
+        return None
+
+    def get_dropped(self) -> int:
+        """
+        Number of frames dropped right before the last frame from get_frame, live sources drop the frames
+        that arrived while the consumer was busy.
+        """
+        return 0
+
     def is_opened(self) -> bool:
         pass
 
@@ -0,0 +1,158 @@
+"""
+Cache of decoded videos on disk
+
+A video is decoded once into a raw uint8 file that is memory-mapped by every later run.
+Entries are keyed by the content hash of the video, its resolution and the pixel format,
+so a changed file is decoded again even if its path is the same.
+The total size of the cache is limited, least recently used videos are evicted first.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+PIXEL_FORMAT = "bgr24"
+INDEX_FILE = "index.json"
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_file_hash(path: str, hashes: dict) -> str:
+    """
+    file_hash that is computed again only when the size or modification time of the file changed.
+    :param hashes: Known hashes by absolute path, updated in place. It is kept by the caller, e.g. in a JSON index.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    known = hashes.get(path)
+    if known is not None and known["mtime"] == stat.st_mtime and known["size"] == stat.st_size:
+        return known["sha1"]
+
+    sha1 = file_hash(path)
+    hashes[path] = {"mtime": stat.st_mtime, "size": stat.st_size, "sha1": sha1}
+    return sha1
+
+
+class FrameCache:
+    def __init__(self, cache_dir: str = ".frame_cache", max_bytes: int = 16 * 1024 ** 3):
+        """
+        :param cache_dir: Directory with the decoded videos.
+        :param max_bytes: Maximum total size of the decoded videos.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.index = self._load_index()
+
+    def _load_index(self) -> dict:
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_FILE)) as file:
+                index = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = {}
+
+        index.setdefault("entries", {})
+        # content hashes of known files, so a video is not hashed again while it is unchanged
+        index.setdefault("hashes", {})
+        return index
+
+    def _save_index(self):
+        path = os.path.join(self.cache_dir, INDEX_FILE)
+        with open(path + ".tmp", "w") as file:
+            json.dump(self.index, file, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _content_hash(self, video_path: str) -> str:
+        return cached_file_hash(video_path, self.index["hashes"])
+
+    def key(self, video_path: str) -> str:
+        video = cv2.VideoCapture(video_path)
+        if not video.isOpened():
+            raise Exception(f"Failed to open video: {video_path}")
+        width = int(video.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        video.release()
+
+        return f"{self._content_hash(video_path)}_{width}x{height}_{PIXEL_FORMAT}"
+
+    def data_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".raw")
+
+    def total_bytes(self) -> int:
+        return sum(entry["bytes"] for entry in self.index["entries"].values())
+
+    def get(self, video_path: str) -> dict:
+        """
+        Return the cache entry of the video, decoding it first if it is not cached yet.
+        :return: Dictionary with "key", "shape" (frames, height, width, channels) and "fps".
+        """
+        key = self.key(video_path)
+        entry = self.index["entries"].get(key)
+
+        if entry is None or not os.path.exists(self.data_path(key)):
+            entry = self._decode(video_path, key)
+            self.index["entries"][key] = entry
+
+        entry["last_access"] = time.time()
+        self.evict(keep=key)
+        self._save_index()
+
+        return dict(entry, key=key)
+
+    def _decode(self, video_path: str, key: str) -> dict:
+        video = cv2.VideoCapture(video_path)
+        fps = video.get(cv2.CAP_PROP_FPS)
+        tmp_path = self.data_path(key) + ".tmp"
+
+        count = 0
+        shape = None
+        with open(tmp_path, "wb") as file:
+            while True:
+                ret, frame = video.read()
+                if not ret:
+                    break
+                shape = frame.shape
+                file.write(frame.tobytes())
+                count += 1
+        video.release()
+
+        if count == 0:
+            os.remove(tmp_path)
+            raise Exception(f"Video {video_path} has no frames")
+
+        os.replace(tmp_path, self.data_path(key))
+        return {"shape": [count, *shape], "fps": fps, "bytes": count * int(np.prod(shape))}
+
+    def evict(self, keep: str = None):
+        """
+        Remove least recently used videos until the cache fits into max_bytes.
+        :param keep: Key that must not be removed, usually the video that is about to be used.
+        """
+        entries = self.index["entries"]
+        for key in sorted(entries, key=lambda k: entries[k]["last_access"]):
+            if self.total_bytes() <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+
+            if os.path.exists(self.data_path(key)):
+                os.remove(self.data_path(key))
+            del entries[key]
+
+    def clear(self):
+        for key in list(self.index["entries"]):
+            if os.path.exists(self.data_path(key)):
+                os.remove(self.data_path(key))
+        self.index["entries"] = {}
+        self._save_index()
@@ -0,0 +1,101 @@
+"""
+Ring of preallocated frame buffers
+
+Reading a frame into a fresh array costs an allocation of the frame size, about 25 MB for 4K, on every frame.
+FramePool hands out the same few buffers in turn instead: the loader decodes into a borrowed buffer
+(cv2.VideoCapture.read(image=buffer)), the consumer returns it when it is done with the frame and the buffer
+is reused for a later frame, so memory stays flat however long the video is.
+
+A buffer has to be returned before the ring comes back to it, otherwise acquire raises FramePoolError.
+With check enabled, a returned buffer that is still referenced when it is reused (a stored frame, a view of it)
+is reported with FramePoolWarning: such a reference would silently see the new frame.
+"""
+
+import sys
+import threading
+import warnings
+
+import numpy as np
+
+
+class FramePoolError(Exception):
+    pass
+
+
+class FramePoolWarning(UserWarning):
+    pass
+
+
+class FramePool:
+    def __init__(self, size: int = 8, check: bool = True):
+        """
+        :param size: Number of buffers, at least the number of frames borrowed at the same time.
+        :param check: Warn when a buffer is reused while something still references it.
+        """
+        if size < 1:
+            raise ValueError("Pool size has to be positive")
+
+        self.size = size
+        self.check = check
+        self.buffers = [None] * size
+        self.borrowed = [False] * size
+        # slot of every buffer by id, buffers are compared by identity
+        self.slots = {}
+        self.next_slot = 0
+        self.allocations = 0
+        self.stale_references = 0
+        # buffers are returned from other threads, e.g. the video writer
+        self.lock = threading.Lock()
+
+    def _references(self, slot: int) -> int:
+        # references other than the pool itself and the argument of getrefcount
+        return sys.getrefcount(self.buffers[slot]) - 2
+
+    def acquire(self, shape: tuple, dtype=np.uint8) -> np.ndarray:
+        """
+        Borrow the next buffer of the ring, its content is the frame it held before.
+        """
+        with self.lock:
+            slot = self.next_slot
+            if self.borrowed[slot]:
+                raise FramePoolError(f"Frame buffer {slot} is still borrowed when the ring reuses it, "
+                                     f"a frame was not released or the pool of {self.size} buffers is too small")
+
+            buffer = self.buffers[slot]
+            if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != dtype:
+                if buffer is not None:
+                    del self.slots[id(buffer)]
+                buffer = np.empty(shape, dtype=dtype)
+                self.buffers[slot] = buffer
+                self.slots[id(buffer)] = slot
+                self.allocations += 1
+            elif self.check and self._references(slot) > 1:
+                self.stale_references += 1
+                warnings.warn(f"Frame buffer {slot} is reused while it is still referenced, "
+                              f"the reference will see the new frame", FramePoolWarning, stacklevel=2)
+
+            self.borrowed[slot] = True
+            self.next_slot = (slot + 1) % self.size
+            return buffer
+
+    def owns(self, frame) -> bool:
+        slot = self.slots.get(id(frame))
+        return slot is not None and self.buffers[slot] is frame
+
+    def release(self, frame: np.ndarray) -> bool:
+        """
+        Return a borrowed buffer to the pool.
+        :return: False if the frame is not a buffer of the pool.
+        """
+        with self.lock:
+            if not self.owns(frame):
+                return False
+
+            slot = self.slots[id(frame)]
+            if not self.borrowed[slot]:
+                raise FramePoolError(f"Frame buffer {slot} is released twice")
+            self.borrowed[slot] = False
+            return True
+
+    def borrowed_count(self) -> int:
+        return sum(self.borrowed)
@@ -0,0 +1,200 @@
+"""
+Index of the keyframes of a video for fast seeking
+
+A decoder can only start at a keyframe, so a seek to frame N decodes from the last keyframe before N.
+For MP4/MOV files the keyframes and the timestamps of all frames are read from the sample tables
+of the video track (stss, stts, ctts), which costs reading the moov box and no decoding at all.
+For other containers the keyframes are unknown and frame timestamps assume a constant frame rate.
+
+The index is cached next to the video as <video>.keyframes.json and rebuilt when the video changes.
+"""
+
+import bisect
+import json
+import os
+import struct
+
+import cv2
+import numpy as np
+
+INDEX_SUFFIX = ".keyframes.json"
+MP4_EXTENSIONS = (".mp4", ".m4v", ".mov")
+
+# boxes on the way from moov to the sample tables
+_CONTAINER_BOXES = (b"moov", b"trak", b"mdia", b"minf", b"stbl")
+
+
+def _iterate_boxes(file, start: int, end: int):
+    """
+    Yield (type, payload start, payload end) of the boxes between start and end.
+    """
+    offset = start
+    while offset + 8 <= end:
+        file.seek(offset)
+        size, box_type = struct.unpack(">I4s", file.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", file.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            raise ValueError(f"Broken MP4 box {box_type!r} at {offset}")
+
+        yield box_type, offset + header, offset + size
+        offset += size
+
+
+def _read_track(file, start: int, end: int, track: dict):
+    for box_type, payload_start, payload_end in _iterate_boxes(file, start, end):
+        if box_type in _CONTAINER_BOXES:
+            _read_track(file, payload_start, payload_end, track)
+            continue
+
+        file.seek(payload_start)
+        payload = file.read(payload_end - payload_start)
+        if box_type == b"hdlr":
+            track["handler"] = payload[8:12]
+        elif box_type == b"mdhd":
+            # version 1 has 64-bit creation and modification times
+            track["timescale"] = struct.unpack_from(">I", payload, 20 if payload[0] == 1 else 12)[0]
+        elif box_type in (b"stts", b"ctts"):
+            count = struct.unpack_from(">I", payload, 4)[0]
+            entries = np.frombuffer(payload, dtype=">u4", count=2 * count, offset=8).reshape(-1, 2)
+            # ctts offsets are signed in version 1, the unsigned ones of version 0 fit into int32 in practice
+            track[box_type.decode()] = (entries[:, 0].astype(np.int64), entries[:, 1].view(">i4").astype(np.int64))
+        elif box_type == b"stss":
+            count = struct.unpack_from(">I", payload, 4)[0]
+            track["stss"] = np.frombuffer(payload, dtype=">u4", count=count, offset=8).astype(np.int64)
+
+
+def read_mp4_index(path: str):
+    """
+    Keyframes and timestamps of the first video track of an MP4/MOV file in presentation order.
+    :return: (keyframes, timestamps in seconds) or None if the file has no readable video track.
+    """
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        moov = next(((start, end) for box_type, start, end in _iterate_boxes(file, 0, size) if box_type == b"moov"),
+                    None)
+        if moov is None:
+            return None
+
+        for box_type, start, end in _iterate_boxes(file, *moov):
+            if box_type != b"trak":
+                continue
+            track = {}
+            _read_track(file, start, end, track)
+            if track.get("handler") == b"vide" and "stts" in track and track.get("timescale"):
+                break
+        else:
+            return None
+
+    # decoding timestamps from the sample durations, presentation timestamps add the composition offsets
+    counts, durations = track["stts"]
+    decode_times = np.concatenate(([0], np.cumsum(np.repeat(durations, counts))[:-1]))
+    presentation_times = decode_times
+    if "ctts" in track:
+        counts, offsets = track["ctts"]
+        presentation_times = decode_times + np.repeat(offsets, counts)[:len(decode_times)]
+
+    # OpenCV numbers frames in presentation order, samples are in decoding order
+    order = np.argsort(presentation_times, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    if "stss" in track:
+        keyframes = np.sort(rank[track["stss"] - 1])
+    else:
+        # without a sync sample table every sample is a keyframe
+        keyframes = np.arange(len(order))
+
+    timestamps = (presentation_times[order] - presentation_times[order[0]]) / track["timescale"]
+    return keyframes.tolist(), timestamps.tolist()
+
+
+class KeyframeIndex:
+    def __init__(self, frame_count: int, fps: float, keyframes: list = None, timestamps: list = None):
+        """
+        :param keyframes: Sorted indices of the keyframes, None if they are unknown.
+        :param timestamps: Presentation time of every frame in seconds, constant frame rate if None.
+        """
+        self.frame_count = frame_count
+        self.fps = fps
+        self.keyframes = keyframes
+        self.timestamps = timestamps
+
+    @classmethod
+    def build(cls, video_path: str):
+        video = cv2.VideoCapture(video_path)
+        if not video.isOpened():
+            raise Exception(f"Failed to open video: {video_path}")
+        frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = video.get(cv2.CAP_PROP_FPS)
+        video.release()
+
+        keyframes = timestamps = None
+        if os.path.splitext(video_path)[1].lower() in MP4_EXTENSIONS:
+            try:
+                mp4_index = read_mp4_index(video_path)
+            except (ValueError, struct.error):
+                mp4_index = None
+            # trust the sample tables only when they describe the frames OpenCV decodes
+            if mp4_index is not None and len(mp4_index[1]) == frame_count:
+                keyframes, timestamps = mp4_index
+
+        return cls(frame_count, fps, keyframes, timestamps)
+
+    @classmethod
+    def load(cls, video_path: str):
+        """
+        Read the index cached next to the video, build and cache it if it is missing or the video has changed.
+        """
+        stat = os.stat(video_path)
+        index_path = video_path + INDEX_SUFFIX
+        try:
+            with open(index_path) as file:
+                data = json.load(file)
+            if data["size"] == stat.st_size and data["mtime"] == stat.st_mtime:
+                return cls(data["frame_count"], data["fps"], data["keyframes"], data["timestamps"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+        index = cls.build(video_path)
+        try:
+            with open(index_path + ".tmp", "w") as file:
+                json.dump({"size": stat.st_size, "mtime": stat.st_mtime, "frame_count": index.frame_count,
+                           "fps": index.fps, "keyframes": index.keyframes, "timestamps": index.timestamps}, file)
+            os.replace(index_path + ".tmp", index_path)
+        except OSError:
+            # read-only location, the index is simply built again next time
+            pass
+
+        return index
+
+    def keyframe_before(self, frame_index: int):
+        """
+        :return: The last keyframe at or before the frame, None if keyframes are unknown.
+        """
+        if not self.keyframes:
+            return None
+        position = bisect.bisect_right(self.keyframes, frame_index)
+        return self.keyframes[position - 1] if position else 0
+
+    def frame_at(self, seconds: float) -> int:
+        """
+        :return: Index of the frame shown at the time.
+        """
+        if seconds < 0:
+            raise ValueError("Time has to be non-negative")
+
+        if self.timestamps is None:
+            frame_index = int(seconds * self.fps + 1e-6)
+        else:
+            frame_index = bisect.bisect_right(self.timestamps, seconds + 1e-6) - 1
+        return min(max(frame_index, 0), self.frame_count)
+
+    def time_of(self, frame_index: int) -> float:
+        if self.timestamps is None or not 0 <= frame_index < len(self.timestamps):
+            return frame_index / self.fps
+        return self.timestamps[frame_index]
@@ -0,0 +1,107 @@
+"""
+Loader that serves frames from FrameCache
+
+The first open of a video decodes it into the cache, every later open only maps the decoded file.
+Frames are NumPy views on the mapped file, so reading a frame does not copy it and any frame
+can be read in O(1). The mapping is copy-on-write: drawing on a frame never changes the cache.
+"""
+
+import numpy as np
+
+from src.profiling import instrumentation
+from src.videoloader.base import VideoLoaderBase
+from src.videoloader.frame_cache import FrameCache
+
+
+class VideoLoaderCached(VideoLoaderBase):
+    def __init__(self, file_path: str, cache: FrameCache = None):
+        self.file_path = file_path
+        self.cache = cache if cache is not None else FrameCache()
+        self.frames = None
+        self.fps = None
+        self.position = 0
+
+    def __len__(self):
+        if self.frames is None:
+            raise Exception("No video is currently open")
+
+        return len(self.frames)
+
+    def get_frame(self):
+        if self.frames is None:
+            raise Exception("No video is currently open")
+
+        if self.position >= len(self.frames):
+            return None
+
+        with instrumentation.timer("loader.get_frame"):
+            frame = self.frames[self.position]
+        self.position += 1
+        return frame
+
+    def get_frame_at(self, index: int):
+        """
+        Random access to a frame, does not change the position of get_frame.
+        """
+        if self.frames is None:
+            raise Exception("No video is currently open")
+
+        if not 0 <= index < len(self.frames):
+            raise IndexError(f"Frame {index} is out of range")
+
+        return self.frames[index]
+
+    def seek(self, index: int):
+        """
+        Set the index of the next frame returned by get_frame.
+        """
+        if self.frames is None:
+            raise Exception("No video is currently open")
+
+        if not 0 <= index <= len(self.frames):
+            raise IndexError(f"Frame {index} is out of range")
+
+        self.position = index
+
+    def skip(self, count: int) -> int:
+        """
+        Advance past the next count frames without reading them.
+        """
+        index = min(self.position + count, len(self))
+        skipped = index - self.position
+        self.seek(index)
+        return skipped
+
+    def seek_time(self, seconds: float):
+        """
+        Set the next frame returned by get_frame to the frame shown at the time.
+        """
+        if seconds < 0:
+            raise ValueError("Time has to be non-negative")
+
+        self.seek(min(int(seconds * self.get_fps() + 1e-6), len(self)))
+
+    def get_fps(self):
+        if self.frames is None:
+            raise Exception("No video is currently open")
+
+        return self.fps
+
+    def is_opened(self):
+        return self.frames is not None
+
+    def open(self):
+        self.close()
+
+        entry = self.cache.get(self.file_path)
+        self.frames = np.memmap(self.cache.data_path(entry["key"]), dtype=np.uint8, mode="c",
+                                shape=tuple(entry["shape"]))
+        self.fps = entry["fps"]
+        self.position = 0
+
+        print(f"Video {self.file_path} is successfully opened from cache.")
+
+    def close(self):
+        if self.frames is not None:
+            self.frames = None
+            print("Video is successfully closed.")
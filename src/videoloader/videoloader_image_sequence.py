@@ -0,0 +1,181 @@
+"""
+Loader for directories of numbered image files
+
+Images are decoded ahead of get_frame on a thread pool, cv2.imread releases the GIL, so several
+frames are decoded at the same time. Decoded frames are kept in a queue of futures in frame order,
+so get_frame returns them in order no matter which decode finishes first.
+
+Files are ordered by the numbers in their names (frame2.jpg before frame10.jpg).
+"""
+
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from src.profiling import instrumentation
+from src.videoloader.base import VideoLoaderBase
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
+
+def _natural_key(name: str):
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", name)]
+
+
+def list_images(directory: str) -> list:
+    """
+    :return: Paths of the image files in the directory in frame order.
+    """
+    names = [name for name in os.listdir(directory) if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS]
+    return [os.path.join(directory, name) for name in sorted(names, key=_natural_key)]
+
+
+def read_image(path: str):
+    frame = cv2.imread(path, cv2.IMREAD_COLOR)
+    if frame is None:
+        raise Exception(f"Failed to read image: {path}")
+    return frame
+
+
+class VideoLoaderImageSequence(VideoLoaderBase):
+    def __init__(self, directory: str, fps: float = 30, workers: int = None, prefetch: int = None):
+        """
+        :param directory: Directory with the images.
+        :param fps: Frame rate of the sequence, images carry no timing.
+        :param workers: Number of decoding threads, number of CPUs if None.
+        :param prefetch: Number of frames decoded ahead, twice the number of workers if None.
+        """
+        if fps <= 0:
+            raise ValueError("FPS has to be positive")
+
+        self.directory = directory
+        self.fps = fps
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.prefetch = prefetch if prefetch is not None else 2 * self.workers
+        if self.workers < 1 or self.prefetch < 1:
+            raise ValueError("Number of workers and prefetched frames has to be positive")
+
+        self.paths = None
+        self.executor = None
+        self.pending = deque()
+        self.position = 0
+
+    def __len__(self):
+        if self.paths is None:
+            raise Exception("No video is currently open")
+
+        return len(self.paths)
+
+    def _fill(self):
+        # pending holds futures of frames position, position + 1, ... in order
+        while len(self.pending) < self.prefetch:
+            index = self.position + len(self.pending)
+            if index >= len(self.paths):
+                break
+            self.pending.append(self.executor.submit(read_image, self.paths[index]))
+
+    def _cancel(self):
+        for future in self.pending:
+            future.cancel()
+        self.pending.clear()
+
+    def get_frame(self):
+        if self.paths is None:
+            raise Exception("No video is currently open")
+
+        with instrumentation.timer("loader.get_frame"):
+            if not self.pending:
+                return None
+
+            frame = self.pending.popleft().result()
+            self.position += 1
+            self._fill()
+            return frame
+
+    def get_frame_at(self, index: int):
+        """
+        Random access to a frame, does not change the position of get_frame.
+        """
+        if self.paths is None:
+            raise Exception("No video is currently open")
+
+        if not 0 <= index < len(self.paths):
+            raise IndexError(f"Frame {index} is out of range")
+
+        # a frame that is already being decoded is not decoded twice
+        offset = index - self.position
+        if 0 <= offset < len(self.pending):
+            return self.pending[offset].result()
+        return read_image(self.paths[index])
+
+    def seek(self, index: int):
+        """
+        Set the index of the next frame returned by get_frame.
+        """
+        if self.paths is None:
+            raise Exception("No video is currently open")
+
+        if not 0 <= index <= len(self.paths):
+            raise IndexError(f"Frame {index} is out of range")
+
+        # keep the frames of the new position that are already decoded
+        offset = index - self.position
+        if 0 <= offset < len(self.pending):
+            for _ in range(offset):
+                self.pending.popleft()
+        else:
+            self._cancel()
+
+        self.position = index
+        self._fill()
+
+    def skip(self, count: int) -> int:
+        """
+        Advance past the next count frames without reading them.
+        """
+        index = min(self.position + count, len(self))
+        skipped = index - self.position
+        self.seek(index)
+        return skipped
+
+    def seek_time(self, seconds: float):
+        """
+        Set the next frame returned by get_frame to the frame shown at the time.
+        """
+        if seconds < 0:
+            raise ValueError("Time has to be non-negative")
+
+        self.seek(min(int(seconds * self.get_fps() + 1e-6), len(self)))
+
+    def get_fps(self):
+        if self.paths is None:
+            raise Exception("No video is currently open")
+
+        return self.fps
+
+    def is_opened(self):
+        return self.paths is not None
+
+    def open(self):
+        self.close()
+
+        if not os.path.isdir(self.directory):
+            raise Exception(f"Failed to open image sequence: {self.directory}")
+
+        self.paths = list_images(self.directory)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="VideoLoaderImageSequence")
+        self.position = 0
+        self._fill()
+
+        print(f"Image sequence {self.directory} is successfully opened ({len(self.paths)} frames).")
+
+    def close(self):
+        if self.paths is not None:
+            self._cancel()
+            self.executor.shutdown(wait=True)
+            self.executor = None
+            self.paths = None
+            print("Video is successfully closed.")
@@ -0,0 +1,163 @@
+"""
+Latest-frame loader for live sources
+
+A camera or a stream keeps producing frames whether the tracker keeps up or not. Read in order, the frames
+of a slower tracker queue up in the capture buffer and the delay between capture and result grows without bound.
+VideoLoaderLive drains the wrapped loader on a background thread and keeps only the newest frame: get_frame
+returns the latest frame that was not returned yet and the frames that arrived in between are dropped.
+The delay is then bounded by one tracking step plus one frame interval.
+
+Every frame is stamped with its capture time (get_frame_time), the time the source reports or the time it
+was read, and get_dropped tells how many frames were dropped right before it.
+"""
+
+import threading
+import time
+
+from src.profiling import instrumentation
+from src.videoloader.base import VideoLoaderBase
+
+
+class VideoLoaderLive(VideoLoaderBase):
+    def __init__(self, loader: VideoLoaderBase, pace: bool = False):
+        """
+        :param loader: Live source, e.g. VideoLoaderOpenCV of a camera or a stream URL.
+        :param pace: Read the source at its frame rate, so a video file stands in for a live stream.
+        """
+        self.loader = loader
+        self.pace = pace
+
+        self.thread = None
+        self.stop_event = threading.Event()
+        # guards the latest frame, notified when a frame arrives or the source ends
+        self.condition = threading.Condition()
+        self.latest = None
+        self.finished = False
+        self.error = None
+        self.fps = None
+
+        self.received = 0
+        self.dropped = 0
+        self.pending_dropped = 0
+        self.last_dropped = 0
+        self.frame_time = None
+
+    def _capture_time(self, index: int, start: float) -> float:
+        frame_time = self.loader.get_frame_time()
+        if frame_time is not None:
+            return frame_time
+
+        if self.pace:
+            due = start + index / self.fps
+            delay = due - time.time()
+            if delay > 0:
+                # wait for the time the frame would be captured, close() interrupts the wait
+                self.stop_event.wait(delay)
+            return due
+        return time.time()
+
+    def _drain(self):
+        start = time.time()
+        index = 0
+        try:
+            while not self.stop_event.is_set():
+                frame = self.loader.get_frame()
+                if frame is None:
+                    break
+                capture_time = self._capture_time(index, start)
+                index += 1
+
+                with self.condition:
+                    if self.latest is not None:
+                        # the consumer did not take the previous frame in time
+                        self.loader.release_frame(self.latest[0])
+                        self.pending_dropped += 1
+                        self.dropped += 1
+                        instrumentation.count("frames_dropped")
+                    self.latest = (frame, capture_time)
+                    self.received += 1
+                    self.condition.notify()
+        except Exception as e:
+            self.error = e
+        finally:
+            with self.condition:
+                self.finished = True
+                self.condition.notify()
+
+    def get_frame(self):
+        """
+        Newest frame not returned yet, waits for the next one if there is none. None at the end of the source.
+        """
+        if self.thread is None:
+            raise Exception("No video is currently open")
+
+        with self.condition:
+            while self.latest is None and not self.finished:
+                self.condition.wait()
+
+            if self.latest is None:
+                if self.error is not None:
+                    error, self.error = self.error, None
+                    raise error
+                return None
+
+            frame, self.frame_time = self.latest
+            self.latest = None
+            self.last_dropped = self.pending_dropped
+            self.pending_dropped = 0
+
+        if instrumentation.enabled:
+            instrumentation.record("loader.frame_age", time.time() - self.frame_time)
+        return frame
+
+    def release_frame(self, frame):
+        self.loader.release_frame(frame)
+
+    def get_frame_time(self) -> float:
+        return self.frame_time
+
+    def get_dropped(self) -> int:
+        return self.last_dropped
+
+    def get_fps(self):
+        if self.thread is None:
+            raise Exception("No video is currently open")
+
+        # the inner loader is owned by the drain thread, so fps is read once at open
+        return self.fps
+
+    def is_opened(self):
+        return self.thread is not None and not self.finished
+
+    def open(self, **kwargs):
+        self.close()
+
+        self.loader.open(**kwargs)
+        self.fps = self.loader.get_fps()
+        if self.pace and not self.fps:
+            raise ValueError("Pacing needs the frame rate of the source")
+
+        self.latest = None
+        self.finished = False
+        self.error = None
+        self.received = 0
+        self.dropped = 0
+        self.pending_dropped = 0
+        self.last_dropped = 0
+        self.frame_time = None
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._drain, name="VideoLoaderLive", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        if self.thread is None:
+            return
+
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        if self.latest is not None:
+            self.loader.release_frame(self.latest[0])
+            self.latest = None
+        self.loader.close()
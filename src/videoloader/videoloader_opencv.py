@@ -5,24 +5,116 @@ be implemented manually
 """
 
 import cv2
+from src.profiling import instrumentation
 from src.videoloader.base import VideoLoaderBase
+from src.videoloader.frame_pool import FramePool
+from src.videoloader.keyframe_index import KeyframeIndex
+
+# cv2.VideoCapture seeks to this many frames before the target and decodes forward from the keyframe before that
+OPENCV_SEEK_MARGIN = 16
 
 
 class VideoLoaderOpenCV(VideoLoaderBase):
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, pool: FramePool = None):
+        """
+        :param file_path: Path to the video file.
+        :param pool: Decode into buffers of the pool instead of a new array for every frame.
+            Frames have to be returned with release_frame then.
+        """
         self.video = None
         self.file_path = file_path
+        self.pool = pool
+        self.frame_shape = None
+        self.position = 0
+        self.keyframe_index = None
 
     def get_frame(self):
         if self.video is None:
             raise Exception("No video is currently open")
 
-        ret, frame = self.video.read()
+        with instrumentation.timer("loader.get_frame"):
+            if self.pool is None:
+                ret, frame = self.video.read()
+            else:
+                buffer = self.pool.acquire(self.frame_shape)
+                ret, frame = self.video.read(image=buffer)
+                if frame is not buffer:
+                    # end of the video or a frame of another size, the next buffer gets the new size
+                    self.pool.release(buffer)
+                    if ret:
+                        self.frame_shape = frame.shape
         if not ret:
             return None
 
+        self.position += 1
         return frame
 
+    def release_frame(self, frame):
+        if self.pool is not None:
+            self.pool.release(frame)
+
+    def skip(self, count: int) -> int:
+        """
+        Advance past the next count frames with grab, skipped frames are never retrieved nor converted to BGR.
+        """
+        if self.video is None:
+            raise Exception("No video is currently open")
+
+        skipped = 0
+        with instrumentation.timer("loader.skip"):
+            while skipped < count and self.video.grab():
+                skipped += 1
+
+        self.position += skipped
+        instrumentation.count("frames_grabbed", skipped)
+        return skipped
+
+    def get_keyframe_index(self) -> KeyframeIndex:
+        """
+        Keyframe index of the video, built on first use and cached next to the video.
+        """
+        if self.keyframe_index is None:
+            self.keyframe_index = KeyframeIndex.load(self.file_path)
+        return self.keyframe_index
+
+    def __len__(self):
+        return self.get_keyframe_index().frame_count
+
+    def get_position(self) -> int:
+        """
+        Index of the next frame returned by get_frame.
+        """
+        return self.position
+
+    def seek(self, index: int):
+        """
+        Set the index of the next frame returned by get_frame.
+        Decodes forward from the current position when that is cheaper than decoding from a keyframe.
+        """
+        if self.video is None:
+            raise Exception("No video is currently open")
+
+        keyframe_index = self.get_keyframe_index()
+        if not 0 <= index <= keyframe_index.frame_count:
+            raise IndexError(f"Frame {index} is out of range")
+
+        with instrumentation.timer("loader.seek"):
+            keyframe = keyframe_index.keyframe_before(max(index - OPENCV_SEEK_MARGIN, 0))
+            # without known keyframes, decoding forward is preferred up to one seek margin
+            seek_cost = index - keyframe if keyframe is not None else OPENCV_SEEK_MARGIN
+            if not self.position <= index <= self.position + seek_cost:
+                self.video.set(cv2.CAP_PROP_POS_FRAMES, index)
+                self.position = index
+
+            while self.position < index and self.video.grab():
+                self.position += 1
+
+    def seek_time(self, seconds: float):
+        """
+        Set the next frame returned by get_frame to the frame shown at the time.
+        """
+        self.seek(self.get_keyframe_index().frame_at(seconds))
+
     def get_fps(self):
         if self.video is None:
             raise Exception("No video is currently open")
@@ -40,6 +132,9 @@ class VideoLoaderOpenCV(VideoLoaderBase):
         if not self.video.isOpened():
             raise Exception(f"Failed to open video: {self.file_path}")
 
+        self.position = 0
+        self.frame_shape = (int(self.video.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                            int(self.video.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
         print(f"Video {self.file_path} is successfully opened.")
 
     def close(self):
@@ -0,0 +1,208 @@
+"""
+Loader that decodes ahead of the consumer
+
+Any VideoLoaderBase can be wrapped. Frames are read on a producer thread into a bounded queue,
+so decoding of the next frames overlaps with tracking of the current one.
+OpenCV releases the GIL while decoding, so the threads really run in parallel.
+
+Frames are numbered from open or the last seek. skip only moves the index of the frame the consumer wants next,
+the producer skips (e.g. grabs) the frames it has not read yet and the consumer drops the ones decoded before.
+With a fixed stride (set_stride) the producer reads only every stride-th frame and skips the others ahead of time.
+"""
+
+import queue
+import threading
+
+from src.profiling import instrumentation
+from src.videoloader.base import VideoLoaderBase
+
+
+class _EndOfVideo:
+    pass
+
+
+class _LoaderError:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class VideoLoaderPrefetch(VideoLoaderBase):
+    def __init__(self, loader: VideoLoaderBase, queue_size: int = 8):
+        """
+        :param loader: Loader to read frames from. It is opened and closed by this loader.
+        :param queue_size: Maximum number of decoded frames waiting for the consumer.
+        """
+        if queue_size < 1:
+            raise ValueError("Queue size has to be positive")
+
+        self.loader = loader
+        self.queue_size = queue_size
+        self.frames = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.finished = False
+        self.fps = None
+
+        # index of the frame the consumer wants next, set by get_frame and skip and read by the producer
+        self.position = 0
+        self.stride = 1
+        # (index of the first frame, stride) of the frames the producer reads, replaced as a whole
+        self.grid = (0, 1)
+
+    def _next_wanted(self, index: int) -> int:
+        # first frame at or after index the consumer can still ask for
+        anchor, stride = self.grid
+        if index > anchor:
+            index = anchor + -(-(index - anchor) // stride) * stride
+        return max(index, self.position)
+
+    def _produce(self):
+        # index of the next frame of the wrapped loader
+        index = 0
+        try:
+            while not self.stop_event.is_set():
+                wanted = self._next_wanted(index)
+                if wanted > index:
+                    skipped = self.loader.skip(wanted - index)
+                    index += skipped
+                    if index < wanted:
+                        self._put(_EndOfVideo())
+                        return
+
+                frame = self.loader.get_frame()
+                item = _EndOfVideo() if frame is None else (index, frame)
+                if not self._put(item):
+                    if frame is not None:
+                        self.loader.release_frame(frame)
+                    return
+                if frame is None:
+                    return
+                index += 1
+        except Exception as e:
+            self._put(_LoaderError(e))
+
+    def _put(self, item) -> bool:
+        # wake up from time to time to notice close() while the queue is full
+        while not self.stop_event.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get_frame(self):
+        if self.thread is None:
+            raise Exception("No video is currently open")
+
+        if self.finished:
+            return None
+
+        while True:
+            # decoding is timed as loader.get_frame on the producer thread, this is the time the consumer waits for it
+            with instrumentation.timer("loader.wait"):
+                item = self.frames.get()
+            if isinstance(item, _EndOfVideo):
+                self.finished = True
+                return None
+            if isinstance(item, _LoaderError):
+                self.finished = True
+                raise item.error
+
+            index, frame = item
+            if index < self.position:
+                # decoded before the consumer skipped it
+                self.loader.release_frame(frame)
+                continue
+            if index > self.position:
+                self.loader.release_frame(frame)
+                self.finished = True
+                raise Exception(f"Frame {self.position} was skipped ahead, the consumer did not keep the stride "
+                                f"{self.stride}")
+
+            self.position += 1
+            return frame
+
+    def skip(self, count: int) -> int:
+        """
+        Skip the next count frames, the producer skips the ones it has not read yet.
+        The end of the video is found by the producer later, so all count frames are reported as skipped
+        and get_frame returns None afterwards.
+        """
+        if self.thread is None:
+            raise Exception("No video is currently open")
+
+        self.position += count
+        return count
+
+    def set_stride(self, stride: int):
+        if stride < 1:
+            raise ValueError("Stride has to be positive")
+
+        self.stride = stride
+        # the frame the consumer got last is the first frame of the grid
+        self.grid = (self.position - 1, stride)
+
+    def release_frame(self, frame):
+        self.loader.release_frame(frame)
+
+    def seek(self, index: int):
+        """
+        Seek the wrapped loader, frames decoded ahead are dropped.
+        """
+        self._restart(lambda: self.loader.seek(index))
+
+    def seek_time(self, seconds: float):
+        self._restart(lambda: self.loader.seek_time(seconds))
+
+    def _restart(self, seek):
+        if self.thread is None:
+            raise Exception("No video is currently open")
+
+        # the inner loader is owned by the producer thread, it has to stop before the loader can seek
+        self._stop_producer()
+        seek()
+        self._start_producer()
+
+    def get_fps(self):
+        if self.thread is None:
+            raise Exception("No video is currently open")
+
+        # the inner loader is owned by the producer thread, so fps is read once at open
+        return self.fps
+
+    def is_opened(self):
+        return self.thread is not None and not self.finished
+
+    def open(self, **kwargs):
+        self.close()
+
+        self.loader.open(**kwargs)
+        self.fps = self.loader.get_fps()
+        self._start_producer()
+
+    def _start_producer(self):
+        self.frames = queue.Queue(maxsize=self.queue_size)
+        self.stop_event.clear()
+        self.finished = False
+        # the first frame after open or a seek starts the grid of the stride
+        self.position = 0
+        self.grid = (0, self.stride)
+        self.thread = threading.Thread(target=self._produce, name="VideoLoaderPrefetch", daemon=True)
+        self.thread.start()
+
+    def _stop_producer(self):
+        self.stop_event.set()
+        self.thread.join()
+        # frames decoded ahead that nobody will read go back to the loader
+        while not self.frames.empty():
+            item = self.frames.get_nowait()
+            if not isinstance(item, (_EndOfVideo, _LoaderError)):
+                self.loader.release_frame(item[1])
+        self.thread = None
+        self.frames = None
+
+    def close(self):
+        if self.thread is not None:
+            self._stop_producer()
+            self.loader.close()
@@ -0,0 +1,113 @@
+"""
+Synthetic timed source, a stand-in for a live camera
+
+Frames are generated on the schedule of a camera running at fps: frame i is captured open time + i / fps,
+get_frame waits for it and reports that time as its capture time. A consumer that is slower than the camera
+gets the frames in order with growing delay, like from the buffer of a real capture device.
+
+A textured rectangle moves over a textured background along a smooth path, bbox_at gives its ground truth.
+"""
+
+import math
+import time
+
+import numpy as np
+
+from src.videoloader.base import VideoLoaderBase
+
+
+class VideoLoaderSynthetic(VideoLoaderBase):
+    def __init__(self,
+                 fps: float = 30,
+                 frame_count: int = None,
+                 size: tuple = (320, 240),
+                 target_size: tuple = (48, 36),
+                 period: float = 120,
+                 seed: int = 0):
+        """
+        :param fps: Frame rate of the simulated camera.
+        :param frame_count: Number of frames before the source ends, endless if None.
+        :param size: Frame size (width, height).
+        :param target_size: Size of the moving target (width, height).
+        :param period: Number of frames of one loop of the target path.
+        :param seed: Seed of the textures.
+        """
+        if fps <= 0:
+            raise ValueError("FPS has to be positive")
+        if target_size[0] >= size[0] or target_size[1] >= size[1]:
+            raise ValueError("Target has to be smaller than the frame")
+
+        self.fps = fps
+        self.frame_count = frame_count
+        self.size = size
+        self.target_size = target_size
+        self.period = period
+
+        random = np.random.default_rng(seed)
+        width, height = size
+        self.background = random.integers(0, 96, (height, width, 3), dtype=np.uint8)
+        self.target = random.integers(128, 256, (target_size[1], target_size[0], 3), dtype=np.uint8)
+
+        self.start_time = None
+        self.position = 0
+        self.frame_time = None
+
+    def bbox_at(self, index: int) -> tuple:
+        """
+        Bbox (x, y, w, h) of the target in frame index.
+        """
+        width, height = self.size
+        w, h = self.target_size
+        phase = 2 * math.pi * index / self.period
+        x = (width - w) / 2 * (1 + 0.8 * math.sin(phase))
+        y = (height - h) / 2 * (1 + 0.8 * math.sin(2 * phase))
+        return int(x), int(y), w, h
+
+    def capture_time(self, index: int) -> float:
+        return self.start_time + index / self.fps
+
+    def render(self, index: int) -> np.ndarray:
+        frame = self.background.copy()
+        x, y, w, h = self.bbox_at(index)
+        frame[y:y + h, x:x + w] = self.target
+        return frame
+
+    def get_frame(self):
+        if self.start_time is None:
+            raise Exception("No video is currently open")
+
+        if self.frame_count is not None and self.position >= self.frame_count:
+            return None
+
+        # the camera captures the frame at its time, not earlier
+        delay = self.capture_time(self.position) - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+        frame = self.render(self.position)
+        self.frame_time = self.capture_time(self.position)
+        self.position += 1
+        return frame
+
+    def get_frame_time(self) -> float:
+        return self.frame_time
+
+    def get_position(self) -> int:
+        """
+        Index of the next frame returned by get_frame.
+        """
+        return self.position
+
+    def get_fps(self):
+        return self.fps
+
+    def is_opened(self):
+        return self.start_time is not None
+
+    def open(self, **kwargs):
+        self.start_time = time.time()
+        self.position = 0
+        self.frame_time = None
+
+    def close(self):
+        self.start_time = None
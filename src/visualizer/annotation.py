@@ -0,0 +1,52 @@
+"""
+Drawing of tracked bboxes on overlays
+
+TrackingPipeline draws while it tracks, ResultsRenderer draws the same bboxes from the log afterwards.
+Both go through the relative coordinates the log stores, so a rendered frame is identical to the tracked one.
+"""
+
+import cv2
+import numpy as np
+
+from src.videoloader.frame_pool import FramePool
+
+TRACK_COLOR = (0, 255, 0)
+PREDICT_COLOR = (0, 255, 255)
+
+
+def to_relative(bbox, shape: tuple) -> tuple:
+    """
+    :param bbox: Bbox (x, y, w, h) in pixels.
+    :param shape: Shape of the frame.
+    :return: Bbox relative to the frame size, as it is logged.
+    """
+    x, y, w, h = bbox
+    height, width = shape[:2]
+    return x / width, y / height, w / width, h / height
+
+
+def to_pixels(relative, shape: tuple) -> tuple:
+    """
+    Inverse of to_relative, rounded to whole pixels. Rounding absorbs the error of the division,
+    a bbox on whole pixels is drawn on the same pixels after the round trip.
+    """
+    x, y, w, h = relative
+    height, width = shape[:2]
+    return int(round(x * width)), int(round(y * height)), int(round(w * width)), int(round(h * height))
+
+
+def copy_to_overlay(frame: np.ndarray, pool: FramePool) -> np.ndarray:
+    """
+    Copy of the frame in a buffer of the pool, the bboxes are drawn on it and the frame stays clean.
+    """
+    overlay = pool.acquire(frame.shape, frame.dtype)
+    np.copyto(overlay, frame)
+    return overlay
+
+
+def draw_bbox(frame: np.ndarray, relative, color: tuple = TRACK_COLOR, thickness: int = 2):
+    """
+    :param relative: Bbox relative to the frame size, see to_relative.
+    """
+    x, y, w, h = to_pixels(relative, frame.shape)
+    cv2.rectangle(frame, (x, y), (x + w, y + h), color, thickness)
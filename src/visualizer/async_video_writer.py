@@ -0,0 +1,108 @@
+"""
+cv2.VideoWriter that encodes on a background thread
+
+Frames are handed over through a bounded queue, so encoding does not add to the latency of the tracking loop.
+When the queue is full the writer either waits for the encoder (POLICY_BLOCK) or drops the frame (POLICY_DROP).
+Frames borrowed from a FramePool are returned to it once they are encoded or dropped.
+"""
+
+import queue
+import threading
+
+import cv2
+
+from src.profiling import instrumentation
+from src.videoloader.frame_pool import FramePool
+
+POLICY_BLOCK = "block"
+POLICY_DROP = "drop"
+
+
+class AsyncVideoWriter:
+    def __init__(self,
+                 output_path: str,
+                 fourcc: int,
+                 fps: float,
+                 frame_size: tuple,
+                 queue_size: int = 32,
+                 policy: str = POLICY_BLOCK,
+                 pool: FramePool = None):
+        """
+        :param output_path: Path to the output video file.
+        :param fourcc: Codec, see cv2.VideoWriter_fourcc.
+        :param fps: Frame rate of the output video.
+        :param frame_size: Size of the frames (width, height).
+        :param queue_size: Maximum number of frames waiting for the encoder.
+        :param policy: What to do when the queue is full, POLICY_BLOCK or POLICY_DROP.
+        :param pool: Pool the written frames are returned to when the writer is done with them.
+        """
+        if policy not in (POLICY_BLOCK, POLICY_DROP):
+            raise ValueError(f"Unknown policy: {policy}")
+        if queue_size < 1:
+            raise ValueError("Queue size has to be positive")
+
+        self.policy = policy
+        self.pool = pool
+        self.dropped_frames = 0
+        self.error = None
+
+        self.video_writer = cv2.VideoWriter(output_path, fourcc, fps, frame_size)
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self._encode, name="AsyncVideoWriter", daemon=True)
+        self.thread.start()
+
+    def _encode(self):
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                return
+
+            try:
+                with instrumentation.timer("writer.encode"):
+                    self.video_writer.write(frame)
+            except Exception as e:
+                # keep draining the queue, so the producer is never blocked by a dead encoder
+                self.error = e
+            finally:
+                self._release(frame)
+
+    def _release(self, frame):
+        if self.pool is not None:
+            self.pool.release(frame)
+
+    def write(self, frame):
+        """
+        Queue the frame for encoding. The frame must not be changed by the caller afterwards.
+        """
+        if self.thread is None:
+            raise Exception("Video writer is released")
+        if self.error is not None:
+            raise self.error
+
+        if self.policy == POLICY_BLOCK:
+            self.frames.put(frame)
+            return
+
+        try:
+            self.frames.put_nowait(frame)
+        except queue.Full:
+            self.dropped_frames += 1
+            self._release(frame)
+
+    def isOpened(self):
+        return self.video_writer.isOpened()
+
+    def release(self):
+        """
+        Encode all queued frames and close the file.
+        """
+        if self.thread is None:
+            return
+
+        self.frames.put(None)
+        self.thread.join()
+        self.thread = None
+        self.video_writer.release()
+
+        if self.error is not None:
+            raise self.error
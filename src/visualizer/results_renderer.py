@@ -0,0 +1,128 @@
+"""
+Annotated output video from stored tracking results
+
+The video is decoded and the bboxes of a tracking log are drawn on a copy of each frame in a reusable overlay,
+no tracker runs. The overlay and the bboxes are drawn like TrackingPipeline draws them, see annotation. The decoded frame is returned to the loader right away, see FramePool.
+Annotation style, codec and frame range of the output can change without tracking again, see ResultsStore.
+"""
+
+import cv2
+import numpy as np
+
+from src.profiling import instrumentation
+from src.videoloader.base import VideoLoaderBase
+from src.videoloader.frame_pool import FramePool
+from src.visualizer.annotation import TRACK_COLOR, PREDICT_COLOR, copy_to_overlay, draw_bbox
+from src.visualizer.async_video_writer import AsyncVideoWriter
+from src.visualizer.tracking_log import EVENT_CODES
+
+
+class ResultsRenderer:
+    def __init__(self,
+                 video_loader: VideoLoaderBase,
+                 records: np.ndarray,
+                 thickness: int = 2,
+                 track_color: tuple = TRACK_COLOR,
+                 predict_color: tuple = PREDICT_COLOR):
+        """
+        :param video_loader: Loader of the video the results belong to.
+        :param records: Tracking log, see load_tracking_log. Only Track and Predict events are drawn.
+        :param thickness: Line width of the bboxes.
+        :param track_color: Color of tracked bboxes (BGR).
+        :param predict_color: Color of predicted bboxes (BGR).
+        """
+        drawn = np.isin(records["event"], [EVENT_CODES["Track"], EVENT_CODES["Predict"]])
+        records = records[drawn]
+        self.records = records[np.argsort(records["frame"], kind="stable")]
+
+        self.video_loader = video_loader
+        self.thickness = thickness
+        self.colors = {EVENT_CODES["Track"]: track_color, EVENT_CODES["Predict"]: predict_color}
+
+    def logged_frames(self) -> np.ndarray:
+        return np.unique(self.records["frame"])
+
+    def draw(self, frame: np.ndarray, index: int):
+        """
+        Draw the bboxes of frame index on the frame.
+        """
+        first, last = np.searchsorted(self.records["frame"], [index, index + 1])
+        if first == last:
+            return
+
+        with instrumentation.timer("renderer.draw"):
+            for record in self.records[first:last]:
+                draw_bbox(frame, (record["x"], record["y"], record["width"], record["height"]),
+                          self.colors[int(record["event"])], self.thickness)
+
+    def render(self,
+               output_path: str,
+               start_frame: int = 0,
+               end_frame: int = None,
+               logged_only: bool = False,
+               fourcc: str = "mp4v",
+               fps: float = None,
+               writer_queue_size: int = 32,
+               stride: int = 1) -> int:
+        """
+        :param start_frame: Index of the first rendered frame.
+        :param end_frame: Index of the frame after the last rendered one, the end of the video if None.
+        :param logged_only: Render only frames with a bbox, like the output of a run with a frame stride.
+            Frames without bbox are skipped without being retrieved.
+        :param fourcc: Codec of the output video.
+        :param fps: Frame rate of the output video, the frame rate of the video divided by stride if None.
+        :param writer_queue_size: Number of frames waiting for the background video encoder.
+        :param stride: Frame stride of the logged run, its output plays at the speed of the source at fps / stride.
+        :return: Number of rendered frames.
+        """
+        if start_frame < 0 or (end_frame is not None and end_frame <= start_frame):
+            raise ValueError("Frame range has to be 0 <= start_frame < end_frame")
+        if stride < 1:
+            raise ValueError("Stride has to be positive")
+
+        logged = self.logged_frames()
+        # overlays queued for the encoder, the one being encoded and the one being drawn
+        overlays = FramePool(writer_queue_size + 2)
+        self.video_loader.open()
+        writer = None
+        rendered = 0
+        try:
+            index = start_frame
+            if hasattr(self.video_loader, "seek"):
+                self.video_loader.seek(start_frame)
+            else:
+                index = self.video_loader.skip(start_frame)
+
+            while end_frame is None or index < end_frame:
+                if logged_only:
+                    following = logged[np.searchsorted(logged, index):]
+                    if not following.size or (end_frame is not None and following[0] >= end_frame):
+                        break
+                    index += self.video_loader.skip(int(following[0]) - index)
+
+                frame = self.video_loader.get_frame()
+                if frame is None:
+                    break
+
+                if writer is None:
+                    writer = AsyncVideoWriter(output_path, cv2.VideoWriter_fourcc(*fourcc),
+                                              fps or self.video_loader.get_fps() / stride,
+                                              (frame.shape[1], frame.shape[0]),
+                                              queue_size=writer_queue_size, pool=overlays)
+                overlay = copy_to_overlay(frame, overlays)
+                self.video_loader.release_frame(frame)
+                del frame
+
+                self.draw(overlay, index)
+                # the writer returns the overlay to the pool once it is encoded
+                writer.write(overlay)
+                del overlay
+
+                rendered += 1
+                index += 1
+        finally:
+            self.video_loader.close()
+            if writer is not None:
+                writer.release()
+
+        return rendered
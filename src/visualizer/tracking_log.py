@@ -0,0 +1,135 @@
+"""
+Binary log of tracking events
+
+Records are collected in a preallocated NumPy structured array and written to disk in blocks,
+each block as a separate .npy chunk appended to the same file. The file is read back with
+load_tracking_log and can be exported to CSV on demand.
+
+Every record carries the time of its frame in seconds: the capture time (time.time()) for live sources,
+the position in the video otherwise. Logs written before the time was recorded are read with NaN times.
+Coordinates are relative to the frame size in double precision, so they map back to the same pixels.
+"""
+
+import numpy as np
+
+EVENTS = ("Click", "Track", "Predict", "Init")
+EVENT_CODES = {event: code for code, event in enumerate(EVENTS)}
+
+RECORD_DTYPE = np.dtype([
+    ("frame", "<i8"),
+    ("event", "u1"),
+    ("target", "<i4"),
+    ("x", "<f8"),
+    ("y", "<f8"),
+    ("width", "<f8"),
+    ("height", "<f8"),
+    ("time", "<f8"),
+])
+
+CSV_COLUMNS = ['Frame', 'Event', 'X', 'Y', 'Width', 'Height']
+
+
+def _upgrade(chunk: np.ndarray) -> np.ndarray:
+    # chunks of older logs lack fields added since or store the coordinates in single precision
+    if chunk.dtype == RECORD_DTYPE:
+        return chunk
+
+    records = np.empty(len(chunk), dtype=RECORD_DTYPE)
+    records["time"] = np.nan
+    for name in chunk.dtype.names:
+        records[name] = chunk[name]
+    return records
+
+
+def load_tracking_log(path: str) -> np.ndarray:
+    """
+    Read all chunks of a log file.
+    :return: Structured array with RECORD_DTYPE.
+    """
+    chunks = []
+    with open(path, "rb") as file:
+        while True:
+            try:
+                chunks.append(_upgrade(np.load(file)))
+            except EOFError:
+                break
+
+    if not chunks:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.concatenate(chunks)
+
+
+def export_csv(records: np.ndarray, csv_path: str, with_target: bool = False, with_time: bool = False):
+    """
+    Write records in the CSV format of the old csv.writer based log.
+    :param with_target: Add a column with the target id for logs of many targets.
+    :param with_time: Add a column with the time of the frame, e.g. the capture time of a live source.
+    """
+    # pandas takes longer to import than everything else of a run's startup, only the export needs it
+    import pandas as pd
+
+    table = pd.DataFrame({
+        'Frame': records["frame"],
+        'Event': np.asarray(EVENTS, dtype=object)[records["event"]],
+        'X': records["x"],
+        'Y': records["y"],
+        'Width': records["width"],
+        'Height': records["height"],
+    }, columns=CSV_COLUMNS)
+
+    if with_target:
+        table['Target'] = records["target"]
+    if with_time:
+        table['Time'] = records["time"]
+
+    table.to_csv(csv_path, index=False)
+
+
+class TrackingLog:
+    def __init__(self, path: str, block_size: int = 4096):
+        """
+        :param path: Path to the binary log file.
+        :param block_size: Number of records kept in memory before they are written to disk.
+        """
+        if block_size < 1:
+            raise ValueError("Block size has to be positive")
+
+        self.path = path
+        self.records = np.empty(block_size, dtype=RECORD_DTYPE)
+        self.count = 0
+        self.file = open(path, "wb")
+
+    def log(self, frame: int, event: str, bbox, target: int = 0, time: float = np.nan):
+        """
+        :param time: Time of the frame in seconds, see RECORD_DTYPE.
+        """
+        if event not in EVENT_CODES:
+            raise ValueError(f"Unknown event: {event}")
+
+        x, y, w, h = bbox
+        self.records[self.count] = (frame, EVENT_CODES[event], target, x, y, w, h, time)
+        self.count += 1
+
+        if self.count == len(self.records):
+            self.flush()
+
+    def flush(self):
+        if self.file.closed:
+            return
+
+        if self.count:
+            np.save(self.file, self.records[:self.count])
+            self.count = 0
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def to_csv(self, csv_path: str, with_target: bool = False, with_time: bool = False):
+        """
+        Export everything logged so far to CSV.
+        """
+        self.flush()
+        export_csv(load_tracking_log(self.path), csv_path, with_target, with_time)
@@ -1 +1,58 @@
+import os
+import shutil
+
+import cv2
+
+from src.pipeline import TrackingPipeline
+from src.tracker.tracker_manager import TrackerManager
+from src.tracker.trackers import CSRTTracker
+from src.visualizer.tracking_log import load_tracking_log
+
 TEST_VIDEO = "tests/test_data/test.mp4"
+
+BBOX = (200, 100, 60, 50)
+
+
+def copy_test_video(directory) -> str:
+    """
+    Seeking caches the keyframe index next to the video, tests that seek work on a copy of the test video.
+    :return: Path of the copy.
+    """
+    path = os.path.join(str(directory), "video.mp4")
+    shutil.copy(TEST_VIDEO, path)
+    return path
+
+
+def read_video(path: str, count: int = None) -> list:
+    """
+    :param count: Number of frames to read, all frames if None.
+    """
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while count is None or len(frames) < count:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+def tracked_run(directory, loader, end_frame: int = 30, frame_stride=None, output: bool = True):
+    """
+    Track BBOX with CSRT from the first frame up to end_frame.
+    :param directory: Directory of the log and of the output video.
+    :param output: Write the annotated frames to output.avi in the directory.
+    :return: The pipeline, its log and its annotated frames.
+    """
+    os.makedirs(str(directory), exist_ok=True)
+    log_path = os.path.join(str(directory), "log.npy")
+    output_path = os.path.join(str(directory), "output.avi") if output else None
+    pipeline = TrackingPipeline(TrackerManager(CSRTTracker()), loader, log_path=log_path, output_path=output_path,
+                                end_frame=end_frame, frame_stride=frame_stride)
+    pipeline.open()
+    pipeline.set_bbox(BBOX, event='Init')
+
+    annotated = []
+    pipeline.run(on_frame=lambda frame: annotated.append(frame.copy()))
+    return pipeline, load_tracking_log(log_path), annotated
@@ -0,0 +1,13 @@
+import pytest
+
+from tests.cache import TEST_VIDEO, copy_test_video, read_video
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    return copy_test_video(tmp_path)
+
+
+@pytest.fixture(scope="module")
+def reference_frames():
+    return read_video(TEST_VIDEO)
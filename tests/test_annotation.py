@@ -0,0 +1,29 @@
+import numpy as np
+
+from src.visualizer.annotation import to_relative, to_pixels, copy_to_overlay, draw_bbox
+from src.videoloader.frame_pool import FramePool
+
+
+class TestAnnotation:
+    def test_whole_pixels_survive_the_round_trip(self):
+        # x / width * width is not x for every x, e.g. 1 / 49 * 49 < 1
+        for shape in [(49, 49), (256, 480), (1080, 1920)]:
+            height, width = shape
+            for x in range(-10, width + 10):
+                bbox = (x, x % height, width - x, height)
+                assert to_pixels(to_relative(bbox, shape), shape) == bbox
+
+    def test_fractional_bbox_is_rounded(self):
+        shape = (256, 480)
+        assert to_pixels(to_relative((10.4, 20.6, 30.5, 40.0), shape), shape) == (10, 21, 30, 40)
+
+    def test_draw_on_overlay(self):
+        frame = np.zeros((40, 60, 3), dtype=np.uint8)
+        pool = FramePool(2)
+        overlay = copy_to_overlay(frame, pool)
+        draw_bbox(overlay, to_relative((10, 5, 20, 10), frame.shape), (0, 255, 0), 1)
+
+        assert not frame.any()
+        assert (overlay[5, 10:31] == (0, 255, 0)).all() and (overlay[15, 10:31] == (0, 255, 0)).all()
+        assert not overlay[6:15, 11:30].any()
+        pool.release(overlay)
@@ -0,0 +1,68 @@
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from src.visualizer.async_video_writer import AsyncVideoWriter, POLICY_BLOCK, POLICY_DROP
+
+
+FOURCC = cv2.VideoWriter_fourcc(*'mp4v')
+
+
+class StalledWriter:
+    def __init__(self):
+        self.gate = threading.Event()
+
+    def write(self, frame):
+        self.gate.wait()
+
+    def release(self):
+        pass
+
+
+def count_frames(path):
+    video = cv2.VideoCapture(str(path))
+    count = 0
+    while video.read()[0]:
+        count += 1
+    video.release()
+    return count
+
+
+class TestAsyncVideoWriter:
+    def test_release_flushes_all_frames(self, tmp_path):
+        writer = AsyncVideoWriter(str(tmp_path / "output.mp4"), FOURCC, 25, (64, 48), queue_size=2)
+        assert writer.isOpened()
+
+        for i in range(20):
+            writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+        writer.release()
+
+        assert count_frames(tmp_path / "output.mp4") == 20
+
+    def test_drop_policy(self, tmp_path):
+        writer = AsyncVideoWriter(str(tmp_path / "output.mp4"), FOURCC, 25, (64, 48),
+                                  queue_size=1, policy=POLICY_DROP)
+
+        # stall the encoder, so the queue overflows
+        writer.video_writer.release()
+        writer.video_writer = StalledWriter()
+
+        for _ in range(10):
+            writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+        writer.video_writer.gate.set()
+        writer.release()
+
+        assert writer.dropped_frames >= 8
+
+    def test_write_after_release(self, tmp_path):
+        writer = AsyncVideoWriter(str(tmp_path / "output.mp4"), FOURCC, 25, (64, 48), policy=POLICY_BLOCK)
+        writer.release()
+
+        with pytest.raises(Exception, match="released"):
+            writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+
+    def test_unknown_policy(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown policy"):
+            AsyncVideoWriter(str(tmp_path / "output.mp4"), FOURCC, 25, (64, 48), policy="skip")
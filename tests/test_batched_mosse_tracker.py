@@ -0,0 +1,163 @@
+import argparse
+
+import cv2
+import numpy as np
+import pytest
+
+from src.pipeline import cli
+from src.preprocessing import PreparedFrame
+from src.tracker.batched_mosse_tracker import BatchedMOSSETracker
+from src.tracker.multi_tracker_manager import MultiTrackerManager, BatchedTrackerManager, TrackResult
+from src.tracker.tracker_manager import TrackerManager
+from src.tracker.tracker_registry import registry
+
+
+def make_texture(seed, size=60):
+    texture = np.random.default_rng(seed).integers(0, 255, (size, size), dtype=np.uint8)
+    return cv2.GaussianBlur(texture, (5, 5), 0)
+
+
+TEXTURES = [make_texture(seed) for seed in range(3)]
+
+
+def make_image(positions):
+    image = np.full((360, 640), 200, dtype=np.uint8)
+    for texture, (x, y) in zip(TEXTURES, positions):
+        image[y:y + 60, x:x + 60] = texture
+    return image
+
+
+def path(step):
+    # three targets moving in different directions
+    return [(50 + 4 * step, 40 + step), (500 - 3 * step, 60 + 2 * step), (300, 250 - 2 * step)]
+
+
+class TestBatchedMOSSETracker:
+    def test_follows_targets(self):
+        tracker = BatchedMOSSETracker()
+        for target_id, (x, y) in enumerate(path(0)):
+            tracker.add_target(target_id, (x, y, 60, 60))
+
+        for step in range(40):
+            results = tracker.track_targets(make_image(path(step)))
+            assert set(results) == {0, 1, 2}
+            for target_id, (x, y) in enumerate(path(step)):
+                bbox = results[target_id]
+                assert bbox is not None
+                assert abs(bbox[0] - x) < 3 and abs(bbox[1] - y) < 3
+
+    def test_lost_target(self):
+        tracker = BatchedMOSSETracker()
+        tracker.add_target(0, (50, 40, 60, 60))
+        tracker.add_target(1, (500, 60, 60, 60))
+        tracker.track_targets(make_image(path(0)[:2]))
+
+        # target 1 disappears, target 0 is still found
+        results = tracker.track_targets(make_image(path(0)[:1]))
+        assert results[0] is not None
+        assert results[1] is None
+
+    def test_removed_slot_is_reused(self):
+        tracker = BatchedMOSSETracker(capacity=2)
+        tracker.add_target("a", (50, 40, 60, 60))
+        tracker.add_target("b", (500, 60, 60, 60))
+        numerators = tracker.numerators
+
+        tracker.remove_target("a")
+        tracker.add_target("c", (300, 250, 60, 60))
+        assert tracker.numerators is numerators
+        assert sorted(tracker.slots.values()) == [0, 1]
+        assert set(tracker.slots) == {"b", "c"}
+
+    def test_grow_keeps_filters(self):
+        tracker = BatchedMOSSETracker(capacity=1)
+        tracker.add_target(0, (50, 40, 60, 60))
+        tracker.track_targets(make_image(path(0)))
+        filter_before = tracker.numerators[0].copy()
+
+        tracker.add_target(1, (500, 60, 60, 60))
+        assert tracker.capacity == 2
+        assert np.array_equal(tracker.numerators[0], filter_before)
+
+        results = tracker.track_targets(make_image(path(1)))
+        assert abs(results[0][0] - path(1)[0][0]) < 3
+        assert results[1] == (500, 60, 60, 60)
+
+    def test_target_errors(self):
+        tracker = BatchedMOSSETracker()
+        tracker.add_target(0, (50, 40, 60, 60))
+
+        with pytest.raises(ValueError, match="already tracked"):
+            tracker.add_target(0, (50, 40, 60, 60))
+        with pytest.raises(ValueError, match="not tracked"):
+            tracker.remove_target(1)
+        with pytest.raises(ValueError, match="positive size"):
+            tracker.add_target(1, (50, 40, 0, 60))
+        with pytest.raises(ValueError, match="no search window"):
+            tracker.set_search_window(margin=1.0)
+
+    def test_single_target_from_registry(self):
+        manager = TrackerManager(registry.create("MOSSE_BATCHED"))
+        manager.set_bbox(np.array([50, 40, 60, 60]))
+
+        for step in range(10):
+            image = cv2.cvtColor(make_image(path(step)), cv2.COLOR_GRAY2BGR)
+            bbox = manager.track(PreparedFrame(image, step))
+            assert abs(bbox[0] - path(step)[0][0]) < 3
+
+
+class TestBatchedTrackerManager:
+    def test_targets_share_the_tracker(self):
+        tracker = BatchedMOSSETracker()
+        manager = BatchedTrackerManager(tracker)
+        for target_id, (x, y) in enumerate(path(0)):
+            manager.add_target(target_id, None, (x, y, 60, 60))
+        assert len(manager) == 3 and set(tracker.slots) == {0, 1, 2}
+
+        for step in range(20):
+            results = manager.track(make_image(path(step)))
+            for target_id, (x, y) in enumerate(path(step)):
+                result = results[target_id]
+                assert isinstance(result, TrackResult) and result.success
+                assert abs(result.bbox[0] - x) < 3 and abs(result.bbox[1] - y) < 3
+
+        manager.remove_target(1)
+        assert 1 not in manager and 1 not in tracker.slots
+        assert set(manager.track(make_image(path(20)))) == {0, 2}
+        manager.close()
+
+    def test_target_errors(self):
+        manager = BatchedTrackerManager(BatchedMOSSETracker())
+        with pytest.raises(ValueError, match="tracked by its tracker"):
+            manager.add_target(0, BatchedMOSSETracker(), (50, 40, 60, 60))
+        with pytest.raises(ValueError, match="initial bbox"):
+            manager.add_target(0)
+
+        manager.add_target(0, None, (50, 40, 60, 60))
+        with pytest.raises(ValueError, match="already tracked"):
+            manager.add_target(0, None, (50, 40, 60, 60))
+        with pytest.raises(ValueError, match="not tracked"):
+            manager.remove_target(1)
+        assert len(manager) == 1
+        manager.close()
+        with pytest.raises(RuntimeError):
+            manager.executor.submit(len, manager)
+
+    def test_command_line(self):
+        args = argparse.Namespace(tracker="MOSSE_BATCHED", tracker_params=None, search_margin=None, search_size=None,
+                                  redetect=False)
+        manager = cli.build_multi_tracker_manager(args)
+        assert isinstance(manager, BatchedTrackerManager)
+        manager.close()
+
+        # redetection wraps every target in its own tracker
+        args.redetect = True
+        manager = cli.build_multi_tracker_manager(args)
+        assert type(manager) is MultiTrackerManager
+        manager.close()
+
+        # the window of the batched tracker is not set from the command line
+        args.redetect = False
+        args.search_margin = 1.0
+        with pytest.raises(ValueError, match="no search window"):
+            cli.build_multi_tracker_manager(args)
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from src.tracker.base import TrackerBase
+from src.tracker.cascade_tracker import CascadeTracker, FAST, ROBUST
+from src.tracker.trackers import MOSSETracker, CSRTTracker
+
+
+class ScriptedTracker(TrackerBase):
+    """
+    Returns the initial bbox on init and then bboxes from the script, None when the script is exhausted.
+    """
+    def __init__(self, script):
+        super().__init__(np.array([0, 0, 0, 0]))
+        self.script = list(script)
+        self.inits = 0
+        self.is_initialized = False
+
+    def track(self, frame):
+        if not self.is_initialized:
+            self.is_initialized = True
+            self.inits += 1
+            return self.bbox
+        return self.script.pop(0) if self.script else None
+
+    def set_bbox(self, bbox):
+        self.bbox = bbox
+        self.is_initialized = False
+
+
+FRAME = np.zeros((100, 100, 3), dtype=np.uint8)
+
+
+class TestCascadeTracker:
+    def test_escalation_and_fallback(self):
+        fast = ScriptedTracker([(11, 10, 20, 20), (12, 10, 20, 20)])
+        robust = ScriptedTracker([(13, 10, 20, 20)] * 3)
+        cascade = CascadeTracker(np.array([10, 10, 20, 20]), fast=fast, robust=robust, stable_frames=3)
+
+        assert tuple(cascade.track(FRAME)) == (10, 10, 20, 20)
+        assert cascade.track(FRAME) == (11, 10, 20, 20)
+        assert cascade.track(FRAME) == (12, 10, 20, 20)
+
+        # fast tracker fails, robust one starts at the last good bbox
+        assert cascade.track(FRAME) == (12, 10, 20, 20)
+        assert cascade.active == ROBUST
+        assert robust.bbox == (12, 10, 20, 20)
+
+        for _ in range(3):
+            assert cascade.track(FRAME) == (13, 10, 20, 20)
+
+        # stable again, fast tracker takes over
+        assert cascade.active == FAST
+        assert fast.inits == 2
+        assert cascade.stats == {FAST: 4, ROBUST: 3, "escalations": 1}
+
+    def test_jump_is_not_confident(self):
+        fast = ScriptedTracker([(80, 80, 20, 20)])
+        robust = ScriptedTracker([])
+        cascade = CascadeTracker(np.array([10, 10, 20, 20]), fast=fast, robust=robust)
+
+        cascade.track(FRAME)
+        assert tuple(cascade.track(FRAME)) == (10, 10, 20, 20)
+        assert cascade.active == ROBUST
+
+    def test_opencv_trackers(self):
+        image = np.ones((200, 200, 3), dtype=np.uint8) * 255
+        image[50:150, 50:150, :] = 0
+
+        cascade = CascadeTracker(np.array([50, 50, 100, 100]), fast=MOSSETracker(), robust=CSRTTracker())
+        cascade.track(image)
+        bbox = cascade.track(image)
+
+        assert len(bbox) == 4
+        assert cascade.active == FAST
+
+    def test_search_window_is_set_on_both_stages(self):
+        image = np.full((720, 1280, 3), 255, dtype=np.uint8)
+        image[300:360, 600:660, :] = 0
+        image[320:340, 620:640, :] = 128
+
+        cascade = CascadeTracker(np.array([600, 300, 60, 60]), fast=MOSSETracker(), robust=CSRTTracker())
+        cascade.set_search_window(margin=1.0, target_size=96)
+        assert cascade.fast.search_margin == cascade.robust.search_margin == 1.0
+        assert cascade.fast.search_size == cascade.robust.search_size == 96
+
+        cascade.track(image)
+        bbox = cascade.track(image)
+        # the fast stage was initialized in a window around the target, not on the full frame
+        assert cascade.fast.window is not None
+        assert abs(bbox[0] - 600) < 3 and abs(bbox[1] - 300) < 3
+
+        with pytest.raises(ValueError):
+            cascade.set_search_window(margin=-1.0)
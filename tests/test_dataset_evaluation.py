@@ -0,0 +1,139 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from src.benchmark import dataset_evaluation
+from src.benchmark.dataset_evaluation import DatasetEvaluation, find_sequences, load_ground_truth, run_job
+
+FRAMES = 30
+
+
+def make_sequence(directory, start, step, images=False):
+    """
+    A textured square moving on a plain background, its ground truth is exact.
+    :param images: Write the frames as an img directory of JPEG files instead of a video.
+    """
+    os.makedirs(directory)
+    texture = np.random.default_rng(start[0]).integers(0, 255, (40, 40, 3), dtype=np.uint8)
+    if images:
+        os.makedirs(os.path.join(directory, "img"))
+    else:
+        writer = cv2.VideoWriter(os.path.join(directory, "video.avi"), cv2.VideoWriter_fourcc(*"MJPG"), 25,
+                                 (320, 240))
+
+    with open(os.path.join(directory, "groundtruth_rect.txt" if images else "groundtruth.txt"), "w") as file:
+        for index in range(FRAMES):
+            x, y = start[0] + step[0] * index, start[1] + step[1] * index
+            frame = np.full((240, 320, 3), 90, dtype=np.uint8)
+            frame[y:y + 40, x:x + 40] = texture
+            if images:
+                cv2.imwrite(os.path.join(directory, "img", f"{index + 1:04d}.jpg"), frame)
+            else:
+                writer.write(frame)
+            file.write(f"{x},{y},40,40\n")
+
+    if not images:
+        writer.release()
+
+
+def die_on_left(job: dict):
+    """
+    Job function whose process dies on the left sequence with CSRT, like a job killed for its memory.
+    The spawned processes import this module, the job function is not patched there.
+    """
+    if job["sequence"] == "left" and job["tracker"] == "CSRT":
+        os._exit(1)
+    return dataset_evaluation._run_job(job)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    make_sequence(str(tmp_path / "dataset" / "left"), (200, 100), (-2, 1))
+    make_sequence(str(tmp_path / "dataset" / "right"), (40, 60), (3, 1))
+    os.makedirs(tmp_path / "dataset" / "empty")
+    return str(tmp_path / "dataset")
+
+
+class TestDatasetEvaluation:
+    def test_load_ground_truth(self, tmp_path):
+        path = tmp_path / "groundtruth.txt"
+        path.write_text("1,2,3,4\n\n5\t6\t7\t8\n")
+        ground_truth = load_ground_truth(str(path))
+        assert ground_truth.shape == (3, 4)
+        assert np.isnan(ground_truth[1]).all()
+        assert ground_truth[2].tolist() == [5, 6, 7, 8]
+
+    def test_find_sequences(self, dataset):
+        assert list(find_sequences(dataset)) == ["left", "right"]
+
+    def test_run_job(self, dataset):
+        video_path, ground_truth_path = find_sequences(dataset)["left"]
+        row, predicted = run_job("left", video_path, ground_truth_path, "CSRT", max_frames=20)
+
+        assert row["frames"] == 20
+        assert predicted.shape == (20, 4)
+        assert row["success_auc"] > 0.6
+        assert row["failures"] == 0
+
+    def test_image_sequence(self, dataset):
+        make_sequence(os.path.join(dataset, "images"), (100, 100), (2, -1), images=True)
+        video_path, ground_truth_path = find_sequences(dataset)["images"]
+        assert video_path.endswith("img") and ground_truth_path.endswith("groundtruth_rect.txt")
+
+        row, predicted = run_job("images", video_path, ground_truth_path, "CSRT")
+        assert row["frames"] == FRAMES
+        assert row["success_auc"] > 0.6
+
+    def test_evaluation_resumes(self, dataset, tmp_path):
+        output_dir = str(tmp_path / "results")
+        evaluation = DatasetEvaluation(dataset, ["MOSSE", "CSRT"], output_dir, processes=2)
+        results = evaluation.run(verbose=False)
+
+        assert len(results) == 4
+        assert results["error"].isna().all()
+        assert evaluation.finished_jobs == 4
+        assert set(evaluation.summary().index) == {"MOSSE", "CSRT"}
+
+        # an interrupted run: one job has no result on disk
+        os.remove(evaluation.job_path(evaluation.jobs()[1]))
+        resumed = DatasetEvaluation(dataset, ["MOSSE", "CSRT"], output_dir, processes=2)
+        resumed_results = resumed.run(verbose=False)
+
+        assert resumed.finished_jobs == 1
+        assert resumed.resumed_jobs == 3
+        assert resumed_results[["sequence", "tracker"]].equals(results[["sequence", "tracker"]])
+        assert np.allclose(resumed_results["success_auc"], results["success_auc"])
+
+    def test_changed_settings_run_again(self, dataset, tmp_path):
+        output_dir = str(tmp_path / "results")
+        DatasetEvaluation(dataset, ["MOSSE"], output_dir, sequences=["left"], max_frames=10).run(verbose=False)
+
+        evaluation = DatasetEvaluation(dataset, ["MOSSE"], output_dir, sequences=["left"], max_frames=20)
+        results = evaluation.run(verbose=False)
+        assert evaluation.finished_jobs == 1
+        assert results["frames"].tolist() == [20]
+
+    def test_failed_job_is_reported(self, dataset, tmp_path):
+        with open(os.path.join(dataset, "left", "groundtruth.txt"), "w") as file:
+            file.write("\n")
+
+        evaluation = DatasetEvaluation(dataset, ["MOSSE"], str(tmp_path / "results"))
+        results = evaluation.run(verbose=False)
+        assert "no annotation" in results.set_index("sequence").loc["left", "error"]
+        assert not os.path.exists(evaluation.job_path(evaluation.jobs()[0]))
+
+    def test_dead_process_fails_its_job(self, dataset, tmp_path, monkeypatch):
+        # the pool pickles the function by name, the spawned processes import it from this module
+        monkeypatch.setattr(dataset_evaluation, "_run_job", die_on_left)
+        evaluation = DatasetEvaluation(dataset, ["MOSSE", "CSRT"], str(tmp_path / "results"), processes=2)
+        results = evaluation.run(verbose=False).set_index(["sequence", "tracker"])
+
+        assert evaluation.finished_jobs == 4
+        assert "died" in results.loc[("left", "CSRT"), "error"]
+        assert results.drop(("left", "CSRT"))["error"].isna().all()
+
+    def test_unknown_sequence(self, dataset, tmp_path):
+        with pytest.raises(ValueError):
+            DatasetEvaluation(dataset, ["MOSSE"], str(tmp_path), sequences=["missing"])
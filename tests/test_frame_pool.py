@@ -0,0 +1,162 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from src.pipeline import FrameStride
+from src.videoloader import VideoLoaderOpenCV, VideoLoaderPrefetch, FramePool, FramePoolError, FramePoolWarning
+from src.visualizer.async_video_writer import AsyncVideoWriter
+from src.visualizer.results_renderer import ResultsRenderer
+from tests.cache import TEST_VIDEO, read_video, tracked_run
+
+SHAPE = (4, 6, 3)
+
+
+class TestFramePool:
+    def test_ring_reuses_buffers(self):
+        pool = FramePool(3)
+        ids = []
+        for _ in range(9):
+            buffer = pool.acquire(SHAPE)
+            ids.append(id(buffer))
+            assert pool.release(buffer)
+            del buffer
+
+        assert ids[:3] == ids[3:6] == ids[6:]
+        assert len(set(ids[:3])) == 3
+        assert pool.allocations == 3
+        assert pool.borrowed_count() == 0
+
+    def test_reallocates_on_new_shape(self):
+        pool = FramePool(2)
+        pool.release(pool.acquire(SHAPE))
+        buffer = pool.acquire((8, 8, 3))
+        assert buffer.shape == (8, 8, 3)
+        assert pool.allocations == 2
+
+    def test_buffer_not_returned(self):
+        pool = FramePool(2)
+        pool.acquire(SHAPE)
+        pool.release(pool.acquire(SHAPE))
+        with pytest.raises(FramePoolError):
+            pool.acquire(SHAPE)
+
+    def test_double_release(self):
+        pool = FramePool(2)
+        buffer = pool.acquire(SHAPE)
+        pool.release(buffer)
+        with pytest.raises(FramePoolError):
+            pool.release(buffer)
+
+    def test_foreign_frame(self):
+        pool = FramePool(2)
+        assert not pool.release(np.zeros(SHAPE, dtype=np.uint8))
+
+    def test_stale_reference(self):
+        pool = FramePool(1)
+        kept = pool.acquire(SHAPE)
+        pool.release(kept)
+
+        with pytest.warns(FramePoolWarning):
+            pool.acquire(SHAPE)
+        assert pool.stale_references == 1
+
+    def test_wrong_size(self):
+        with pytest.raises(ValueError):
+            FramePool(0)
+
+
+class TestPooledLoader:
+    def test_decodes_into_pool(self):
+        reference = VideoLoaderOpenCV(TEST_VIDEO)
+        reference.open()
+
+        pool = FramePool(2)
+        loader = VideoLoaderOpenCV(TEST_VIDEO, pool=pool)
+        loader.open()
+
+        ids = set()
+        for _ in range(10):
+            frame = loader.get_frame()
+            assert pool.owns(frame)
+            assert np.array_equal(frame, reference.get_frame())
+            ids.add(id(frame))
+            loader.release_frame(frame)
+            del frame
+
+        assert len(ids) == 2
+        assert pool.allocations == 2
+        loader.close()
+        reference.close()
+
+    def test_end_of_video(self, video_path):
+        pool = FramePool(2)
+        loader = VideoLoaderOpenCV(video_path, pool=pool)
+        loader.open()
+        loader.seek(len(loader))
+
+        assert loader.get_frame() is None
+        assert pool.borrowed_count() == 0
+        loader.close()
+
+    def test_pipeline_with_pool(self, tmp_path):
+        _, records, annotated = tracked_run(tmp_path / "plain", VideoLoaderOpenCV(TEST_VIDEO))
+
+        pool = FramePool(8)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", FramePoolWarning)
+            pipeline, pooled_records, pooled_annotated = tracked_run(
+                tmp_path / "pooled", VideoLoaderPrefetch(VideoLoaderOpenCV(TEST_VIDEO, pool=pool), queue_size=4))
+
+        assert np.array_equal(pooled_records, records)
+        assert all(np.array_equal(a, b) for a, b in zip(pooled_annotated, annotated))
+        # the initial frame is copied out of the pool, every frame after it came from the ring
+        assert pool.allocations == pool.size
+        assert pool.borrowed_count() == 0
+        assert pipeline.overlays.borrowed_count() == 0
+
+    def test_stride_with_prefetch(self, tmp_path):
+        _, records, _ = tracked_run(tmp_path / "plain", VideoLoaderOpenCV(TEST_VIDEO), frame_stride=FrameStride(4))
+
+        # the sizes of the command line: 4 buffers, the prefetch queue and the frame waiting to be put
+        pool = FramePool(4 + 2 + 1)
+        loader = VideoLoaderPrefetch(VideoLoaderOpenCV(TEST_VIDEO, pool=pool), queue_size=2)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", FramePoolWarning)
+            _, pooled_records, _ = tracked_run(tmp_path / "pooled", loader, frame_stride=FrameStride(4))
+
+        assert np.array_equal(pooled_records, records)
+        assert pool.borrowed_count() == 0
+
+
+class TestPooledWriter:
+    def test_returns_written_frames(self, tmp_path):
+        pool = FramePool(4)
+        writer = AsyncVideoWriter(str(tmp_path / "output.avi"), 0, 25, (SHAPE[1], SHAPE[0]), queue_size=2,
+                                  pool=pool)
+        for _ in range(10):
+            writer.write(pool.acquire(SHAPE))
+        writer.release()
+
+        assert pool.borrowed_count() == 0
+
+
+class TestPooledRenderer:
+    def test_render_with_pool(self, tmp_path, video_path):
+        _, records, _ = tracked_run(tmp_path / "run", VideoLoaderOpenCV(video_path))
+
+        plain = str(tmp_path / "plain.avi")
+        ResultsRenderer(VideoLoaderOpenCV(video_path), records).render(plain, start_frame=5, end_frame=30,
+                                                                       fourcc="FFV1")
+
+        # as small as the pool of the command line, the encoder queue is longer than the pool
+        pool = FramePool(4)
+        pooled = str(tmp_path / "pooled.avi")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", FramePoolWarning)
+            rendered = ResultsRenderer(VideoLoaderOpenCV(video_path, pool=pool), records).render(
+                pooled, start_frame=5, end_frame=30, fourcc="FFV1")
+
+        assert rendered == 25
+        assert pool.borrowed_count() == 0
+        assert all(np.array_equal(a, b) for a, b in zip(read_video(pooled), read_video(plain)))
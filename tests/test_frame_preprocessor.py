@@ -0,0 +1,111 @@
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from src.preprocessing import FramePreprocessor, PreparedFrame, frame_for
+from src.tracker.base import TrackerBase
+from src.tracker.multi_tracker_manager import MultiTrackerManager
+from src.tracker.tracker_manager import TrackerManager
+from src.tracker.trackers import MOSSETracker, MedianFlowTracker
+from src.videoloader import VideoLoaderOpenCV
+from tests.cache import TEST_VIDEO
+
+FRAME = np.random.default_rng(0).integers(0, 255, (64, 96, 3), dtype=np.uint8)
+
+
+class RecordingTracker(TrackerBase):
+    """
+    Records the frames it is given.
+    """
+    def __init__(self, representation: str = "bgr"):
+        super().__init__((0, 0, 10, 10))
+        self.representation = representation
+        self.frames = []
+
+    def track(self, frame):
+        self.frames.append(frame)
+        return self.bbox
+
+
+class TestPreparedFrame:
+    def test_representations(self):
+        prepared = PreparedFrame(FRAME, 0)
+
+        assert prepared.get() is FRAME
+        assert np.array_equal(prepared.get("gray"), cv2.cvtColor(FRAME, cv2.COLOR_BGR2GRAY))
+        assert np.array_equal(prepared.get("hsv"), cv2.cvtColor(FRAME, cv2.COLOR_BGR2HSV))
+        assert prepared.get("gray@0") is prepared.get("gray")
+        assert prepared.get("gray@2").shape == (16, 24)
+        assert [level.shape[:2] for level in prepared.pyramid(3)] == [(64, 96), (32, 48), (16, 24)]
+
+    def test_each_representation_is_computed_once(self):
+        prepared = PreparedFrame(FRAME, 0)
+        for _ in range(3):
+            prepared.get("gray@2")
+            prepared.get("lab")
+
+        assert prepared.computed == {"gray": 1, "gray@1": 1, "gray@2": 1, "lab": 1}
+
+    def test_concurrent_requests(self):
+        prepared = PreparedFrame(FRAME, 0)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(prepared.get("gray@1"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(result is results[0] for result in results)
+        assert prepared.computed["gray@1"] == 1
+
+    @pytest.mark.parametrize("name", ["grey", "gray@-1", "gray@x"])
+    def test_unknown_representation(self, name):
+        with pytest.raises(ValueError):
+            PreparedFrame(FRAME, 0).get(name)
+
+
+class TestFramePreprocessor:
+    def test_memoized_per_index(self):
+        preprocessor = FramePreprocessor(history=2)
+        first = preprocessor.prepare(FRAME, 0)
+        assert preprocessor.prepare(FRAME, 0) is first
+
+        preprocessor.prepare(FRAME.copy(), 1)
+        preprocessor.prepare(FRAME.copy(), 2)
+        # only the last two frames are kept
+        assert preprocessor.prepare(FRAME, 0) is not first
+
+    def test_trackers_get_their_representation(self):
+        bgr, gray = RecordingTracker(), RecordingTracker("gray")
+        prepared = PreparedFrame(FRAME, 0)
+
+        TrackerManager(bgr).track(prepared)
+        assert bgr.frames[0] is FRAME
+        assert frame_for(FRAME, gray) is FRAME
+
+        multi_tracker_manager = MultiTrackerManager(max_workers=4)
+        trackers = [RecordingTracker("gray") for _ in range(6)]
+        for target_id, tracker in enumerate(trackers):
+            multi_tracker_manager.add_target(target_id, tracker)
+        multi_tracker_manager.track(prepared)
+        multi_tracker_manager.close()
+
+        assert all(tracker.frames[0] is prepared.get("gray") for tracker in trackers)
+        assert prepared.computed["gray"] == 1
+
+    @pytest.mark.parametrize("tracker_class", [MOSSETracker, MedianFlowTracker])
+    def test_grayscale_trackers_give_the_same_bboxes(self, tracker_class):
+        loader = VideoLoaderOpenCV(TEST_VIDEO)
+        loader.open()
+        frames = [loader.get_frame() for _ in range(30)]
+        loader.close()
+
+        plain = TrackerManager(tracker_class((200, 100, 60, 50)))
+        prepared = TrackerManager(tracker_class((200, 100, 60, 50)))
+        preprocessor = FramePreprocessor()
+        for index, frame in enumerate(frames):
+            expected = plain.track(frame)
+            result = prepared.track(preprocessor.prepare(frame, index))
+            assert (expected is None and result is None) or np.allclose(expected, result)
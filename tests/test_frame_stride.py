@@ -0,0 +1,133 @@
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from src.pipeline import TrackingPipeline, FrameStride
+from src.tracker.tracker_manager import TrackerManager
+from src.tracker.trackers import CSRTTracker
+from src.videoloader import VideoLoaderOpenCV, VideoLoaderPrefetch
+from src.videoloader.base import VideoLoaderBase
+from tests.cache import TEST_VIDEO, BBOX
+
+
+
+class CountingCapture:
+    """
+    cv2.VideoCapture that counts the frames it returned.
+    """
+    def __init__(self, capture):
+        self.capture = capture
+        self.reads = 0
+
+    def read(self):
+        self.reads += 1
+        return self.capture.read()
+
+    def __getattr__(self, name):
+        return getattr(self.capture, name)
+
+
+class ListLoader(VideoLoaderBase):
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def get_frame(self):
+        return self.frames.pop(0) if self.frames else None
+
+
+class TestFrameStride:
+    def test_fixed_stride(self):
+        stride = FrameStride(3)
+        assert [stride.update(latency) for latency in (0.001, 1.0, 0.001)] == [3, 3, 3]
+
+    def test_adaptive_stride(self):
+        stride = FrameStride(adaptive=True, max_stride=4, budget=0.01, smoothing=1.0)
+
+        # a frame that takes 2.5 budgets has to skip the next two frames
+        assert stride.update(0.025) == 3
+        # stays while the latency does not fit the lower stride with headroom
+        assert stride.update(0.019) == 3
+        assert stride.update(0.015) == 2
+        assert stride.update(0.1) == 4
+        assert stride.update(0.001) == 1
+
+    def test_wrong_arguments(self):
+        with pytest.raises(ValueError):
+            FrameStride(0)
+        with pytest.raises(ValueError):
+            FrameStride(4, max_stride=2)
+        with pytest.raises(ValueError):
+            FrameStride(adaptive=True)
+
+
+class TestSkip:
+    def test_opencv_skip_grabs(self, reference_frames):
+        loader = VideoLoaderOpenCV(TEST_VIDEO)
+        loader.open()
+        loader.video = CountingCapture(loader.video)
+
+        assert loader.skip(10) == 10
+        assert loader.get_position() == 10
+        assert np.array_equal(loader.get_frame(), reference_frames[10])
+        assert loader.video.reads == 1
+        loader.close()
+
+    def test_skip_past_the_end(self):
+        loader = ListLoader([np.zeros((2, 2, 3))] * 3)
+        assert loader.skip(5) == 3
+        assert loader.get_frame() is None
+
+
+class TestPipelineStride:
+    def test_every_kth_frame(self, reference_frames):
+        pipeline = TrackingPipeline(TrackerManager(CSRTTracker()), VideoLoaderOpenCV(TEST_VIDEO), end_frame=40,
+                                    frame_stride=FrameStride(4))
+        pipeline.open()
+        pipeline.set_bbox(BBOX)
+
+        processed = []
+        pipeline.run(on_frame=lambda frame: processed.append(pipeline.frame_counter))
+
+        assert processed == list(range(0, 40, 4))
+        assert pipeline.frame_counter == 40
+
+    def test_every_kth_frame_with_prefetch(self, reference_frames):
+        loader = VideoLoaderPrefetch(VideoLoaderOpenCV(TEST_VIDEO), queue_size=2)
+        pipeline = TrackingPipeline(TrackerManager(CSRTTracker()), loader, end_frame=40, frame_stride=FrameStride(4))
+        pipeline.open()
+        pipeline.set_bbox(BBOX)
+
+        processed = []
+        pipeline.run(on_frame=lambda frame: processed.append((pipeline.frame_counter, frame)))
+
+        assert [index for index, _ in processed] == list(range(0, 40, 4))
+        # the annotated frames are the right frames of the video, only the bbox is drawn on them
+        assert all(np.mean(frame != reference_frames[index]) < 0.05 for index, frame in processed)
+
+    def test_output_plays_at_source_speed(self, tmp_path):
+        output_path = str(tmp_path / "output.avi")
+        pipeline = TrackingPipeline(TrackerManager(CSRTTracker()), VideoLoaderOpenCV(TEST_VIDEO), end_frame=40,
+                                    output_path=output_path, frame_stride=FrameStride(4))
+        pipeline.open()
+        pipeline.set_bbox(BBOX)
+        pipeline.run()
+
+        capture = cv2.VideoCapture(output_path)
+        assert capture.get(cv2.CAP_PROP_FPS) == pytest.approx(25 / 4)
+        assert capture.get(cv2.CAP_PROP_FRAME_COUNT) == 10
+        capture.release()
+
+    def test_adaptive_stride_follows_latency(self):
+        pipeline = TrackingPipeline(TrackerManager(CSRTTracker()), VideoLoaderOpenCV(TEST_VIDEO), end_frame=60,
+                                    frame_stride=FrameStride(adaptive=True, budget=0.004, smoothing=1.0))
+        pipeline.open()
+        pipeline.set_bbox(BBOX)
+
+        processed = []
+        # every frame takes about three budgets
+        pipeline.run(on_frame=lambda frame: processed.append(pipeline.frame_counter) or time.sleep(0.011))
+
+        assert len(processed) < 30
+        assert pipeline.frame_stride.stride >= 3
@@ -0,0 +1,121 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from src.profiling import instrumentation as global_instrumentation
+from src.pipeline import TrackingPipeline
+from src.profiling.instrumentation import Histogram, Instrumentation
+from src.tracker.tracker_manager import TrackerManager
+from src.tracker.trackers import CSRTTracker
+from src.videoloader import VideoLoaderCached, VideoLoaderOpenCV, VideoLoaderPrefetch, FrameCache
+from tests.cache import TEST_VIDEO
+from tests.test_video_loader_cached import make_video
+
+
+class TestHistogram:
+    def test_buckets(self):
+        histogram = Histogram(bounds=(1, 10, 100))
+        for value in (0.5, 2, 3, 50, 500):
+            histogram.add(value)
+
+        assert histogram.counts == [1, 2, 1, 1]
+        assert histogram.percentile(50) == 10
+        assert histogram.percentile(100) == 500
+        assert histogram.to_dict()["mean_ms"] == np.mean([0.5, 2, 3, 50, 500])
+
+
+class TestInstrumentation:
+    def test_disabled_records_nothing(self):
+        instrumentation = Instrumentation()
+        with instrumentation.timer("stage"):
+            pass
+        instrumentation.count("frames")
+
+        assert instrumentation.summary()["stages"] == {}
+        assert instrumentation.summary()["counters"] == {}
+
+    def test_timer_and_counters(self, tmp_path):
+        instrumentation = Instrumentation(enabled=True)
+        for _ in range(3):
+            with instrumentation.timer("stage"):
+                pass
+            instrumentation.count("frames")
+
+        summary = instrumentation.summary()
+        assert summary["stages"]["stage"]["count"] == 3
+        assert summary["counters"] == {"frames": 3}
+
+        instrumentation.save_json(tmp_path / "profile.json")
+        with open(tmp_path / "profile.json") as file:
+            assert json.load(file)["counters"]["frames"] == 3
+
+    def test_periodic_report(self):
+        stream = io.StringIO()
+        instrumentation = Instrumentation(enabled=True, report_interval=0, stream=stream)
+        instrumentation.record("tracker.track", 0.002)
+        instrumentation.maybe_report()
+
+        assert "tracker.track=2.00ms" in stream.getvalue()
+
+    def test_exception_is_not_swallowed(self):
+        instrumentation = Instrumentation(enabled=True)
+        try:
+            with instrumentation.timer("stage"):
+                raise KeyError("failure")
+        except KeyError:
+            pass
+        assert instrumentation.summary()["stages"]["stage"]["count"] == 1
+
+
+@pytest.fixture
+def enabled():
+    global_instrumentation.reset()
+    global_instrumentation.enable()
+    yield
+    global_instrumentation.disable()
+    global_instrumentation.reset()
+
+
+@pytest.mark.usefixtures("enabled")
+class TestLoaderStages:
+    @staticmethod
+    def read_all(loader):
+        loader.open()
+        while loader.get_frame() is not None:
+            pass
+        loader.close()
+        return global_instrumentation.summary()["stages"]
+
+    def test_cached(self, tmp_path):
+        video_path = make_video(tmp_path / "video.mp4")
+        cache = FrameCache(str(tmp_path / "cache"))
+        # the first open decodes the video into the cache
+        self.read_all(VideoLoaderCached(video_path, cache))
+        global_instrumentation.reset()
+
+        stages = self.read_all(VideoLoaderCached(video_path, cache))
+        assert stages["loader.get_frame"]["count"] == 10
+
+    def test_prefetch(self, tmp_path):
+        stages = self.read_all(VideoLoaderPrefetch(VideoLoaderOpenCV(make_video(tmp_path / "video.mp4"))))
+        # one wait per frame and one for the end of the video
+        assert stages["loader.wait"]["count"] == 11
+        assert stages["loader.get_frame"]["count"] == 11
+
+
+@pytest.mark.usefixtures("enabled")
+class TestPipelineStages:
+    def test_overlay_draw_and_encode(self, tmp_path):
+        pipeline = TrackingPipeline(TrackerManager(CSRTTracker()), VideoLoaderOpenCV(TEST_VIDEO),
+                                    output_path=str(tmp_path / "output.avi"), end_frame=11)
+        pipeline.open()
+        pipeline.set_bbox((200, 100, 60, 50))
+        pipeline.run()
+
+        stages = global_instrumentation.summary()["stages"]
+        # one overlay copy, bbox and encoded frame for each of the frames 0 to 10
+        assert stages["pipeline.overlay"]["count"] == 11
+        assert stages["pipeline.draw"]["count"] == 11
+        assert stages["writer.encode"]["count"] == 11
@@ -0,0 +1,134 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from src.pipeline import TrackingPipeline
+from src.tracker.tracker_manager import TrackerManager
+from src.tracker.trackers import CSRTTracker, MOSSETracker
+from src.videoloader import VideoLoaderOpenCV, VideoLoaderPrefetch
+from src.videoloader.keyframe_index import KeyframeIndex, read_mp4_index, INDEX_SUFFIX
+from src.videoloader.videoloader_opencv import OPENCV_SEEK_MARGIN
+from tests.cache import TEST_VIDEO
+
+
+class RecordingCapture:
+    """
+    cv2.VideoCapture that records the frames it was set to.
+    """
+    def __init__(self, capture):
+        self.capture = capture
+        self.jumps = []
+
+    def set(self, prop, value):
+        self.jumps.append(value)
+        return self.capture.set(prop, value)
+
+    def __getattr__(self, name):
+        return getattr(self.capture, name)
+
+
+class TestKeyframeIndex:
+    def test_mp4_index(self, reference_frames):
+        keyframes, timestamps = read_mp4_index(TEST_VIDEO)
+
+        assert keyframes[0] == 0
+        assert keyframes == sorted(keyframes)
+        assert len(timestamps) == len(reference_frames)
+        assert np.allclose(np.diff(timestamps), 1 / 25)
+
+    def test_index_is_cached(self, video_path, reference_frames):
+        index = KeyframeIndex.load(video_path)
+        assert os.path.exists(video_path + INDEX_SUFFIX)
+        assert index.frame_count == len(reference_frames)
+
+        cached = KeyframeIndex.load(video_path)
+        assert cached.keyframes == index.keyframes
+        assert cached.timestamps == index.timestamps
+
+    def test_changed_video_is_indexed_again(self, video_path):
+        with open(video_path + INDEX_SUFFIX, "w") as file:
+            file.write('{"size": 1, "mtime": 0}')
+        assert KeyframeIndex.load(video_path).keyframes is not None
+
+    def test_lookups(self):
+        index = KeyframeIndex(100, 10, keyframes=[0, 40, 80])
+        assert index.keyframe_before(39) == 0
+        assert index.keyframe_before(40) == 40
+        assert index.keyframe_before(99) == 80
+        assert index.frame_at(4.05) == 40
+        assert index.frame_at(1000) == 100
+        assert KeyframeIndex(100, 10).keyframe_before(50) is None
+
+        variable = KeyframeIndex(4, 10, keyframes=[0], timestamps=[0, 0.1, 0.5, 0.6])
+        assert variable.frame_at(0.3) == 1
+        assert variable.frame_at(0.5) == 2
+        assert variable.time_of(3) == 0.6
+
+
+class TestSeek:
+    @pytest.mark.parametrize("targets", [[300], [600, 10], [251, 255, 260, 240], [0, 660, 500]])
+    def test_seek_returns_the_frame(self, video_path, reference_frames, targets):
+        loader = VideoLoaderOpenCV(video_path)
+        loader.open()
+        for target in targets:
+            loader.seek(target)
+            assert loader.get_position() == target
+            assert np.array_equal(loader.get_frame(), reference_frames[target])
+        loader.close()
+
+    def test_short_seek_decodes_forward(self, video_path):
+        loader = VideoLoaderOpenCV(video_path)
+        loader.open()
+        loader.video = RecordingCapture(loader.video)
+
+        loader.seek(OPENCV_SEEK_MARGIN // 2)
+        assert loader.video.jumps == []
+        loader.seek(600)
+        assert loader.video.jumps == [600]
+        loader.close()
+
+    def test_seek_time(self, video_path, reference_frames):
+        loader = VideoLoaderOpenCV(video_path)
+        loader.open()
+        loader.seek_time(10.0)
+        assert loader.get_position() == 250
+        assert np.array_equal(loader.get_frame(), reference_frames[250])
+        loader.close()
+
+    def test_prefetch_seek(self, video_path, reference_frames):
+        loader = VideoLoaderPrefetch(VideoLoaderOpenCV(video_path), queue_size=4)
+        loader.open()
+        loader.get_frame()
+        loader.seek(400)
+        assert np.array_equal(loader.get_frame(), reference_frames[400])
+        assert np.array_equal(loader.get_frame(), reference_frames[401])
+        loader.close()
+
+    def test_out_of_range(self, video_path, reference_frames):
+        loader = VideoLoaderOpenCV(video_path)
+        loader.open()
+        with pytest.raises(IndexError):
+            loader.seek(len(reference_frames) + 1)
+        loader.close()
+
+
+class TestPipelineFrameRange:
+    def test_frame_range(self, video_path, reference_frames, tmp_path):
+        log_path = str(tmp_path / "log.csv")
+        pipeline = TrackingPipeline(TrackerManager(CSRTTracker()), VideoLoaderOpenCV(video_path),
+                                    log_path=log_path, start_frame=300, end_frame=320)
+        assert np.array_equal(pipeline.open(), reference_frames[300])
+        pipeline.set_bbox((200, 100, 60, 50), event='Init')
+        pipeline.run()
+
+        assert pipeline.frame_counter == 320
+        with open(log_path) as file:
+            frames = [int(line.split(",")[0]) for line in file.readlines()[1:]]
+        assert frames[0] == 300
+        assert max(frames) == 319
+
+    def test_wrong_range(self, video_path):
+        with pytest.raises(ValueError):
+            TrackingPipeline(TrackerManager(MOSSETracker()), VideoLoaderOpenCV(video_path), start_frame=10, end_frame=5)
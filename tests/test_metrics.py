@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from src.benchmark import metrics
+
+GROUND_TRUTH = np.array([[0, 0, 10, 10]] * 5, dtype=np.float64)
+PREDICTED = np.array([[0, 0, 10, 10],
+                      [5, 0, 10, 10],
+                      [np.nan] * 4,
+                      [100, 100, 5, 5],
+                      [0, 5, 10, 10]])
+
+
+class TestMetrics:
+    def test_iou(self):
+        assert np.allclose(metrics.iou(PREDICTED, GROUND_TRUTH), [1, 1 / 3, 0, 0, 1 / 3])
+
+    def test_center_error(self):
+        errors = metrics.center_error(PREDICTED, GROUND_TRUTH)
+        assert np.allclose(errors[[0, 1, 4]], [0, 5, 5])
+        assert np.isinf(errors[2])
+        assert np.allclose(metrics.center_error(PREDICTED, GROUND_TRUTH, normalized=True)[1], 0.5)
+
+    def test_frames_without_annotation_are_ignored(self):
+        ground_truth = GROUND_TRUTH.copy()
+        ground_truth[1] = np.nan
+        ground_truth[3, 2] = 0
+
+        overlaps = metrics.iou(PREDICTED, ground_truth)
+        assert np.isnan(overlaps[[1, 3]]).all()
+        assert metrics.success_curve(overlaps)[0] == pytest.approx(2 / 3)
+        assert metrics.evaluate(PREDICTED, ground_truth)["frames"] == 3
+
+    def test_success_and_precision(self):
+        overlaps = metrics.iou(PREDICTED, GROUND_TRUTH)
+        curve = metrics.success_curve(overlaps, thresholds=[0, 0.5, 1])
+        assert np.allclose(curve, [3 / 5, 1 / 5, 0])
+        assert metrics.success_auc(overlaps) == pytest.approx(np.mean(metrics.success_curve(overlaps)))
+
+        errors = metrics.center_error(PREDICTED, GROUND_TRUTH)
+        assert metrics.precision(errors) == pytest.approx(3 / 5)
+        assert metrics.precision(errors, threshold=1) == pytest.approx(1 / 5)
+
+    def test_perfect_tracker(self):
+        scores = metrics.evaluate(GROUND_TRUTH, GROUND_TRUTH)
+        assert scores["success_auc"] == pytest.approx(20 / 21)
+        assert scores["precision"] == 1
+        assert scores["mean_iou"] == 1
+        assert scores["failures"] == 0
+
+    def test_failures(self):
+        overlaps = np.array([0.5, 0.0, 0.0, 0.6, np.nan, 0.0, 0.7, np.nan, 0.8])
+        assert metrics.failures(overlaps) == 2
+        # a gap in the annotation does not end a failure
+        assert metrics.failures(np.array([0.0, np.nan, 0.0, 0.5])) == 1
+        assert metrics.failures(np.array([0.5, 0.3, 0.2]), threshold=0.4) == 1
+
+    def test_many_sequences(self):
+        rng = np.random.default_rng(0)
+        lengths = [30, 50, 10]
+        ground_truth = [rng.uniform(10, 100, (length, 4)) for length in lengths]
+        predicted = [boxes + rng.normal(0, 5, boxes.shape) for boxes in ground_truth]
+
+        scores = metrics.evaluate(metrics.stack_sequences(predicted), metrics.stack_sequences(ground_truth))
+        assert scores["frames"].tolist() == lengths
+
+        for index in range(len(lengths)):
+            single = metrics.evaluate(predicted[index], ground_truth[index])
+            for name, values in scores.items():
+                assert values[index] == pytest.approx(single[name])
+
+    def test_shape_mismatch(self):
+        with pytest.raises(ValueError):
+            metrics.iou(PREDICTED, GROUND_TRUTH[:3])
@@ -0,0 +1,95 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.preprocessing import PreparedFrame
+from src.tracker.base import TrackerBase
+from src.tracker.motion_model import ConstantVelocityModel, KalmanMotionModel
+from src.tracker.realtime_tracker_manager import RealtimeTrackerManager
+
+
+class SlowTracker(TrackerBase):
+    """
+    Moves the bbox by 2 pixels to the right on every call and takes `delay` seconds.
+    """
+    def __init__(self, delay: float):
+        super().__init__(np.array([0, 0, 10, 10]))
+        self.delay = delay
+        self.calls = 0
+
+    def track(self, frame):
+        time.sleep(self.delay)
+        self.calls += 1
+        x, y, w, h = self.bbox
+        self.bbox = np.array([x + 2, y, w, h])
+        return self.bbox
+
+
+FRAME = np.zeros((20, 20, 3), dtype=np.uint8)
+
+
+class TestMotionModels:
+    @pytest.mark.parametrize("model_class", [ConstantVelocityModel, KalmanMotionModel])
+    def test_constant_velocity(self, model_class):
+        model = model_class()
+        assert model.predict(0) is None
+
+        for index in range(10):
+            model.update(index, (10 + 3 * index, 20, 30, 40))
+
+        x, y, w, h = model.predict(12)
+        assert abs(x - (10 + 3 * 12)) < 1.5
+        assert abs(y - 20) < 0.5
+        assert abs(w - 30) < 0.5
+
+
+class TestRealtimeTrackerManager:
+    def test_fast_tracker_is_never_skipped(self):
+        tracker = SlowTracker(delay=0)
+        manager = RealtimeTrackerManager(tracker, budget=1)
+
+        for _ in range(5):
+            manager.track(FRAME)
+            assert not manager.is_predicted()
+        assert tracker.calls == 5
+
+    def test_slow_tracker_is_skipped(self):
+        tracker = SlowTracker(delay=0.025)
+        manager = RealtimeTrackerManager(tracker, budget=0.01)
+
+        predicted = []
+        for _ in range(12):
+            bbox = manager.track(FRAME)
+            predicted.append(manager.is_predicted())
+            assert bbox is not None
+
+        # each tracked frame takes about three budgets, so two frames after it are predicted
+        assert predicted[:3] == [False, True, True]
+        assert manager.predicted_frames + manager.tracked_frames == 12
+        assert tracker.calls == manager.tracked_frames < 12
+
+    def test_frames_are_counted_in_the_source(self):
+        manager = RealtimeTrackerManager(SlowTracker(delay=0.025), budget=0.01)
+        manager.track(PreparedFrame(FRAME, 0))
+
+        # the frames that arrived while the tracker was busy were skipped or dropped before they got here
+        manager.track(PreparedFrame(FRAME, 10))
+        assert manager.frame_index == 10 and not manager.is_predicted()
+
+        # predicted from the source indices: 2 pixels from frame 0 to frame 10
+        x, _, _, _ = manager.track(PreparedFrame(FRAME, 11))
+        assert manager.is_predicted()
+        assert x == pytest.approx(4.2)
+
+    def test_set_bbox_resets_prediction(self):
+        manager = RealtimeTrackerManager(SlowTracker(delay=0.02), budget=0.005)
+        manager.track(FRAME)
+
+        manager.set_bbox(np.array([5, 5, 10, 10]))
+        manager.track(FRAME)
+        assert not manager.is_predicted()
+
+    def test_wrong_budget(self):
+        with pytest.raises(ValueError, match="Budget"):
+            RealtimeTrackerManager(SlowTracker(delay=0), budget=0)
@@ -0,0 +1,100 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.tracker.redetector import Redetector, RedetectingTracker
+from src.tracker.trackers import CSRTTracker, MOSSETracker
+from tests.test_cascade_tracker import ScriptedTracker
+
+
+PATCH = np.random.default_rng(0).integers(0, 255, (40, 40, 3), dtype=np.uint8)
+
+
+def make_image(x, y, scale=1.0):
+    image = np.full((360, 640, 3), 127, dtype=np.uint8)
+    patch = cv2.resize(PATCH, None, fx=scale, fy=scale) if scale != 1.0 else PATCH
+    image[y:y + patch.shape[0], x:x + patch.shape[1]] = patch
+    return image
+
+
+class TestRedetector:
+    def test_search_near_last_bbox(self):
+        redetector = Redetector()
+        redetector.update_template(make_image(100, 100), (100, 100, 40, 40))
+
+        bbox, score = redetector.search(make_image(130, 110), (100, 100, 40, 40))
+        assert score > 0.9
+        assert np.allclose(bbox, (130, 110, 40, 40), atol=1)
+
+    def test_search_other_scale(self):
+        redetector = Redetector()
+        redetector.update_template(make_image(100, 100), (100, 100, 40, 40))
+
+        bbox, _ = redetector.search(make_image(120, 100, scale=1.25), (100, 100, 40, 40))
+        assert np.allclose(bbox, (120, 100, 50, 50), atol=2)
+
+    def test_search_full_frame(self):
+        redetector = Redetector(search_factors=(2,), threshold=0.5, full_frame_size=None)
+        redetector.update_template(make_image(20, 20), (20, 20, 40, 40))
+        assert redetector.search(make_image(550, 300), (20, 20, 40, 40)) is None
+
+        redetector.full_frame_size = 640
+        bbox, _ = redetector.search(make_image(550, 300), (20, 20, 40, 40))
+        assert np.allclose(bbox, (550, 300, 40, 40), atol=1)
+
+    def test_not_found(self):
+        redetector = Redetector()
+        redetector.update_template(make_image(100, 100), (100, 100, 40, 40))
+        assert redetector.search(np.full((360, 640, 3), 127, dtype=np.uint8), (100, 100, 40, 40)) is None
+
+
+class TestRedetectingTracker:
+    def test_recovers_after_failure(self):
+        inner = ScriptedTracker([(101, 100, 40, 40)])
+        tracker = RedetectingTracker(inner, bbox=(100, 100, 40, 40))
+
+        tracker.track(make_image(100, 100))
+        assert tracker.track(make_image(101, 100)) == (101, 100, 40, 40)
+
+        # inner tracker loses the object, it is found and the tracker is initialized there
+        bbox = tracker.track(make_image(150, 120))
+        assert np.allclose(bbox, (150, 120, 40, 40), atol=1)
+        assert inner.inits == 2
+        assert tracker.redetections == 1
+
+    def test_stays_lost_without_match(self):
+        inner = ScriptedTracker([])
+        tracker = RedetectingTracker(inner, bbox=(100, 100, 40, 40))
+        empty = np.full((360, 640, 3), 127, dtype=np.uint8)
+
+        tracker.track(make_image(100, 100))
+        assert tracker.track(empty) is None
+        assert tracker.track(empty) is None
+        assert inner.inits == 1
+
+        assert tracker.track(make_image(300, 200)) is not None
+
+    def test_opencv_tracker(self):
+        tracker = RedetectingTracker(CSRTTracker(), bbox=(100, 100, 40, 40))
+        tracker.track(make_image(100, 100))
+        bbox = tracker.track(make_image(104, 100))
+        assert abs(bbox[0] - 104) < 5
+
+    def test_search_window_is_set_on_the_wrapped_tracker(self):
+        image = np.full((720, 1280, 3), 255, dtype=np.uint8)
+        image[300:360, 600:660, :] = 0
+        image[320:340, 620:640, :] = 128
+
+        tracker = RedetectingTracker(MOSSETracker(), bbox=np.array([600, 300, 60, 60]))
+        tracker.set_search_window(margin=1.0, target_size=96)
+        assert tracker.inner.search_margin == 1.0
+        assert tracker.inner.search_size == 96
+
+        tracker.track(image)
+        bbox = tracker.track(image)
+        # the wrapped tracker was initialized in a window around the target, not on the full frame
+        assert tracker.inner.window is not None
+        assert abs(bbox[0] - 600) < 3 and abs(bbox[1] - 300) < 3
+
+        with pytest.raises(ValueError):
+            tracker.set_search_window(margin=-1.0)
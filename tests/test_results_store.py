@@ -0,0 +1,117 @@
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+from src.pipeline import ResultsStore
+from src.videoloader import VideoLoaderOpenCV
+from src.visualizer.results_renderer import ResultsRenderer
+from src.visualizer.tracking_log import RECORD_DTYPE
+from tests.cache import TEST_VIDEO, BBOX, copy_test_video, read_video, tracked_run
+
+CONFIG = {"tracker": "CSRT", "params": None}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultsStore(str(tmp_path / "results"))
+
+
+@pytest.fixture(scope="module")
+def video_path(tmp_path_factory):
+    return copy_test_video(tmp_path_factory.mktemp("video"))
+
+
+@pytest.fixture(scope="module")
+def logged_run(tmp_path_factory, video_path):
+    """
+    Log and annotated frames of a tracked run of frames 0 .. 29.
+    """
+    _, records, annotated = tracked_run(tmp_path_factory.mktemp("run"), VideoLoaderOpenCV(video_path), output=False)
+    return records, annotated
+
+
+def render(video_path, records, path, **kwargs):
+    # lossless codec, so the rendered frames can be compared exactly
+    return ResultsRenderer(VideoLoaderOpenCV(video_path), records).render(path, fourcc="FFV1", **kwargs)
+
+
+class TestResultsStore:
+    def test_key(self, store, tmp_path):
+        key = store.key(TEST_VIDEO, CONFIG, {0: BBOX})
+        assert store.key(TEST_VIDEO, dict(CONFIG), {0: list(BBOX)}) == key
+
+        assert store.key(TEST_VIDEO, dict(CONFIG, params={"padding": 2}), {0: BBOX}) != key
+        assert store.key(TEST_VIDEO, CONFIG, {0: (201, 100, 60, 50)}) != key
+        assert store.key(TEST_VIDEO, CONFIG, {0: BBOX}, start_frame=10) != key
+
+        # the key depends on the content, not the path
+        copy = str(tmp_path / "copy.mp4")
+        shutil.copy(TEST_VIDEO, copy)
+        assert store.key(copy, CONFIG, {0: BBOX}) == key
+
+    def test_lookup_covers_shorter_runs(self, store):
+        key = store.key(TEST_VIDEO, CONFIG, {0: BBOX})
+        assert store.lookup(key) is None
+
+        np.save(open(store.begin(key), "wb"), np.zeros(3, dtype=RECORD_DTYPE))
+        store.save(key, end_frame=100, complete=False)
+
+        assert store.lookup(key, end_frame=50) is not None
+        assert store.lookup(key, end_frame=100) is not None
+        assert store.lookup(key, end_frame=101) is None
+        assert store.lookup(key) is None
+
+        store.save(key, end_frame=661, complete=True)
+        assert store.lookup(key, end_frame=1000) is not None
+        assert ResultsStore(store.directory).lookup(key) is not None
+
+    def test_begin_forgets_run(self, store):
+        key = store.key(TEST_VIDEO, CONFIG, {0: BBOX})
+        np.save(open(store.begin(key), "wb"), np.zeros(3, dtype=RECORD_DTYPE))
+        store.save(key, end_frame=100, complete=True)
+
+        store.begin(key)
+        assert store.lookup(key) is None
+
+    def test_load_range(self, store, logged_run):
+        records, _ = logged_run
+        key = store.key(TEST_VIDEO, CONFIG, {0: BBOX})
+        np.save(open(store.begin(key), "wb"), records)
+        store.save(key, end_frame=30, complete=False)
+
+        assert store.load(key, end_frame=10)["frame"].max() == 9
+        assert len(store.load(key)) == len(records)
+
+
+class TestResultsRenderer:
+    def test_render_matches_tracked_frames(self, logged_run, tmp_path, video_path):
+        records, annotated = logged_run
+        path = str(tmp_path / "rendered.avi")
+
+        assert render(video_path, records, path, end_frame=30) == 30
+        rendered = read_video(path)
+        assert len(rendered) == 30
+        assert all(np.array_equal(a, b) for a, b in zip(annotated, rendered))
+
+    def test_frame_range(self, logged_run, tmp_path, video_path):
+        records, annotated = logged_run
+        path = str(tmp_path / "rendered.avi")
+
+        assert render(video_path, records, path, start_frame=10, end_frame=20) == 10
+        assert all(np.array_equal(a, b) for a, b in zip(annotated[10:20], read_video(path)))
+
+    def test_logged_only(self, logged_run, tmp_path, video_path):
+        records, annotated = logged_run
+        # every third frame, like a run with stride 3
+        records = records[records["frame"] % 3 == 0]
+        path = str(tmp_path / "rendered.avi")
+
+        assert render(video_path, records, path, logged_only=True, stride=3) == 10
+        assert all(np.array_equal(a, b) for a, b in zip(annotated[::3], read_video(path)))
+
+        capture = cv2.VideoCapture(path)
+        # the output plays at the speed of the source
+        assert capture.get(cv2.CAP_PROP_FPS) == pytest.approx(25 / 3, abs=1e-3)
+        capture.release()
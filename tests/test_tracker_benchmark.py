@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from src.benchmark.tracker_benchmark import TrackerBenchmark, available_trackers, run_tracker, REPORT_FIELDS
+from tests.cache import TEST_VIDEO
+
+
+BBOX = (200, 100, 60, 50)
+
+
+class TestTrackerBenchmark:
+    def test_available_trackers(self):
+        trackers = available_trackers()
+        assert "MIL" in trackers
+        assert "CSRT" in trackers
+
+    def test_run_tracker(self):
+        result = run_tracker("KCF", TEST_VIDEO, BBOX, max_frames=10)
+
+        assert set(result) == set(REPORT_FIELDS)
+        assert result["frames"] == 10
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        assert result["fps"] > 0
+
+    def test_unknown_tracker(self):
+        with pytest.raises(ValueError, match="Unknown trackers"):
+            TrackerBenchmark(TEST_VIDEO, BBOX, trackers=["UNKNOWN"])
+
+    def test_reports(self, tmp_path):
+        benchmark = TrackerBenchmark(TEST_VIDEO, BBOX, trackers=["MOSSE", "KCF"], max_frames=5, isolate=False)
+        results = benchmark.run()
+        assert [row["tracker"] for row in results] == ["MOSSE", "KCF"]
+
+        benchmark.save_json(tmp_path / "report.json")
+        benchmark.save_csv(tmp_path / "report.csv")
+
+        with open(tmp_path / "report.json") as file:
+            assert len(json.load(file)["results"]) == 2
+
+        with open(tmp_path / "report.csv") as file:
+            assert file.readline().strip() == ",".join(REPORT_FIELDS)
+
+    def test_isolated_run(self):
+        results = TrackerBenchmark(TEST_VIDEO, BBOX, trackers=["MOSSE"], max_frames=3).run()
+        assert results[0]["frames"] == 3
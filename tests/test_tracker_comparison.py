@@ -0,0 +1,86 @@
+import os
+import signal
+
+import numpy as np
+
+from src.benchmark.tracker_comparison import SharedFrameRing, TrackerComparison
+from src.tracker.base import TrackerBase
+from src.tracker.tracker_manager import TrackerManager
+from src.tracker.tracker_registry import TrackerRegistry
+from src.tracker.trackers import KCFTracker
+from src.videoloader import VideoLoaderOpenCV
+from tests.cache import TEST_VIDEO
+
+
+BBOX = (200, 100, 60, 50)
+
+
+class KilledTracker(TrackerBase):
+    """
+    Killed on its fifth frame, like a tracker that crashes inside OpenCV.
+    """
+    def __init__(self, bbox=(0, 0, 10, 10)):
+        super().__init__(bbox)
+        self.frames = 0
+
+    def track(self, frame):
+        self.frames += 1
+        if self.frames == 5:
+            os.kill(os.getpid(), signal.SIGKILL)
+        return self.bbox
+
+
+class TestSharedFrameRing:
+    def test_attach(self):
+        ring = SharedFrameRing((4, 4, 3), slots=2)
+        attached = SharedFrameRing((4, 4, 3), slots=2, name=ring.name)
+
+        ring.slot(3)[:] = 7
+        assert (attached.slot(1) == 7).all()
+
+        attached.close()
+        ring.close()
+        ring.unlink()
+
+
+class TestTrackerComparison:
+    def test_same_result_as_single_run(self):
+        comparison = TrackerComparison(TEST_VIDEO, BBOX, trackers=["KCF", "MOSSE"], slots=4, max_frames=30)
+        bboxes = comparison.run()
+
+        assert set(bboxes) == {"KCF", "MOSSE"}
+        assert not comparison.errors
+        assert bboxes["KCF"].shape == (30, 4)
+
+        # bboxes have to match a sequential run of the same tracker
+        loader = VideoLoaderOpenCV(TEST_VIDEO)
+        loader.open()
+        tracker_manager = TrackerManager(KCFTracker())
+        tracker_manager.set_bbox(BBOX)
+        for expected in bboxes["KCF"]:
+            bbox = tracker_manager.track(loader.get_frame())
+            if bbox is None:
+                assert np.isnan(expected).all()
+            else:
+                assert np.allclose(bbox, expected)
+        loader.close()
+
+    def test_save_csv(self, tmp_path):
+        comparison = TrackerComparison(TEST_VIDEO, BBOX, trackers=["MOSSE"], slots=2, max_frames=5)
+        comparison.run()
+        comparison.save_csv(tmp_path / "comparison.csv")
+
+        with open(tmp_path / "comparison.csv") as file:
+            lines = file.readlines()
+        assert len(lines) == 6
+
+    def test_killed_worker(self):
+        tracker_registry = TrackerRegistry()
+        tracker_registry.register("KILLED", KilledTracker)
+
+        comparison = TrackerComparison(TEST_VIDEO, BBOX, trackers=["KILLED", "MOSSE"], slots=2, max_frames=30,
+                                       tracker_registry=tracker_registry)
+        bboxes = comparison.run()
+
+        assert set(bboxes) == {"MOSSE"} and bboxes["MOSSE"].shape == (30, 4)
+        assert "exited with code" in comparison.errors["KILLED"]
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from src.tracker import trackers
+from src.tracker.tracker_registry import TrackerRegistry, TRACKER_PATHS
+from src.tracker.trackers import KCFTracker, GOTURNTracker, MOSSETracker
+
+
+class TestTrackerRegistry:
+    def setup_method(self):
+        self.registry = TrackerRegistry()
+
+    def test_names(self):
+        assert self.registry.names() == list(TRACKER_PATHS)
+        assert "KCF" in self.registry
+
+    def test_available(self):
+        registry = TrackerRegistry(files={"GOTURN": ("missing.prototxt",)})
+        assert "GOTURN" not in registry.available()
+        assert "CSRT" in registry.available()
+
+    def test_opt_in_trackers_are_not_available_by_default(self):
+        assert "CASCADE" not in self.registry.available()
+        assert "MOSSE_BATCHED" not in self.registry.available()
+        assert "MOSSE_BATCHED" in self.registry.available(include_opt_in=True)
+        assert "MOSSE_BATCHED" in self.registry.names()
+
+    def test_lazy_import(self):
+        assert not self.registry.classes
+
+        tracker = self.registry.create("KCF", bbox=np.array([1, 2, 3, 4]))
+        assert isinstance(tracker, KCFTracker)
+        assert np.array_equal(tracker.bbox, [1, 2, 3, 4])
+        assert list(self.registry.classes) == ["KCF"]
+
+        # OpenCV tracker is created only on initialization
+        assert tracker.tracker is None
+
+    def test_unknown_tracker(self):
+        with pytest.raises(ValueError, match="Unknown tracker"):
+            self.registry.create("FAST")
+
+    def test_params(self):
+        tracker = self.registry.create("KCF", bbox=(50, 50, 100, 100), params={"detect_thresh": 0.3})
+        image = np.ones((200, 200, 3), dtype=np.uint8) * 255
+        image[50:150, 50:150, :] = 0
+        tracker.track(image)
+        assert len(tracker.track(image)) == 4
+
+        # rejected at creation, not on the first frame
+        with pytest.raises(ValueError, match="Unknown parameter"):
+            self.registry.create("KCF", params={"speed": 1})
+        with pytest.raises(ValueError, match="Wrong value"):
+            self.registry.create("CSRT", params={"padding": "wide"})
+
+        with pytest.raises(ValueError, match="Wrong arguments of tracker MOSSE"):
+            self.registry.create("MOSSE", params={"sigma": 1})
+
+    def test_register(self):
+        self.registry.register("FAST", MOSSETracker)
+        assert isinstance(self.registry.create("FAST"), MOSSETracker)
+
+        self.registry.register("KCF2", "src.tracker.trackers:KCFTracker")
+        assert isinstance(self.registry.create("KCF2"), KCFTracker)
+
+    def test_startup_report(self):
+        self.registry.create("CSRT")
+        report = self.registry.startup_report()
+        assert set(report["CSRT"]) == {"import_ms", "create_ms"}
+
+
+class TestGOTURNPool:
+    def test_released_tracker_is_reused(self, monkeypatch):
+        network = object()
+        monkeypatch.setattr(trackers, "_goturn_pool", {("goturn.prototxt", "goturn.caffemodel"): [network]})
+
+        tracker = GOTURNTracker()
+        assert tracker.create_tracker() is network
+        tracker.tracker = network
+
+        tracker.release()
+        assert tracker.tracker is None
+        assert GOTURNTracker().create_tracker() is network
@@ -2,6 +2,7 @@ import pytest
 from src.tracker.trackers import MILTracker, BoostingTracker, MOSSETracker,\
     MedianFlowTracker, TLDTracker, KCFTracker, GOTURNTracker, CSRTTracker
 from src.tracker.tracker_manager import TrackerManager
+from src.tracker.multi_tracker_manager import MultiTrackerManager
 import numpy as np
 
 
@@ -66,4 +67,142 @@ class TestTrackerManager:
     def test_track_empty_frame(self):
         # Pass an empty frame
         with pytest.raises(ValueError, match="Frame is empty"):
-            self.tracker_manager.track(np.array([[], [], []]))
\ No newline at end of file
+            self.tracker_manager.track(np.array([[], [], []]))
+
+
+class TestMultiTrackerManager:
+    @pytest.fixture(autouse=True)
+    def setup_class(self):
+        self.manager = MultiTrackerManager(max_workers=4)
+        yield
+        self.manager.close()
+
+    @staticmethod
+    def make_image():
+        image = np.ones((300, 300, 3), dtype=np.uint8) * 255
+        image[20:80, 20:80, :] = 0
+        image[150:250, 150:250, :] = 0
+        return image
+
+    def test_add_remove(self):
+        tracker = KCFTracker()
+        self.manager.add_target("a", tracker, (20, 20, 60, 60))
+        assert "a" in self.manager
+
+        with pytest.raises(ValueError, match="already tracked"):
+            self.manager.add_target("a", KCFTracker())
+
+        self.manager.track(self.make_image())
+        assert tracker.tracker is not None
+        self.manager.remove_target("a")
+        assert len(self.manager) == 0
+        # the removed tracker drops its OpenCV tracker
+        assert tracker.tracker is None
+
+        with pytest.raises(ValueError, match="not tracked"):
+            self.manager.remove_target("a")
+
+    def test_update_target(self):
+        self.manager.add_target(1, MILTracker(), (20, 20, 60, 60))
+        self.manager.update_target(1, np.array([150, 150, 100, 100]))
+        assert np.array_equal(self.manager.trackers[1].bbox, [150, 150, 100, 100])
+
+    def test_track(self):
+        self.manager.add_target(1, KCFTracker(), (20, 20, 60, 60))
+        self.manager.add_target(2, CSRTTracker(), (150, 150, 100, 100))
+        image = self.make_image()
+
+        # initialization
+        results = self.manager.track(image)
+        assert results[1] == (True, (20, 20, 60, 60))
+
+        results = self.manager.track(image)
+        assert set(results) == {1, 2}
+        assert all(result.success and len(result.bbox) == 4 for result in results.values())
+
+    def test_track_empty_frame(self):
+        with pytest.raises(ValueError, match="Frame is empty"):
+            self.manager.track(np.array([[], [], []]))
+
+
+class TestSearchWindow:
+    @staticmethod
+    def make_image(x, y):
+        image = np.full((720, 1280, 3), 255, dtype=np.uint8)
+        image[y:y + 60, x:x + 60, :] = 0
+        image[y + 20:y + 40, x + 20:x + 40, :] = 128
+        return image
+
+    def test_window_mapping(self):
+        tracker = KCFTracker(np.array([600, 300, 60, 60]))
+        tracker.set_search_window(margin=1.0, target_size=90)
+        tracker.track(self.make_image(600, 300))
+
+        assert tracker.window == (540, 240, 180, 180)
+        assert tracker.window_scale == 0.5
+        assert tracker._to_window((600, 300, 60, 60)) == (30, 30, 30, 30)
+        assert tracker._to_frame((30, 30, 30, 30)) == (600, 300, 60, 60)
+
+    def test_window_at_frame_edge(self):
+        tracker = KCFTracker(np.array([0, 0, 60, 60]))
+        tracker.set_search_window(margin=1.0)
+        tracker.track(self.make_image(0, 0))
+
+        assert tracker.window == (0, 0, 180, 180)
+
+    @pytest.mark.parametrize("tracker_class", [CSRTTracker, MOSSETracker])
+    def test_follows_target_across_windows(self, tracker_class):
+        tracker = tracker_class(np.array([100, 300, 60, 60]))
+        tracker.set_search_window(margin=1.0, target_size=120)
+        first_window = None
+
+        for x in range(100, 700, 6):
+            bbox = tracker.track(self.make_image(x, 300))
+            first_window = first_window or tracker.window
+            assert bbox is not None
+            assert abs(bbox[0] - x) < 10
+
+        # the target left the first window, so it had to be re-anchored
+        assert tracker.window != first_window
+
+    def test_reinitialize_legacy_tracker(self):
+        tracker = MOSSETracker(np.array([100, 300, 60, 60]))
+        tracker.track(self.make_image(100, 300))
+
+        tracker.set_bbox(np.array([600, 300, 60, 60]))
+        tracker.track(self.make_image(600, 300))
+        bbox = tracker.track(self.make_image(600, 300))
+        assert abs(bbox[0] - 600) < 5
+
+
+class FakeGOTURN:
+    """
+    Stands in for cv2.TrackerGOTURN, whose weights are not in the repository.
+    """
+    created = 0
+
+    def __init__(self, *args):
+        FakeGOTURN.created += 1
+
+    def init(self, frame, bbox):
+        self.bbox = bbox
+
+    def update(self, frame):
+        return True, self.bbox
+
+
+class TestGOTURNReuse:
+    def test_network_is_reused_across_runs(self, monkeypatch):
+        monkeypatch.setattr("cv2.TrackerGOTURN_create", FakeGOTURN)
+        monkeypatch.setattr("src.tracker.trackers._goturn_pool", {})
+        FakeGOTURN.created = 0
+        image = np.zeros((100, 100, 3), dtype=np.uint8)
+
+        for _ in range(3):
+            tracker_manager = TrackerManager(GOTURNTracker())
+            tracker_manager.set_bbox((10, 10, 20, 20))
+            tracker_manager.track(image)
+            tracker_manager.track(image)
+            tracker_manager.close()
+
+        assert FakeGOTURN.created == 1
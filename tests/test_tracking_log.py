@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.visualizer.tracking_log import TrackingLog, load_tracking_log, CSV_COLUMNS
+
+
+class TestTrackingLog:
+    def test_blocks_are_flushed(self, tmp_path):
+        tracking_log = TrackingLog(str(tmp_path / "log.npy"), block_size=4)
+
+        for frame in range(10):
+            tracking_log.log(frame, "Track", (0.1, 0.2, 0.3, 0.4))
+        # two full blocks are on disk, the rest is in memory
+        assert len(load_tracking_log(tracking_log.path)) == 8
+
+        tracking_log.close()
+        records = load_tracking_log(tracking_log.path)
+        assert np.array_equal(records["frame"], np.arange(10))
+        assert np.allclose(records["width"], 0.3)
+
+    def test_coordinates_in_double_precision(self, tmp_path):
+        tracking_log = TrackingLog(str(tmp_path / "log.npy"))
+        tracking_log.log(0, "Track", (201 / 480, 99 / 256, 61 / 480, 50 / 256))
+        tracking_log.close()
+
+        record = load_tracking_log(tracking_log.path)[0]
+        # relative coordinates map back to the same pixels without rounding
+        assert record["x"] * 480 == 201 and record["y"] * 256 == 99 and record["width"] * 480 == 61
+
+    def test_empty_log(self, tmp_path):
+        tracking_log = TrackingLog(str(tmp_path / "log.npy"))
+        tracking_log.close()
+        assert len(load_tracking_log(tracking_log.path)) == 0
+
+    def test_unknown_event(self, tmp_path):
+        tracking_log = TrackingLog(str(tmp_path / "log.npy"))
+        with pytest.raises(ValueError, match="Unknown event"):
+            tracking_log.log(0, "Jump", (0, 0, 1, 1))
+        tracking_log.close()
+
+    def test_to_csv(self, tmp_path):
+        tracking_log = TrackingLog(str(tmp_path / "log.npy"))
+        tracking_log.log(0, "Click", (0.5, 0.5, 0.25, 0.25))
+        tracking_log.log(1, "Track", (0.5, 0.75, 0.25, 0.25), target=3)
+        tracking_log.to_csv(str(tmp_path / "log.csv"))
+        tracking_log.to_csv(str(tmp_path / "log_targets.csv"), with_target=True)
+        tracking_log.close()
+
+        table = pd.read_csv(tmp_path / "log.csv")
+        assert list(table.columns) == CSV_COLUMNS
+        assert list(table["Event"]) == ["Click", "Track"]
+        assert table["Y"][1] == 0.75
+
+        table = pd.read_csv(tmp_path / "log_targets.csv")
+        assert list(table["Target"]) == [0, 3]
+
+    def test_to_csv_after_close(self, tmp_path):
+        tracking_log = TrackingLog(str(tmp_path / "log.npy"))
+        tracking_log.log(0, "Click", (0.5, 0.5, 0.25, 0.25))
+        tracking_log.close()
+        tracking_log.to_csv(str(tmp_path / "log.csv"))
+
+        assert len(pd.read_csv(tmp_path / "log.csv")) == 1
@@ -0,0 +1,106 @@
+import json
+import os
+
+import cv2
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline import TrackingPipeline, parse_bbox, load_bboxes
+from src.tracker.multi_tracker_manager import MultiTrackerManager
+from src.tracker.tracker_manager import TrackerManager
+from src.tracker.trackers import MOSSETracker
+from src.videoloader import VideoLoaderOpenCV
+from src.visualizer.tracking_log import load_tracking_log, EVENT_CODES
+from tests.cache import TEST_VIDEO
+
+BBOX = (200, 100, 60, 50)
+
+
+class TestBboxSource:
+    @pytest.mark.parametrize("text", ["10,20,30,40", "10 20 30 40", " 10, 20,30 ,40.2 "])
+    def test_parse_bbox(self, text):
+        assert parse_bbox(text) == (10, 20, 30, 40)
+
+    @pytest.mark.parametrize("text", ["10,20,30", "10,20,0,40", "a,b,c,d"])
+    def test_parse_wrong_bbox(self, text):
+        with pytest.raises(ValueError):
+            parse_bbox(text)
+
+    def test_load_json(self, tmp_path):
+        path = tmp_path / "bboxes.json"
+        path.write_text(json.dumps({"bboxes": {"3": [1, 2, 3, 4], "7": "5,6,7,8"}}))
+        assert load_bboxes(str(path)) == {3: (1, 2, 3, 4), 7: (5, 6, 7, 8)}
+
+        path.write_text(json.dumps([[1, 2, 3, 4], [5, 6, 7, 8]]))
+        assert load_bboxes(str(path)) == {0: (1, 2, 3, 4), 1: (5, 6, 7, 8)}
+
+    def test_load_text(self, tmp_path):
+        path = tmp_path / "bboxes.txt"
+        path.write_text("# x y w h\n1 2 3 4\n\n5,6,7,8\n")
+        assert load_bboxes(str(path)) == {0: (1, 2, 3, 4), 1: (5, 6, 7, 8)}
+
+
+class TestTrackingPipeline:
+    def test_headless_run(self, tmp_path):
+        log_path = str(tmp_path / "log.csv")
+        output_path = str(tmp_path / "output.mp4")
+        loader = VideoLoaderOpenCV(TEST_VIDEO)
+        pipeline = TrackingPipeline(TrackerManager(MOSSETracker()), loader, log_path=log_path, output_path=output_path)
+        pipeline.open()
+        pipeline.set_bbox(BBOX, event='Init')
+        pipeline.run()
+
+        capture = cv2.VideoCapture(TEST_VIDEO)
+        frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        capture.release()
+        assert pipeline.frame_counter == frames
+
+        log = pd.read_csv(log_path)
+        assert log["Event"].iloc[0] == "Init"
+        assert log["Frame"].iloc[0] == 0
+        assert (log["Event"] == "Track").sum() > frames // 2
+        # the binary log the CSV was exported from is removed
+        assert sorted(os.listdir(tmp_path)) == ["log.csv", "output.mp4"]
+
+        output = cv2.VideoCapture(output_path)
+        assert int(output.get(cv2.CAP_PROP_FRAME_COUNT)) == frames
+        output.release()
+
+    def test_frames_are_not_drawn_without_output(self):
+        loader = VideoLoaderOpenCV(TEST_VIDEO)
+        pipeline = TrackingPipeline(TrackerManager(MOSSETracker()), loader)
+        frame = pipeline.open().copy()
+        pipeline.set_bbox(BBOX)
+
+        shown = []
+        pipeline.run(on_frame=lambda annotated: shown.append(annotated.copy()) or len(shown) < 3)
+
+        assert len(shown) == 3
+        assert not np.array_equal(shown[0], frame)
+
+        plain = TrackingPipeline(TrackerManager(MOSSETracker()), VideoLoaderOpenCV(TEST_VIDEO))
+        plain.open()
+        plain.set_bbox(BBOX)
+        plain.process_frame(plain.initial_frame)
+        assert np.array_equal(plain.initial_frame, frame)
+        plain.close()
+
+    def test_multi_target(self, tmp_path):
+        log_path = str(tmp_path / "log.npy")
+        pipeline = TrackingPipeline(MultiTrackerManager(), VideoLoaderOpenCV(TEST_VIDEO), log_path=log_path)
+        pipeline.open()
+        pipeline.add_target(4, MOSSETracker(), BBOX)
+        pipeline.add_target(9, MOSSETracker(), (50, 50, 40, 40))
+
+        with pytest.raises(ValueError):
+            pipeline.set_bbox(BBOX)
+
+        frames = []
+        pipeline.run(on_frame=lambda frame: frames.append(None) or len(frames) < 20)
+
+        records = load_tracking_log(log_path)
+        init = records[records["event"] == EVENT_CODES["Init"]]
+        assert sorted(init["target"]) == [4, 9]
+        assert set(records["target"]) == {4, 9}
+        assert set(pipeline.bboxes) == {4, 9}
@@ -0,0 +1,284 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.service import TrackingService, TrackingClient, ServiceError
+from src.service.protocol import encode_frame, decode_frame, write_message, ProtocolError
+from src.tracker.base import TrackerBase
+from src.tracker.tracker_registry import TrackerRegistry
+from src.videoloader import VideoLoaderOpenCV
+from tests.cache import TEST_VIDEO
+
+BBOX = (200, 100, 60, 50)
+
+
+class BlockingTracker(TrackerBase):
+    """
+    Waits for the test to release every frame.
+    """
+    release = threading.Semaphore(0)
+    tracked = 0
+
+    def __init__(self, bbox=(0, 0, 10, 10)):
+        super().__init__(bbox)
+
+    def track(self, frame):
+        BlockingTracker.release.acquire()
+        BlockingTracker.tracked += 1
+        return self.bbox
+
+
+class SlowTracker(TrackerBase):
+    """
+    Takes a while to create, like a tracker that loads a model.
+    """
+    def __init__(self, bbox=(0, 0, 10, 10)):
+        time.sleep(0.2)
+        super().__init__(bbox)
+
+    def track(self, frame):
+        return self.bbox
+
+
+class ReleasedTracker(TrackerBase):
+    """
+    Counts the trackers released by the service.
+    """
+    released = 0
+
+    def __init__(self, bbox=(0, 0, 10, 10)):
+        super().__init__(bbox)
+
+    def track(self, frame):
+        return self.bbox
+
+    def release(self):
+        ReleasedTracker.released += 1
+        super().release()
+
+
+def blocking_registry():
+    tracker_registry = TrackerRegistry()
+    tracker_registry.register("BLOCKING", BlockingTracker)
+    return tracker_registry
+
+
+def read_frames(count):
+    loader = VideoLoaderOpenCV(TEST_VIDEO)
+    loader.open()
+    frames = [loader.get_frame() for _ in range(count)]
+    loader.close()
+    return frames
+
+
+def run_with_service(scenario, **kwargs):
+    async def main():
+        service = TrackingService(host="127.0.0.1", port=0, **kwargs)
+        await service.start()
+        try:
+            return await scenario(service)
+        finally:
+            await service.stop()
+
+    return asyncio.run(main())
+
+
+class TestProtocol:
+    @pytest.mark.parametrize("encoding", ["raw", "png"])
+    def test_lossless_round_trip(self, encoding):
+        frame = np.random.default_rng(0).integers(0, 255, (24, 32, 3), dtype=np.uint8)
+        fields, payload = encode_frame(frame, encoding)
+        assert np.array_equal(decode_frame(fields, payload), frame)
+
+    def test_wrong_raw_shape(self):
+        with pytest.raises(ProtocolError):
+            decode_frame({"encoding": "raw", "shape": [10, 10, 3]}, b"\0" * 10)
+
+    @pytest.mark.parametrize("shape", [None, ["a", 2], [-2, -1], [2, 5, 4], [2.5, 4], [True, 4]])
+    def test_malformed_raw_shape(self, shape):
+        with pytest.raises(ProtocolError, match="shape"):
+            decode_frame({"encoding": "raw", "shape": shape}, b"\0" * 40)
+
+
+class TestTrackingService:
+    def test_stream(self):
+        frames = read_frames(30)
+
+        async def scenario(service):
+            async with TrackingClient("127.0.0.1", service.port) as client:
+                await client.open_session("CSRT", BBOX)
+                # frames are sent ahead of the results, backpressure keeps the session bounded
+                sender = asyncio.create_task(self._send_all(client, frames))
+                results = [await client.receive_bbox() for _ in frames]
+                await sender
+                assert await client.close_session() == []
+            return results
+
+        results = run_with_service(scenario, queue_size=2)
+        assert [frame for frame, _ in results] == list(range(len(frames)))
+        assert all(bbox is not None for _, bbox in results)
+        assert abs(results[-1][1][0] - BBOX[0]) < 40
+
+    @staticmethod
+    async def _send_all(client, frames):
+        for frame in frames:
+            await client.send_frame(frame)
+
+    def test_concurrent_sessions(self):
+        frames = read_frames(10)
+
+        async def session(port, tracker, bbox):
+            async with TrackingClient("127.0.0.1", port, encoding="raw") as client:
+                await client.open_session(tracker, bbox)
+                return [await client.track(frame) for frame in frames]
+
+        async def scenario(service):
+            return await asyncio.gather(session(service.port, "MOSSE", BBOX),
+                                        session(service.port, "CSRT", BBOX),
+                                        session(service.port, "MOSSE", (50, 50, 40, 40)))
+
+        results = run_with_service(scenario, max_workers=2)
+        assert all(len(bboxes) == len(frames) for bboxes in results)
+        assert results[2][0][:2] != results[0][0][:2]
+
+    def test_unknown_tracker(self):
+        async def scenario(service):
+            async with TrackingClient("127.0.0.1", service.port) as client:
+                with pytest.raises(ServiceError, match="Unknown tracker"):
+                    await client.open_session("NOPE", BBOX)
+            return len(service.sessions)
+
+        assert run_with_service(scenario) == 0
+
+    def test_wrong_params(self):
+        async def scenario(service):
+            async with TrackingClient("127.0.0.1", service.port) as client:
+                with pytest.raises(ServiceError, match="Unknown parameter"):
+                    await client.open_session("KCF", BBOX, params={"bogus": 1})
+            return len(service.sessions)
+
+        assert run_with_service(scenario) == 0
+
+    @pytest.mark.parametrize("params", [[1, 2], "detect_thresh"])
+    def test_params_not_an_object(self, params):
+        async def scenario(service):
+            async with TrackingClient("127.0.0.1", service.port) as client:
+                await write_message(client.writer, {"type": "open", "tracker": "KCF", "bbox": list(BBOX),
+                                                    "params": params})
+                with pytest.raises(ServiceError, match="JSON object"):
+                    await client.receive()
+            return len(service.sessions)
+
+        assert run_with_service(scenario) == 0
+
+    def test_malformed_frame_is_an_error(self):
+        frame = read_frames(1)[0]
+
+        async def scenario(service):
+            async with TrackingClient("127.0.0.1", service.port) as client:
+                await client.open_session("MOSSE", BBOX)
+                await write_message(client.writer, {"type": "frame", "frame": 0, "encoding": "raw",
+                                                    "shape": ["a", 2]}, b"\0" * 8)
+                with pytest.raises(ServiceError, match="shape"):
+                    await client.receive()
+                # the session is still alive
+                return await client.track(frame)
+
+        assert run_with_service(scenario) is not None
+
+    def test_session_limit(self):
+        async def scenario(service):
+            async with TrackingClient("127.0.0.1", service.port) as first, \
+                    TrackingClient("127.0.0.1", service.port) as second:
+                await first.open_session("MOSSE", BBOX)
+                with pytest.raises(ServiceError, match="Too many sessions"):
+                    await second.open_session("MOSSE", BBOX)
+
+        run_with_service(scenario, max_sessions=1)
+
+    def test_concurrent_opens_respect_limit(self):
+        tracker_registry = TrackerRegistry()
+        tracker_registry.register("SLOW", SlowTracker)
+
+        async def open_session(port):
+            async with TrackingClient("127.0.0.1", port) as client:
+                try:
+                    await client.open_session("SLOW", BBOX)
+                except ServiceError:
+                    return False
+                await asyncio.sleep(0.3)
+                return True
+
+        async def scenario(service):
+            return await asyncio.gather(*(open_session(service.port) for _ in range(3)))
+
+        assert sum(run_with_service(scenario, max_sessions=1, tracker_registry=tracker_registry)) == 1
+
+    @pytest.mark.parametrize("bbox", [["a", 1, 2, 3], [1, 2, None, 4], [1, 2, 3], [1, 2, float("inf"), 4]])
+    def test_wrong_bbox(self, bbox):
+        async def scenario(service):
+            async with TrackingClient("127.0.0.1", service.port) as client:
+                await write_message(client.writer, {"type": "open", "tracker": "MOSSE", "bbox": bbox})
+                with pytest.raises(ServiceError, match="initial bbox"):
+                    await client.receive()
+            return len(service.sessions)
+
+        assert run_with_service(scenario) == 0
+
+    def test_tracker_is_released(self):
+        tracker_registry = TrackerRegistry()
+        tracker_registry.register("RELEASED", ReleasedTracker)
+        ReleasedTracker.released = 0
+        frame = np.zeros((16, 16, 3), dtype=np.uint8)
+
+        async def scenario(service):
+            for _ in range(2):
+                async with TrackingClient("127.0.0.1", service.port, encoding="raw") as client:
+                    await client.open_session("RELEASED", BBOX)
+                    await client.track(frame)
+                    await client.close_session()
+            # the handler releases the tracker after it answered the close message
+            await asyncio.sleep(0.1)
+
+        run_with_service(scenario, tracker_registry=tracker_registry)
+        assert ReleasedTracker.released == 2
+
+    def test_backpressure(self):
+        frame = np.zeros((16, 16, 3), dtype=np.uint8)
+        BlockingTracker.tracked = 0
+
+        async def scenario(service):
+            async with TrackingClient("127.0.0.1", service.port, encoding="raw") as client:
+                await client.open_session("BLOCKING", (0, 0, 4, 4))
+                for _ in range(10):
+                    await client.send_frame(frame)
+                await asyncio.sleep(0.2)
+
+                session, = service.sessions.values()
+                # one frame is in the tracker, the queue is full and the rest waits in the socket
+                assert session.queue.qsize() == 2
+                assert session.frames == 0
+
+                for _ in range(10):
+                    BlockingTracker.release.release()
+                return [await client.receive_bbox() for _ in range(10)]
+
+        results = run_with_service(scenario, queue_size=2, tracker_registry=blocking_registry())
+        assert len(results) == 10
+        assert BlockingTracker.tracked == 10
+
+    def test_idle_session_is_evicted(self):
+        async def scenario(service):
+            async with TrackingClient("127.0.0.1", service.port) as client:
+                await client.open_session("MOSSE", BBOX)
+                start = time.monotonic()
+                with pytest.raises(ServiceError, match="idle"):
+                    await client.receive()
+                return time.monotonic() - start, len(service.sessions)
+
+        elapsed, sessions = run_with_service(scenario, idle_timeout=0.3)
+        assert 0.3 <= elapsed < 3
+        assert sessions == 0
@@ -0,0 +1,80 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from src.videoloader.frame_cache import FrameCache
+from src.videoloader.videoloader_cached import VideoLoaderCached
+from src.videoloader.videoloader_opencv import VideoLoaderOpenCV
+
+
+def make_video(path, frames=10, size=(64, 48), offset=0):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), 25, size)
+    for i in range(frames):
+        writer.write(np.full((size[1], size[0], 3), (i * 20 + offset) % 256, dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+
+class TestVideoLoaderCached:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.video_path = make_video(tmp_path / "video.mp4")
+        self.cache = FrameCache(str(tmp_path / "cache"))
+        self.video_loader = VideoLoaderCached(self.video_path, self.cache)
+        yield
+        self.video_loader.close()
+
+    def test_same_frames_as_opencv(self):
+        reference = VideoLoaderOpenCV(self.video_path)
+        reference.open()
+        self.video_loader.open()
+
+        assert len(self.video_loader) == 10
+        assert self.video_loader.get_fps() == 25
+        for _ in range(10):
+            assert np.array_equal(self.video_loader.get_frame(), reference.get_frame())
+        assert self.video_loader.get_frame() is None
+
+        reference.close()
+
+    def test_decoded_once(self):
+        self.video_loader.open()
+        data_path = self.cache.data_path(self.cache.key(self.video_path))
+        modified = os.path.getmtime(data_path)
+
+        self.video_loader.open()
+        assert os.path.getmtime(data_path) == modified
+
+    def test_random_access(self):
+        self.video_loader.open()
+        last = self.video_loader.get_frame_at(9)
+
+        self.video_loader.seek(9)
+        assert np.array_equal(self.video_loader.get_frame(), last)
+
+        with pytest.raises(IndexError):
+            self.video_loader.get_frame_at(10)
+
+    def test_drawing_does_not_change_cache(self):
+        self.video_loader.open()
+        frame = self.video_loader.get_frame()
+        cv2.rectangle(frame, (0, 0), (10, 10), (0, 255, 0), 2)
+
+        self.video_loader.open()
+        assert not (self.video_loader.get_frame() == (0, 255, 0)).all(axis=2).any()
+
+    def test_lru_eviction(self, tmp_path):
+        frame_bytes = 64 * 48 * 3 * 10
+        cache = FrameCache(str(tmp_path / "small_cache"), max_bytes=2 * frame_bytes)
+        videos = [make_video(tmp_path / f"video_{i}.mp4", offset=i) for i in range(3)]
+
+        cache.get(videos[0])
+        cache.get(videos[1])
+        cache.get(videos[0])
+        cache.get(videos[2])
+
+        keys = set(cache.index["entries"])
+        assert keys == {cache.key(videos[0]), cache.key(videos[2])}
+        assert not os.path.exists(cache.data_path(cache.key(videos[1])))
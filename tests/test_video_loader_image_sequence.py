@@ -0,0 +1,104 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from src.videoloader import videoloader_image_sequence
+from src.videoloader.videoloader_image_sequence import VideoLoaderImageSequence, list_images
+
+FRAMES = 12
+
+
+def make_images(directory, frames=FRAMES, size=(64, 48)):
+    directory.mkdir()
+    images = []
+    for i in range(frames):
+        image = np.random.default_rng(i).integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+        # no zero padding: frame10 has to come after frame9
+        cv2.imwrite(str(directory / f"frame{i}.png"), image)
+        images.append(image)
+    (directory / "notes.txt").write_text("not an image")
+    return images
+
+
+class TestVideoLoaderImageSequence:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.images = make_images(tmp_path / "img")
+        self.video_loader = VideoLoaderImageSequence(str(tmp_path / "img"), fps=12.5, workers=3, prefetch=4)
+        yield
+        self.video_loader.close()
+
+    def test_natural_order(self, tmp_path):
+        names = [path.rsplit("/", 1)[-1] for path in list_images(str(tmp_path / "img"))]
+        assert names == [f"frame{i}.png" for i in range(FRAMES)]
+
+    def test_frames_in_order(self):
+        self.video_loader.open()
+
+        assert len(self.video_loader) == FRAMES
+        assert self.video_loader.get_fps() == 12.5
+        for image in self.images:
+            assert np.array_equal(self.video_loader.get_frame(), image)
+        assert self.video_loader.get_frame() is None
+
+    def test_order_does_not_depend_on_decode_time(self, monkeypatch):
+        read_image = videoloader_image_sequence.read_image
+
+        def slow_even_frames(path):
+            # even frames finish after the odd ones that were submitted later
+            if int(path.rsplit("frame", 1)[1].split(".")[0]) % 2 == 0:
+                time.sleep(0.02)
+            return read_image(path)
+
+        monkeypatch.setattr(videoloader_image_sequence, "read_image", slow_even_frames)
+        self.video_loader.open()
+        for image in self.images:
+            assert np.array_equal(self.video_loader.get_frame(), image)
+
+    def test_decoding_is_parallel(self, monkeypatch):
+        threads = set()
+        read_image = videoloader_image_sequence.read_image
+
+        def recording_read(path):
+            threads.add(threading.current_thread().name)
+            time.sleep(0.01)
+            return read_image(path)
+
+        monkeypatch.setattr(videoloader_image_sequence, "read_image", recording_read)
+        self.video_loader.open()
+        while self.video_loader.get_frame() is not None:
+            pass
+        assert len(threads) > 1
+
+    def test_random_access_and_seek(self):
+        self.video_loader.open()
+        assert np.array_equal(self.video_loader.get_frame_at(9), self.images[9])
+        assert np.array_equal(self.video_loader.get_frame_at(2), self.images[2])
+        assert np.array_equal(self.video_loader.get_frame(), self.images[0])
+
+        self.video_loader.seek(3)
+        assert np.array_equal(self.video_loader.get_frame(), self.images[3])
+        self.video_loader.seek(10)
+        assert np.array_equal(self.video_loader.get_frame(), self.images[10])
+        self.video_loader.seek(1)
+        assert np.array_equal(self.video_loader.get_frame(), self.images[1])
+
+        self.video_loader.seek(FRAMES)
+        assert self.video_loader.get_frame() is None
+        with pytest.raises(IndexError):
+            self.video_loader.get_frame_at(FRAMES)
+
+    def test_broken_image(self, tmp_path):
+        (tmp_path / "img" / "frame3.png").write_bytes(b"broken")
+        self.video_loader.open()
+        for _ in range(3):
+            self.video_loader.get_frame()
+        with pytest.raises(Exception, match="Failed to read image"):
+            self.video_loader.get_frame()
+
+    def test_not_opened(self):
+        with pytest.raises(Exception, match="No video is currently open"):
+            self.video_loader.get_frame()
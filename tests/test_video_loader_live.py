@@ -0,0 +1,197 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline import TrackingPipeline
+from src.tracker.tracker_manager import TrackerManager
+from src.tracker.trackers import CSRTTracker
+from src.videoloader import VideoLoaderLive, VideoLoaderSynthetic
+from src.videoloader.base import VideoLoaderBase
+from src.visualizer.tracking_log import load_tracking_log, RECORD_DTYPE
+
+FPS = 100
+# time the consumer spends on a frame, three frame intervals
+STEP = 0.03
+
+
+class FailingLoader(VideoLoaderBase):
+    def __init__(self, frames_before_error: int):
+        self.frames_before_error = frames_before_error
+
+    def get_frame(self):
+        if self.frames_before_error == 0:
+            raise RuntimeError("decoder failure")
+        self.frames_before_error -= 1
+        return np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def get_fps(self):
+        return 30
+
+
+class ListLoader(VideoLoaderBase):
+    """
+    Frames of a file without capture times, read as fast as they are asked for.
+    """
+    def __init__(self, count: int):
+        self.count = count
+
+    def get_frame(self):
+        if self.count == 0:
+            return None
+        self.count -= 1
+        return np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def get_fps(self):
+        return FPS
+
+
+def consume(loader, step: float = STEP):
+    """
+    Read all frames with a consumer that needs step seconds per frame.
+    :return: Capture times, delays between capture and the end of processing, dropped counts.
+    """
+    times, delays, dropped = [], [], []
+    while True:
+        frame = loader.get_frame()
+        if frame is None:
+            return times, delays, dropped
+        time.sleep(step)
+        times.append(loader.get_frame_time())
+        delays.append(time.time() - loader.get_frame_time())
+        dropped.append(loader.get_dropped())
+
+
+class TestVideoLoaderSynthetic:
+    def test_frames_are_timed(self):
+        loader = VideoLoaderSynthetic(fps=FPS, frame_count=10)
+        loader.open()
+
+        for index in range(10):
+            frame = loader.get_frame()
+            assert loader.get_frame_time() == pytest.approx(loader.start_time + index / FPS)
+            assert time.time() >= loader.get_frame_time()
+
+            x, y, w, h = loader.bbox_at(index)
+            assert np.array_equal(frame[y:y + h, x:x + w], loader.target)
+
+        assert loader.get_frame() is None
+        loader.close()
+
+    def test_in_order_delay_grows(self):
+        loader = VideoLoaderSynthetic(fps=FPS, frame_count=20)
+        loader.open()
+        _, delays, _ = consume(loader)
+
+        # every frame waits for all the frames before it
+        assert delays[-1] > 10 * STEP
+        loader.close()
+
+    def test_wrong_arguments(self):
+        with pytest.raises(ValueError):
+            VideoLoaderSynthetic(fps=0)
+        with pytest.raises(ValueError):
+            VideoLoaderSynthetic(size=(40, 40), target_size=(40, 20))
+
+
+class TestVideoLoaderLive:
+    def test_delay_is_bounded(self):
+        source = VideoLoaderSynthetic(fps=FPS, frame_count=60)
+        loader = VideoLoaderLive(source)
+        loader.open()
+        times, delays, dropped = consume(loader)
+
+        # one tracking step, one frame interval and scheduling noise
+        assert max(delays) < STEP + 1 / FPS + 0.02
+        assert loader.dropped > 0
+        assert sum(dropped) == loader.dropped
+        assert len(times) + loader.dropped == loader.received == 60
+        loader.close()
+
+    def test_newest_frame(self):
+        source = VideoLoaderSynthetic(fps=FPS, frame_count=60)
+        loader = VideoLoaderLive(source)
+        loader.open()
+        times, _, dropped = consume(loader)
+
+        indices = [round((t - source.start_time) * FPS) for t in times]
+        # the gap before every frame is the frames dropped in between
+        assert indices[0] == dropped[0]
+        assert all(b - a - 1 == d for a, b, d in zip(indices, indices[1:], dropped[1:]))
+        assert indices[-1] == 59
+        loader.close()
+
+    def test_paced_file(self):
+        loader = VideoLoaderLive(ListLoader(10), pace=True)
+        loader.open()
+        times, _, dropped = consume(loader, step=0)
+
+        # a fast consumer gets every frame of the file at its frame rate
+        assert len(times) == 10 and sum(dropped) == 0
+        assert np.allclose(np.diff(times), 1 / FPS)
+        assert time.time() - times[0] >= 9 / FPS
+        loader.close()
+
+    def test_error_is_raised(self):
+        loader = VideoLoaderLive(FailingLoader(2))
+        loader.open()
+        with pytest.raises(RuntimeError, match="decoder failure"):
+            while loader.get_frame() is not None:
+                pass
+        loader.close()
+
+    def test_close_while_running(self):
+        loader = VideoLoaderLive(VideoLoaderSynthetic(fps=FPS))
+        loader.open()
+        loader.get_frame()
+
+        start = time.perf_counter()
+        loader.close()
+        assert time.perf_counter() - start < 0.5
+        assert not loader.is_opened()
+
+    def test_not_opened(self):
+        with pytest.raises(Exception):
+            VideoLoaderLive(VideoLoaderSynthetic()).get_frame()
+
+
+class TestLivePipeline:
+    def test_log_has_capture_indices_and_times(self, tmp_path):
+        # slow enough for the tracker to follow despite the dropped frames
+        source = VideoLoaderSynthetic(fps=FPS, frame_count=60, period=600)
+        log_path = str(tmp_path / "log.csv")
+        pipeline = TrackingPipeline(TrackerManager(CSRTTracker()), VideoLoaderLive(source), log_path=log_path)
+        pipeline.open()
+        start_time = source.start_time
+        pipeline.set_bbox(source.bbox_at(0), event='Init')
+        pipeline.run(on_frame=lambda frame: time.sleep(STEP))
+
+        table = pd.read_csv(log_path)
+        frames = table["Frame"].to_numpy()
+        assert frames[0] == 0
+        assert np.all(np.diff(frames[1:]) > 0)
+        # the tracker could not keep up, frames were dropped
+        assert len(frames) < 60
+        assert np.allclose(table["Time"], start_time + frames / FPS)
+
+        x, y, _, _ = source.bbox_at(int(frames[-1]))
+        assert abs(table["X"].iloc[-1] * source.size[0] - x) < 5
+        assert abs(table["Y"].iloc[-1] * source.size[1] - y) < 5
+
+
+class TestLogTime:
+    def test_old_logs_are_upgraded(self, tmp_path):
+        old_dtype = np.dtype([field for field in RECORD_DTYPE.descr if field[0] != "time"])
+        old = np.zeros(3, dtype=old_dtype)
+        old["frame"] = [0, 1, 2]
+
+        path = str(tmp_path / "log.npy")
+        with open(path, "wb") as file:
+            np.save(file, old)
+            np.save(file, np.zeros(1, dtype=RECORD_DTYPE))
+
+        records = load_tracking_log(path)
+        assert records.dtype == RECORD_DTYPE
+        assert list(records["frame"]) == [0, 1, 2, 0]
+        assert np.isnan(records["time"][:3]).all() and records["time"][3] == 0
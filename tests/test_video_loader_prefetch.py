@@ -0,0 +1,154 @@
+import pytest
+import numpy as np
+
+from src.videoloader.base import VideoLoaderBase
+from src.videoloader.videoloader_opencv import VideoLoaderOpenCV
+from src.videoloader.videoloader_prefetch import VideoLoaderPrefetch
+from tests.cache import TEST_VIDEO
+
+
+class FailingLoader(VideoLoaderBase):
+    def __init__(self, frames_before_error: int):
+        self.frames_before_error = frames_before_error
+        self.closed = False
+
+    def get_frame(self):
+        if self.frames_before_error == 0:
+            raise RuntimeError("decoder failure")
+        self.frames_before_error -= 1
+        return np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def get_fps(self):
+        return 30
+
+    def close(self):
+        self.closed = True
+
+
+class CountingLoader(VideoLoaderOpenCV):
+    """
+    Counts the frames read and the frames skipped without being read.
+    """
+    def __init__(self, file_path):
+        super().__init__(file_path)
+        self.read = 0
+        self.grabbed = 0
+
+    def get_frame(self):
+        frame = super().get_frame()
+        self.read += frame is not None
+        return frame
+
+    def skip(self, count):
+        skipped = super().skip(count)
+        self.grabbed += skipped
+        return skipped
+
+
+class TestVideoLoaderPrefetch:
+    def setup_method(self):
+        self.video_loader = VideoLoaderPrefetch(VideoLoaderOpenCV(TEST_VIDEO), queue_size=4)
+
+    def teardown_method(self):
+        self.video_loader.close()
+
+    def test_open_close(self):
+        self.video_loader.open()
+        assert self.video_loader.is_opened()
+        assert self.video_loader.get_fps() == 25
+
+        self.video_loader.close()
+        assert self.video_loader.thread is None
+        assert self.video_loader.loader.video is None
+
+    def test_not_opened(self):
+        with pytest.raises(Exception, match="No video is currently open"):
+            self.video_loader.get_frame()
+
+    def test_same_frames(self):
+        reference = VideoLoaderOpenCV(TEST_VIDEO)
+        reference.open()
+        self.video_loader.open()
+
+        for _ in range(20):
+            assert np.array_equal(self.video_loader.get_frame(), reference.get_frame())
+
+        reference.close()
+
+    def test_end_of_video(self):
+        self.video_loader.open()
+
+        count = 0
+        while self.video_loader.get_frame() is not None:
+            count += 1
+
+        assert count == 661
+        assert not self.video_loader.is_opened()
+        assert self.video_loader.get_frame() is None
+
+    def test_close_with_full_queue(self):
+        self.video_loader.open()
+        self.video_loader.get_frame()
+
+        # producer is blocked on the full queue and has to stop anyway
+        self.video_loader.close()
+        assert self.video_loader.thread is None
+
+    def test_error_is_raised_in_consumer(self):
+        loader = FailingLoader(frames_before_error=2)
+        prefetch = VideoLoaderPrefetch(loader)
+        prefetch.open()
+
+        assert prefetch.get_frame() is not None
+        assert prefetch.get_frame() is not None
+        with pytest.raises(RuntimeError, match="decoder failure"):
+            prefetch.get_frame()
+
+        prefetch.close()
+        assert loader.closed
+
+    def test_skip(self):
+        reference = [frame for frame in self.read_all(VideoLoaderOpenCV(TEST_VIDEO), 30)]
+        self.video_loader.open()
+
+        assert np.array_equal(self.video_loader.get_frame(), reference[0])
+        assert self.video_loader.skip(9) == 9
+        assert np.array_equal(self.video_loader.get_frame(), reference[10])
+        assert self.video_loader.skip(2) == 2
+        assert np.array_equal(self.video_loader.get_frame(), reference[13])
+
+    def test_stride_grabs_skipped_frames(self):
+        reference = self.read_all(VideoLoaderOpenCV(TEST_VIDEO), 100)
+        loader = CountingLoader(TEST_VIDEO)
+        prefetch = VideoLoaderPrefetch(loader, queue_size=4)
+        prefetch.open()
+        assert np.array_equal(prefetch.get_frame(), reference[0])
+        prefetch.set_stride(10)
+
+        for index in range(10, 100, 10):
+            prefetch.skip(9)
+            assert np.array_equal(prefetch.get_frame(), reference[index])
+        prefetch.close()
+
+        # besides the 10 frames used only the frames read ahead are decoded: before the stride was set and at the end,
+        # each time a full queue and the frame waiting to be put
+        assert loader.read <= 10 + 2 * (4 + 1)
+        assert loader.grabbed >= 9 * 9
+
+    def test_broken_stride(self):
+        self.video_loader.open()
+        self.video_loader.get_frame()
+        self.video_loader.set_stride(5)
+        self.video_loader.skip(4)
+        self.video_loader.get_frame()
+
+        # frames 6 to 9 are skipped ahead by the producer
+        with pytest.raises(Exception, match="did not keep the stride"):
+            self.video_loader.get_frame()
+
+    @staticmethod
+    def read_all(loader, count):
+        loader.open()
+        frames = [loader.get_frame() for _ in range(count)]
+        loader.close()
+        return frames
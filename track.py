@@ -0,0 +1,137 @@
+import argparse
+import time
+
+STARTUP = time.perf_counter()
+
+# OpenCV, the loaders and the trackers are imported after the arguments are parsed
+from src.pipeline import cli, parse_bbox, load_bboxes
+from src.tracker.tracker_registry import registry
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="A program to track objects in a video without GUI")
+
+    cli.add_tracking_arguments(parser)
+    parser.add_argument("--bbox", type=parse_bbox, action="append", default=[],
+                        help="Initial bounding box x,y,w,h in the start frame, repeat it for more targets")
+    parser.add_argument("--bbox_file", type=str, default=None,
+                        help="JSON or text file with the initial bounding boxes")
+    parser.add_argument("--output_file", type=str, default=None,
+                        help="Path to the annotated output video, no video is written by default")
+    parser.add_argument("--log_file", type=str, default="log.csv",
+                        help="Path to the log file")
+    parser.add_argument("--max_workers", type=int, default=None,
+                        help="Number of threads tracking the targets when there are several of them")
+    parser.add_argument("--results_dir", type=str, default=None,
+                        help="Directory of stored tracking results, a run that was already tracked is not tracked again")
+
+    args = parser.parse_args()
+
+    bboxes = load_bboxes(args.bbox_file) if args.bbox_file is not None else {}
+    for bbox in args.bbox:
+        bboxes[max(bboxes, default=-1) + 1] = bbox
+    if not bboxes:
+        parser.error("at least one --bbox or a --bbox_file is required")
+    args.bboxes = bboxes
+
+    return args
+
+
+def replay_results(args, loader, store, key: str):
+    """
+    Write the log and the output video of a stored run without tracking.
+    """
+    from src.visualizer.results_renderer import ResultsRenderer
+
+    print(f"Results {key} are stored, tracking is skipped")
+    multi_target = len(args.bboxes) > 1
+    if args.log_file is not None:
+        store.export(key, args.log_file, end_frame=args.end_frame, with_target=multi_target)
+
+    if args.output_file is not None:
+        renderer = ResultsRenderer(loader, store.load(key, end_frame=args.end_frame))
+        renderer.render(args.output_file, start_frame=args.start_frame, end_frame=args.end_frame,
+                        logged_only=args.stride > 1, stride=args.stride)
+
+
+def run_tracking(args, loader, store=None, key: str = None):
+    """
+    Track the video, the results are stored under the key if a store is given.
+    """
+    from src.pipeline import TrackingPipeline
+    from src.tracker.multi_tracker_manager import BatchedTrackerManager
+
+    if len(args.bboxes) == 1:
+        tracker_manager = cli.build_tracker_manager(args, loader)
+    else:
+        if args.realtime:
+            print("Real-time mode supports a single target only, all frames will be tracked")
+        tracker_manager = cli.build_multi_tracker_manager(args, max_workers=args.max_workers)
+
+    if args.startup_report:
+        print(f"Startup: {(time.perf_counter() - STARTUP) * 1000:.1f} ms, trackers: {registry.startup_report()}")
+
+    pipeline = TrackingPipeline(tracker_manager=tracker_manager,
+                                video_loader=loader,
+                                # the log of a stored run is written to the store and exported at the end
+                                log_path=store.begin(key) if store is not None else args.log_file,
+                                output_path=args.output_file,
+                                writer_queue_size=args.writer_queue,
+                                writer_policy=cli.writer_policy(args),
+                                verbose=args.verbose,
+                                start_frame=args.start_frame,
+                                end_frame=args.end_frame,
+                                frame_stride=cli.build_frame_stride(args, loader))
+    pipeline.open()
+
+    if pipeline.multi_target:
+        batched = isinstance(tracker_manager, BatchedTrackerManager)
+        for target_id, bbox in args.bboxes.items():
+            # targets of a batched manager share its tracker
+            pipeline.add_target(target_id, None if batched else cli.build_tracker(args), bbox)
+    else:
+        pipeline.set_bbox(next(iter(args.bboxes.values())), event='Init')
+
+    start = time.perf_counter()
+    pipeline.run()
+    elapsed = time.perf_counter() - start
+
+    frames = pipeline.frame_counter - pipeline.start_frame
+    print(f"Tracked {frames} frames in {elapsed:.2f} s ({frames / elapsed:.1f} fps), last bboxes: {pipeline.bboxes}")
+    if args.live:
+        print(f"{loader.dropped} of {loader.received} frames of the live source were dropped")
+
+    if store is not None:
+        # the run ends before end_frame only at the end of the video
+        complete = args.end_frame is None or pipeline.frame_counter < args.end_frame
+        store.save(key, pipeline.frame_counter, complete, video=args.input_file, tracker=cli.tracking_config(args),
+                   bboxes={str(target_id): list(bbox) for target_id, bbox in args.bboxes.items()},
+                   start_frame=args.start_frame)
+        print(f"Results are stored as {key} in {args.results_dir}")
+        if args.log_file is not None:
+            store.export(key, args.log_file, with_target=pipeline.multi_target)
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    cli.start_profiling(args)
+
+    loader = cli.build_loader(args)
+
+    store, key = None, None
+    if args.results_dir is not None:
+        from src.pipeline import ResultsStore
+
+        config = cli.tracking_config(args)
+        if config is None:
+            print("Results of live, real-time and adaptive stride runs depend on timing, they are not stored")
+        else:
+            store = ResultsStore(args.results_dir)
+            key = store.key(args.input_file, config, args.bboxes, args.start_frame)
+
+    if store is not None and store.lookup(key, args.end_frame) is not None:
+        replay_results(args, loader, store, key)
+    else:
+        run_tracking(args, loader, store, key)
+
+    cli.finish_profiling(args)